@@ -0,0 +1,137 @@
+"""Compare header-parsed audio durations with a full pydub decode.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_audio_duration [--seconds 60] [--repeat 5] [FILE ...]
+
+Without FILE arguments a sine-wave clip is synthesised as WAV and, when ffmpeg is
+available, transcoded to MP3 (CBR and VBR), FLAC, Ogg Vorbis and Opus.
+"""
+
+import argparse
+import io
+import math
+import pathlib
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import wave
+from typing import Callable, Optional
+
+from pydub import AudioSegment
+
+from server.utils.audio_duration import estimate_duration, sniff_format
+
+# (file name, extra ffmpeg output arguments)
+TRANSCODES = [
+    ("clip_cbr.mp3", ["-b:a", "128k"]),
+    ("clip_vbr.mp3", ["-q:a", "4"]),
+    ("clip.flac", []),
+    ("clip.ogg", ["-c:a", "libvorbis"]),
+    ("clip.opus", ["-c:a", "libopus"]),
+]
+
+
+def synthesise_wav(path: pathlib.Path, seconds: float, rate: int = 44100) -> None:
+    """Write a mono 16-bit sine wave."""
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        sample = int(12000 * math.sin(2 * math.pi * 440 * i / rate))
+        frames += struct.pack("<h", sample)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(bytes(frames))
+
+
+def build_samples(workdir: pathlib.Path, seconds: float) -> list[pathlib.Path]:
+    """Create the default sample set in `workdir`."""
+    source = workdir / "clip.wav"
+    synthesise_wav(source, seconds)
+    samples = [source]
+    if shutil.which("ffmpeg") is None:
+        print("⚠️  ffmpeg not found; benchmarking WAV only")
+        return samples
+    for name, args in TRANSCODES:
+        target = workdir / name
+        result = subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-i",
+                str(source),
+                *args,
+                str(target),
+            ],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode == 0:
+            samples.append(target)
+        else:
+            print(f"⚠️  Skipping {name}: {result.stderr.decode(errors='replace')}")
+    return samples
+
+
+def best_of(
+    fn: Callable[[], Optional[float]], repeat: int
+) -> tuple[float, Optional[float]]:
+    """Return (fastest wall time in seconds, result) over `repeat` runs."""
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def pydub_duration(data: bytes, audio_format: Optional[str]) -> Optional[float]:
+    """Duration via a full pydub decode (the previous implementation)."""
+    try:
+        return len(AudioSegment.from_file(io.BytesIO(data), format=audio_format)) / 1000
+    except (OSError, ValueError):  # e.g. ffmpeg/ffprobe missing
+        return None
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=pathlib.Path)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or build_samples(pathlib.Path(tmp), args.seconds)
+        print(
+            f"{'file':<16}{'size':>10}{'headers':>12}{'pydub':>12}"
+            f"{'speedup':>10}{'dur(hdr)':>10}{'dur(pydub)':>12}"
+        )
+        for path in files:
+            data = path.read_bytes()
+            audio_format = sniff_format(data)
+            fast_time, fast = best_of(lambda: estimate_duration(data), args.repeat)
+            slow_time, slow = best_of(
+                lambda: pydub_duration(data, audio_format), args.repeat
+            )
+            if slow is None:
+                pydub_time, speedup = "n/a", "n/a"
+            else:
+                pydub_time = f"{slow_time * 1000:.1f}ms"
+                speedup = f"{slow_time / fast_time:,.0f}x"
+            print(
+                f"{path.name:<16}{len(data):>10,}{fast_time * 1000:>10.3f}ms"
+                f"{pydub_time:>12}{speedup:>10}"
+                f"{fast if fast is not None else float('nan'):>10.3f}"
+                f"{slow if slow is not None else float('nan'):>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
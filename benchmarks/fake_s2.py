@@ -0,0 +1,138 @@
+"""A local stand-in for the Fish Audio S2 `/v1/tts` API, for load tests without a GPU.
+
+Usage (from the repository root):
+
+    python -m benchmarks.fake_s2 [--port 8080] [--latency 0.5] [--audio-seconds 4]
+
+It accepts the same msgpack ServeTTSRequest plomtts sends and answers after
+`--latency` seconds (plus up to `--jitter`) with `--audio-seconds` of silent
+audio: CBR MP3 frames for `format: mp3`, WAV otherwise. Streaming requests get
+a WAV header at once and PCM spread over the latency window. At most `--slots`
+generations run at a time, like a GPU; the rest wait. `GET /stats` reports
+what it has served.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import msgpack
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from server.utils.wav import WavFormat, wav_header
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames of 1152 samples.
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x64"
+MP3_FRAME_BYTES = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+STREAM_FORMAT = WavFormat(channels=1, sample_rate=44100, bits_per_sample=16)
+STREAM_CHUNKS = 8
+
+
+def mp3_audio(seconds: float) -> bytes:
+    """Silent CBR MP3 whose frame headers report `seconds` of audio."""
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER))
+    return frame * max(1, round(seconds / MP3_FRAME_SECONDS))
+
+
+def wav_audio(seconds: float) -> bytes:
+    """Silent mono 16-bit WAV of `seconds`."""
+    pcm = bytes(STREAM_FORMAT.frames(seconds) * STREAM_FORMAT.frame_bytes)
+    return wav_header(STREAM_FORMAT, len(pcm)) + pcm
+
+
+def create_app(
+    latency: float, jitter: float, audio_seconds: float, slots: int
+) -> Starlette:
+    """Build the fake S2 application."""
+    gpu = asyncio.Semaphore(slots)
+    counters = {"requests": 0, "streaming": 0, "references": 0, "bytes_received": 0}
+    mp3 = mp3_audio(audio_seconds)
+    wav = wav_audio(audio_seconds)
+
+    def delay() -> float:
+        return latency + random.uniform(0, jitter)
+
+    async def health(request: Request) -> Response:
+        return JSONResponse({"status": "ok"})
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(counters)
+
+    async def tts(request: Request) -> Response:
+        body = await request.body()
+        payload = msgpack.unpackb(body, raw=False)
+        counters["requests"] += 1
+        counters["bytes_received"] += len(body)
+        counters["references"] += len(payload.get("references") or [])
+
+        if payload.get("streaming"):
+            counters["streaming"] += 1
+            return StreamingResponse(_stream(delay()), media_type="audio/wav")
+
+        async with gpu:
+            await asyncio.sleep(delay())
+        if payload.get("format") == "mp3":
+            return Response(mp3, media_type="audio/mpeg")
+        return Response(wav, media_type="audio/wav")
+
+    async def _stream(seconds: float):
+        async with gpu:
+            pcm = wav[len(wav_header(STREAM_FORMAT)) :]
+            yield wav_header(STREAM_FORMAT)
+            step = -(-len(pcm) // STREAM_CHUNKS)
+            step -= step % STREAM_FORMAT.frame_bytes
+            started = time.perf_counter()
+            for i, offset in enumerate(range(0, len(pcm), step), start=1):
+                wait = started + seconds * i / STREAM_CHUNKS - time.perf_counter()
+                await asyncio.sleep(max(0.0, wait))
+                yield pcm[offset : offset + step]
+
+    return Starlette(
+        routes=[
+            Route("/v1/health", health, methods=["GET"]),
+            Route("/v1/tts", tts, methods=["POST"]),
+            Route("/stats", stats, methods=["GET"]),
+        ]
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared with the load test, which starts this server itself."""
+    parser.add_argument(
+        "--latency", type=float, default=0.5, help="seconds per generation"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.1, help="extra random seconds, 0 to this"
+    )
+    parser.add_argument(
+        "--audio-seconds",
+        type=float,
+        default=4.0,
+        help="length of the returned audio (mp3 ~16 KB/s, wav ~86 KB/s)",
+    )
+    parser.add_argument(
+        "--slots", type=int, default=2, help="generations served at once"
+    )
+
+
+def main() -> None:
+    """Run the fake S2 server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.jitter, args.audio_seconds, args.slots)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
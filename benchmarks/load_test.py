@@ -0,0 +1,488 @@
+"""Load-test plomtts end to end against a fake Fish Audio S2 server.
+
+Usage (from the repository root):
+
+    python -m benchmarks.load_test [--scenario NAME ...] [--save FILE] [--compare FILE]
+
+Each scenario starts a fresh fake S2 (`benchmarks.fake_s2`) and a fresh plomtts
+server (uvicorn) with its own synthetic voice library, waits for every voice
+reference to be prepared, then drives HTTP requests at it. Reported per
+scenario: latency p50/p95/p99, requests per second, status codes, S2 calls and
+the plomtts server's resident memory (peak and at the end, Linux only).
+
+`--save` writes the results as a JSON baseline; `--compare` prints the change
+against an earlier baseline and exits non-zero if p95 latency, throughput or
+peak RSS regressed by more than `--tolerance`.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import pathlib
+import platform
+import random
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+import httpx
+
+from benchmarks.fake_s2 import add_arguments as add_fake_s2_arguments
+from server.utils.wav import WavFormat, wav_header
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Please remember to water the plants before you leave.",
+    "Tonight's forecast calls for light rain and a gentle breeze.",
+    "Our next stop is the central station, doors open on the left.",
+    "I never expected the meeting to run quite this long.",
+]
+
+STARTUP_TIMEOUT = 60.0
+RSS_SAMPLE_SECONDS = 0.1
+
+
+@dataclass
+class Scenario:
+    """One load pattern: which voices exist and which requests are sent."""
+
+    name: str
+    description: str
+    voices: int
+    requests: int
+    concurrency: int
+    # (request index, voice ids) -> (path, JSON body)
+    build: Callable[[int, list[str]], tuple[str, dict]]
+
+
+def _speech(index: int, voice_ids: list[str]) -> tuple[str, dict]:
+    return "/tts", {
+        "text": SENTENCES[index % len(SENTENCES)],
+        "voice_id": voice_ids[0],
+    }
+
+
+def _unique_speech(index: int, voice_ids: list[str]) -> tuple[str, dict]:
+    # Distinct texts, so identical in-flight requests are not coalesced.
+    path, body = _speech(index, voice_ids)
+    return path, {**body, "text": f"{body['text']} Take {index}."}
+
+
+def _dialogue(index: int, voice_ids: list[str]) -> tuple[str, dict]:
+    turns = [
+        {"voice_id": voice_ids[turn % 3], "text": SENTENCES[(index + turn) % 5]}
+        for turn in range(6)
+    ]
+    return "/tts/multi", {"turns": turns}
+
+
+def _library(index: int, voice_ids: list[str]) -> tuple[str, dict]:
+    return "/tts", {
+        "text": SENTENCES[index % len(SENTENCES)],
+        "voice_id": random.Random(index).choice(voice_ids),
+    }
+
+
+def _cache_hot(index: int, voice_ids: list[str]) -> tuple[str, dict]:
+    # A fixed seed makes the request reproducible and therefore cacheable.
+    return "/tts", {"text": SENTENCES[index % 2], "voice_id": voice_ids[0], "seed": 7}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            "single_voice",
+            "one voice, steady concurrent /tts",
+            voices=1,
+            requests=40,
+            concurrency=4,
+            build=_speech,
+        ),
+        Scenario(
+            "dialogue",
+            "three-speaker /tts/multi dialogues",
+            voices=3,
+            requests=20,
+            concurrency=4,
+            build=_dialogue,
+        ),
+        Scenario(
+            "burst",
+            "distinct requests all sent at once (429s once the queue is full)",
+            voices=1,
+            requests=120,
+            concurrency=120,
+            build=_unique_speech,
+        ),
+        Scenario(
+            "large_library",
+            "random voices out of a 300-voice library",
+            voices=300,
+            requests=60,
+            concurrency=8,
+            build=_library,
+        ),
+        Scenario(
+            "cache_hot",
+            "two fixed-seed requests repeated (audio cache hits)",
+            voices=1,
+            requests=200,
+            concurrency=8,
+            build=_cache_hot,
+        ),
+    ]
+}
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile (0-100) of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process (Linux /proc only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def free_port() -> int:
+    """An unused localhost TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def voice_sample(seconds: float = 6.0, rate: int = 22050) -> bytes:
+    """A mono WAV tone to use as every voice's sample."""
+    wav_format = WavFormat(1, rate, 16)
+    pcm = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 220 * i / rate)))
+        for i in range(int(seconds * rate))
+    )
+    return wav_header(wav_format, len(pcm)) + pcm
+
+
+def build_library(voices_dir: pathlib.Path, count: int) -> list[str]:
+    """Create `count` voices (WAV sample + transcript) and return their ids."""
+    sample = voice_sample()
+    voice_ids = []
+    for i in range(count):
+        voice_id = f"bench_{i:04d}"
+        voice_dir = voices_dir / voice_id
+        voice_dir.mkdir(parents=True)
+        (voice_dir / f"{voice_id}.wav").write_bytes(sample)
+        (voice_dir / f"{voice_id}.txt").write_text(SENTENCES[i % len(SENTENCES)])
+        voice_ids.append(voice_id)
+    return voice_ids
+
+
+class Servers:
+    """A fake S2 and a plomtts server running as child processes."""
+
+    def __init__(self, workdir: pathlib.Path, args: argparse.Namespace, log):
+        """Pick ports and directories; nothing starts until `start()`."""
+        self.workdir = workdir
+        self.args = args
+        self.log = log
+        self.s2_port = free_port()
+        self.port = free_port()
+        self.s2_url = f"http://127.0.0.1:{self.s2_port}"
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.processes: list[subprocess.Popen] = []
+
+    def _spawn(self, command: list[str], env: dict) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, *command],
+            cwd=ROOT,
+            env={**os.environ, **env},
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+        )
+        self.processes.append(process)
+        return process
+
+    def start(self) -> subprocess.Popen:
+        """Launch both servers; returns the plomtts process."""
+        fake_s2 = ["-m", "benchmarks.fake_s2", "--port", str(self.s2_port)]
+        fake_s2 += ["--latency", str(self.args.latency)]
+        fake_s2 += ["--jitter", str(self.args.jitter)]
+        fake_s2 += ["--audio-seconds", str(self.args.audio_seconds)]
+        fake_s2 += ["--slots", str(self.args.slots)]
+        self._spawn(fake_s2, {})
+
+        plomtts = ["-m", "uvicorn", "server.main:app", "--host", "127.0.0.1"]
+        plomtts += ["--port", str(self.port), "--log-level", "warning"]
+        return self._spawn(
+            plomtts,
+            {
+                "FISH_SPEECH_BACKENDS": self.s2_url,
+                "FISH_SPEECH_MAX_CONCURRENCY": str(self.args.slots),
+                "PLOMTTS_VOICES_DIR": str(self.workdir / "voices"),
+                "PLOMTTS_AUDIO_CACHE_DIR": str(self.workdir / "cache" / "audio"),
+                "PLOMTTS_BATCH_DIR": str(self.workdir / "cache" / "batch"),
+                # Keep warm-up generations out of the measured S2 counters.
+                "PLOMTTS_WARMUP": "false",
+            },
+        )
+
+    async def wait_ready(self, client: httpx.AsyncClient, voices: int) -> None:
+        """Wait until plomtts answers and every voice reference is prepared."""
+        deadline = time.monotonic() + STARTUP_TIMEOUT + voices * 0.2
+        while time.monotonic() < deadline:
+            if any(p.poll() is not None for p in self.processes):
+                raise RuntimeError("a server process exited during startup")
+            try:
+                response = await client.get(f"{self.url}/voices")
+                listed = response.json()["voices"]
+                if len(listed) == voices and all(
+                    v["status"] == "ready" for v in listed
+                ):
+                    return
+            except (httpx.HTTPError, KeyError, ValueError):
+                pass
+            await asyncio.sleep(0.25)
+        raise TimeoutError("plomtts did not become ready in time")
+
+    async def s2_stats(self, client: httpx.AsyncClient) -> dict:
+        """Counters reported by the fake S2."""
+        return (await client.get(f"{self.s2_url}/stats")).json()
+
+    def stop(self) -> None:
+        """Terminate both servers."""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def _sample_rss(pid: int, samples: list[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        rss = rss_bytes(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_SECONDS)
+        except TimeoutError:
+            pass
+
+
+async def drive(
+    client: httpx.AsyncClient, base_url: str, scenario: Scenario, voice_ids: list[str]
+) -> tuple[list[float], dict[str, int], float]:
+    """Send the scenario's requests; return latencies, status counts, wall time."""
+    semaphore = asyncio.Semaphore(scenario.concurrency)
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+
+    async def one(index: int) -> None:
+        path, body = scenario.build(index, voice_ids)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}{path}", json=body)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == "200":
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(scenario.requests)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def run_scenario(scenario: Scenario, args: argparse.Namespace, log) -> dict:
+    """Start fresh servers, run one scenario and summarise it."""
+    with tempfile.TemporaryDirectory(prefix="plomtts-bench-") as tmp:
+        workdir = pathlib.Path(tmp)
+        voice_ids = build_library(workdir / "voices", scenario.voices)
+        servers = Servers(workdir, args, log)
+        server = servers.start()
+        try:
+            limits = httpx.Limits(max_connections=scenario.concurrency + 4)
+            timeout = httpx.Timeout(args.timeout)
+            async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+                startup = time.perf_counter()
+                await servers.wait_ready(client, scenario.voices)
+                startup = time.perf_counter() - startup
+
+                rss_samples: list[int] = []
+                stop = asyncio.Event()
+                sampler = asyncio.create_task(
+                    _sample_rss(server.pid, rss_samples, stop)
+                )
+                latencies, statuses, wall = await drive(
+                    client, servers.url, scenario, voice_ids
+                )
+                stop.set()
+                await sampler
+                s2 = await servers.s2_stats(client)
+                rss_end = rss_bytes(server.pid)
+        finally:
+            servers.stop()
+
+    ok = statuses.get("200", 0)
+    return {
+        "description": scenario.description,
+        "voices": scenario.voices,
+        "requests": scenario.requests,
+        "concurrency": scenario.concurrency,
+        "startup_seconds": round(startup, 3),
+        "wall_seconds": round(wall, 3),
+        "rps": round(ok / wall, 2) if wall else None,
+        "latency_ms": {f"p{q}": _ms(percentile(latencies, q)) for q in (50, 95, 99)},
+        "statuses": dict(sorted(statuses.items())),
+        "s2_requests": s2["requests"],
+        "rss_peak_bytes": max(rss_samples, default=None),
+        "rss_end_bytes": rss_end,
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _mb(value: Optional[int]) -> str:
+    return "n/a" if value is None else f"{value / (1024 * 1024):.1f}MB"
+
+
+def print_result(name: str, result: dict) -> None:
+    """One summary line per scenario."""
+    latency = result["latency_ms"]
+    print(
+        f"{name:<15}{result['rps']:>8} rps"
+        f"  p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms"
+        f"  S2 calls {result['s2_requests']}"
+        f"  RSS peak {_mb(result['rss_peak_bytes'])}"
+        f"  statuses {result['statuses']}"
+    )
+
+
+# (metric path, True if larger is better)
+COMPARED = [
+    (("latency_ms", "p95"), False),
+    (("rps",), True),
+    (("rss_peak_bytes",), False),
+]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print changes against `baseline`; False if anything regressed past tolerance."""
+    passed = True
+    for name, result in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for path, higher_is_better in COMPARED:
+            old, new = before, result
+            for key in path:
+                old, new = old.get(key), new.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change if higher_is_better else change
+            flag = "❌" if regressed > tolerance else "✅"
+            passed = passed and regressed <= tolerance
+            print(
+                f"{flag} {name:<15}{'.'.join(path):<16}{old:>14} -> {new:<14}"
+                f"{change:+.1%}"
+            )
+    return passed
+
+
+def _git_revision() -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.stdout.strip() or None
+
+
+def main() -> None:
+    """Run the selected scenarios, then save and/or compare baselines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run (repeatable; default: all)",
+    )
+    add_fake_s2_arguments(parser)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--save", type=pathlib.Path, help="write results as JSON")
+    parser.add_argument("--compare", type=pathlib.Path, help="baseline JSON to diff")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--server-log", type=pathlib.Path, help="append server output to this file"
+    )
+    args = parser.parse_args()
+
+    scenarios: dict[str, dict] = {}
+    results = {
+        "created_at": datetime.now().isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "fake_s2": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "audio_seconds": args.audio_seconds,
+            "slots": args.slots,
+        },
+        "scenarios": scenarios,
+    }
+    with contextlib.ExitStack() as stack:
+        log = (
+            stack.enter_context(open(args.server_log, "a"))
+            if args.server_log
+            else subprocess.DEVNULL
+        )
+        for name in args.scenario or list(SCENARIOS):
+            result = asyncio.run(run_scenario(SCENARIOS[name], args, log))
+            scenarios[name] = result
+            print_result(name, result)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"📁 Saved results to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("fake_s2") != results["fake_s2"]:
+            print("⚠️  Baseline was recorded with different fake S2 settings")
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
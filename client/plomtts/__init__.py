@@ -1,5 +1,6 @@
 """PlomTTS Python Client - AI Text-to-Speech client library."""
 
+from .async_client import AsyncTTSClient
 from .client import TTSClient
 from .exceptions import (
     TTSConnectionError,
@@ -21,6 +22,7 @@ from .models import (
 __version__ = "0.1.0"
 __all__ = [
     "TTSClient",
+    "AsyncTTSClient",
     "TTSError",
     "TTSConnectionError",
     "TTSNotFoundError",
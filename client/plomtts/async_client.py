@@ -0,0 +1,353 @@
+"""PlomTTS asyncio Python Client."""
+
+import asyncio
+import io
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Iterable, Iterator, Optional, Union
+
+import httpx
+
+from .client import _dialogue_request, _parse, _speech_request
+from .exceptions import (
+    TTSConnectionError,
+    TTSError,
+    TTSNotFoundError,
+    TTSServerError,
+    TTSValidationError,
+)
+from .models import TTSRequest, VoiceListResponse, VoiceResponse
+from .upload import MultipartUpload
+
+
+def _check(response: httpx.Response) -> None:
+    """Raise the matching TTSError for an error response."""
+    if response.status_code == 404:
+        raise TTSNotFoundError(f"Resource not found: {response.text}", status_code=404)
+    if response.status_code == 400:
+        raise TTSValidationError(f"Validation error: {response.text}", status_code=400)
+    if 500 <= response.status_code < 600:
+        raise TTSServerError(
+            f"Server error: {response.text}", status_code=response.status_code
+        )
+    response.raise_for_status()
+
+
+@contextmanager
+def _translate_errors() -> Iterator[None]:
+    """Turn httpx transport errors into TTSErrors."""
+    try:
+        yield
+    except httpx.ConnectError as e:
+        raise TTSConnectionError(f"Failed to connect to server: {e}") from e
+    except httpx.TimeoutException as e:
+        raise TTSConnectionError(f"Request timeout: {e}") from e
+    except httpx.HTTPError as e:
+        raise TTSError(f"Request failed: {e}") from e
+
+
+class AsyncTTSClient:
+    """Asyncio client for interacting with PlomTTS server.
+
+    Mirrors `TTSClient`, but every call is a coroutine sharing one pooled
+    `httpx.AsyncClient`, so hundreds of generations can be in flight without
+    threads.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8420",
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        pool_size: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """Initialize PlomTTS async client.
+
+        Args:
+            base_url: Base URL of the PlomTTS server
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of connection retry attempts
+            pool_size: Maximum number of pooled connections to the server
+            transport: Custom httpx transport (overrides pool_size and max_retries)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            transport=transport
+            or httpx.AsyncHTTPTransport(retries=max_retries, limits=limits),
+        )
+
+    async def _make_request(
+        self, method: str, endpoint: str, **kwargs
+    ) -> httpx.Response:
+        """Make HTTP request with error handling."""
+        with _translate_errors():
+            response = await self.http.request(method, endpoint, **kwargs)
+            _check(response)
+            return response
+
+    async def health(self) -> dict[str, Any]:
+        """Check server health status."""
+        response = await self._make_request("GET", "/health")
+        return dict(response.json())
+
+    async def list_voices(self) -> VoiceListResponse:
+        """List all available voices."""
+        response = await self._make_request("GET", "/voices")
+        return _parse(VoiceListResponse, response.json())
+
+    async def get_voice(self, voice_id: str) -> VoiceResponse:
+        """Get details of a specific voice."""
+        response = await self._make_request("GET", f"/voices/{voice_id}")
+        return _parse(VoiceResponse, response.json())
+
+    async def create_voice(
+        self,
+        name: str,
+        audio: Union[str, Path, BinaryIO, bytes],
+        transcript: Optional[str] = None,
+        audio_filename: Optional[str] = None,
+    ) -> VoiceResponse:
+        """Create a new voice from audio file.
+
+        Paths and file objects are streamed while the request is sent rather than
+        read into memory first.
+
+        Args:
+            name: Voice name/identifier
+            audio: Audio file path, Path object, file-like object, or bytes
+            transcript: Optional transcript text
+            audio_filename: Filename for audio (required if audio is BinaryIO or bytes)
+        """
+        if isinstance(audio, (str, Path)):
+            audio_path = Path(audio)
+            if not audio_path.exists():
+                raise TTSValidationError(f"Audio file not found: {audio}")
+
+            with open(audio_path, "rb") as f:
+                return await self._upload_voice(
+                    name, audio_filename or audio_path.name, f, transcript
+                )
+
+        if not audio_filename:
+            raise TTSValidationError(
+                "audio_filename is required when audio is a file-like object or bytes"
+            )
+        if isinstance(audio, (bytes, bytearray)):
+            return await self._upload_voice(
+                name, audio_filename, io.BytesIO(audio), transcript
+            )
+
+        start = audio.tell() if hasattr(audio, "seek") else None
+        try:
+            return await self._upload_voice(name, audio_filename, audio, transcript)
+        finally:
+            if start is not None:
+                audio.seek(start)  # Reset position for potential reuse
+
+    async def _upload_voice(
+        self,
+        name: str,
+        filename: str,
+        fileobj: BinaryIO,
+        transcript: Optional[str],
+    ) -> VoiceResponse:
+        """POST a voice as a streamed multipart body."""
+        fields = {"name": name}
+        if transcript:
+            fields["transcript"] = transcript
+        body = MultipartUpload(fields, "audio", filename, fileobj, "audio/mpeg")
+        response = await self._make_request(
+            "POST",
+            "/voices",
+            content=body.aiter_bytes(),
+            headers={
+                "Content-Type": body.content_type,
+                "Content-Length": str(len(body)),
+            },
+        )
+        return _parse(VoiceResponse, response.json())
+
+    async def delete_voice(self, voice_id: str) -> dict[str, Any]:
+        """Delete a voice."""
+        response = await self._make_request("DELETE", f"/voices/{voice_id}")
+        return dict(response.json())
+
+    async def generate_speech(
+        self,
+        text: str,
+        voice_id: str,
+        max_new_tokens: int = 0,
+        chunk_length: int = 200,
+        top_p: float = 0.7,
+        repetition_penalty: float = 1.2,
+        temperature: float = 0.7,
+        seed: int = 0,
+        output_format: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        channels: int = 1,
+    ) -> bytes:  # pylint: disable=too-many-arguments
+        """Generate speech and return audio data (see `TTSClient.generate_speech`)."""
+        request_data = _speech_request(
+            text,
+            voice_id,
+            max_new_tokens=max_new_tokens,
+            chunk_length=chunk_length,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            temperature=temperature,
+            seed=seed,
+            output_format=output_format,
+            sample_rate=sample_rate,
+            channels=channels,
+        )
+        return await self._post_speech(request_data)
+
+    async def _post_speech(self, request_data: TTSRequest) -> bytes:
+        response = await self._make_request(
+            "POST", "/tts", json=request_data.model_dump()
+        )
+        return response.content
+
+    async def generate_dialogue(
+        self,
+        turns: list,
+        max_new_tokens: int = 0,
+        chunk_length: int = 200,
+        top_p: float = 0.7,
+        repetition_penalty: float = 1.2,
+        temperature: float = 0.7,
+        seed: int = 0,
+        output_format: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        channels: int = 1,
+    ) -> bytes:  # pylint: disable=too-many-arguments
+        """Generate a multi-speaker dialogue (see `TTSClient.generate_dialogue`)."""
+        request_data = _dialogue_request(
+            turns,
+            max_new_tokens=max_new_tokens,
+            chunk_length=chunk_length,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            temperature=temperature,
+            seed=seed,
+            output_format=output_format,
+            sample_rate=sample_rate,
+            channels=channels,
+        )
+        response = await self._make_request(
+            "POST", "/tts/multi", json=request_data.model_dump()
+        )
+        return response.content
+
+    async def save_speech_to_file(
+        self, text: str, voice_id: str, output_path: Union[str, Path], **kwargs
+    ) -> Path:
+        """Generate speech and save to file.
+
+        Audio is written chunk by chunk as it arrives, so memory use does not grow
+        with the length of the clip.
+
+        Args:
+            text: Text to convert to speech
+            voice_id: Voice ID to use
+            output_path: Path to save audio file
+            **kwargs: Additional parameters for generate_speech
+
+        Returns:
+            Path to saved file
+        """
+        request_data = _speech_request(text, voice_id, **kwargs)
+        output_path = Path(output_path)
+        with _translate_errors():
+            async with self.http.stream(
+                "POST", "/tts", json=request_data.model_dump()
+            ) as response:
+                # Fail before touching the file if the request itself is rejected.
+                if response.is_error:
+                    await response.aread()
+                _check(response)
+
+                await asyncio.to_thread(
+                    output_path.parent.mkdir, parents=True, exist_ok=True
+                )
+                f = await asyncio.to_thread(open, output_path, "wb")
+                try:
+                    async for chunk in response.aiter_bytes():
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+        return output_path
+
+    async def generate_many(
+        self,
+        requests: Iterable[Union[TTSRequest, dict]],
+        concurrency: int = 4,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[tuple[int, Union[bytes, TTSError]]]:
+        """Generate many clips with at most `concurrency` requests in flight.
+
+        Args:
+            requests: `TTSRequest` objects or dicts of `generate_speech` arguments
+            concurrency: Maximum simultaneous requests
+            return_exceptions: Yield a failed item's TTSError instead of raising it
+
+        Yields:
+            (index, audio bytes) pairs in completion order, where index is the
+            item's position in `requests`.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        items = iter(enumerate(requests))
+        pending: dict[asyncio.Task, int] = {}
+
+        def fill() -> None:
+            while len(pending) < concurrency:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    return
+                if not isinstance(item, TTSRequest):
+                    item = _speech_request(**item)
+                pending[asyncio.ensure_future(self._post_speech(item))] = index
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        yield index, task.result()
+                    except TTSError as e:
+                        if not return_exceptions:
+                            raise
+                        yield index, e
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
@@ -1,7 +1,8 @@
 """PlomTTS Python Client."""
 
+import io
 from pathlib import Path
-from typing import Any, BinaryIO, Optional, Union
+from typing import Any, BinaryIO, Iterator, Optional, Union
 from urllib.parse import urljoin
 
 import requests
@@ -20,6 +21,39 @@ from .models import (
     VoiceListResponse,
     VoiceResponse,
 )
+from .upload import MultipartUpload
+
+
+def _speech_request(text: str, voice_id: str, **params: Any) -> TTSRequest:
+    """Validate single-voice generation parameters."""
+    try:
+        return TTSRequest(text=text, voice_id=voice_id, **params)
+    except ValidationError as e:
+        raise TTSValidationError(f"Invalid request parameters: {e}") from e
+
+
+def _dialogue_request(turns: list, **params: Any) -> MultiTTSRequest:
+    """Validate dialogue turns ({"voice_id", "text"} dicts or tuples) and params."""
+    normalized = [
+        {"voice_id": t[0], "text": t[1]} if isinstance(t, (tuple, list)) else t
+        for t in turns
+    ]
+    try:
+        return MultiTTSRequest.model_validate({"turns": normalized, **params})
+    except ValidationError as e:
+        raise TTSValidationError(f"Invalid request parameters: {e}") from e
+
+
+def _parse(model: Any, payload: Any) -> Any:
+    """Build a response model, mapping schema mismatches to TTSValidationError."""
+    try:
+        return model(**payload)
+    except ValidationError as e:
+        raise TTSValidationError(f"Invalid response format: {e}") from e
+
+
+# Bytes per chunk yielded by the streaming download methods.
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class TTSClient:
@@ -89,18 +123,12 @@ class TTSClient:
     def list_voices(self) -> VoiceListResponse:
         """List all available voices."""
         response = self._make_request("GET", "/voices")
-        try:
-            return VoiceListResponse(**response.json())
-        except ValidationError as e:
-            raise TTSValidationError(f"Invalid response format: {e}") from e
+        return _parse(VoiceListResponse, response.json())
 
     def get_voice(self, voice_id: str) -> VoiceResponse:
         """Get details of a specific voice."""
         response = self._make_request("GET", f"/voices/{voice_id}")
-        try:
-            return VoiceResponse(**response.json())
-        except ValidationError as e:
-            raise TTSValidationError(f"Invalid response format: {e}") from e
+        return _parse(VoiceResponse, response.json())
 
     def create_voice(
         self,
@@ -111,49 +139,57 @@ class TTSClient:
     ) -> VoiceResponse:
         """Create a new voice from audio file.
 
+        Paths and file objects are streamed while the request is sent rather than
+        read into memory first.
+
         Args:
             name: Voice name/identifier
             audio: Audio file path, Path object, file-like object, or bytes
             transcript: Optional transcript text
             audio_filename: Filename for audio (required if audio is BinaryIO or bytes)
         """
-        # Handle different audio input types
         if isinstance(audio, (str, Path)):
             audio_path = Path(audio)
             if not audio_path.exists():
                 raise TTSValidationError(f"Audio file not found: {audio}")
 
             with open(audio_path, "rb") as f:
-                audio_data = f.read()
-            filename = audio_filename or audio_path.name
-        else:
-            # Handle file-like object or bytes
-            if hasattr(audio, "read"):
-                # It's a file-like object
-                audio_data = audio.read()
-                if hasattr(audio, "seek"):
-                    audio.seek(0)  # Reset position for potential reuse
-            else:
-                # It's bytes
-                audio_data = audio
-
-            if not audio_filename:
-                raise TTSValidationError(
-                    "audio_filename is required when audio is a file-like object or bytes"
+                return self._upload_voice(
+                    name, audio_filename or audio_path.name, f, transcript
                 )
-            filename = audio_filename
 
-        # Prepare multipart form data
-        files = {"audio": (filename, audio_data, "audio/mpeg")}
-        data = {"name": name}
-        if transcript:
-            data["transcript"] = transcript
+        if not audio_filename:
+            raise TTSValidationError(
+                "audio_filename is required when audio is a file-like object or bytes"
+            )
+        if isinstance(audio, (bytes, bytearray)):
+            return self._upload_voice(
+                name, audio_filename, io.BytesIO(audio), transcript
+            )
 
-        response = self._make_request("POST", "/voices", files=files, data=data)
+        start = audio.tell() if hasattr(audio, "seek") else None
         try:
-            return VoiceResponse(**response.json())
-        except ValidationError as e:
-            raise TTSValidationError(f"Invalid response format: {e}") from e
+            return self._upload_voice(name, audio_filename, audio, transcript)
+        finally:
+            if start is not None:
+                audio.seek(start)  # Reset position for potential reuse
+
+    def _upload_voice(
+        self,
+        name: str,
+        filename: str,
+        fileobj: BinaryIO,
+        transcript: Optional[str],
+    ) -> VoiceResponse:
+        """POST a voice as a streamed multipart body."""
+        fields = {"name": name}
+        if transcript:
+            fields["transcript"] = transcript
+        body = MultipartUpload(fields, "audio", filename, fileobj, "audio/mpeg")
+        response = self._make_request(
+            "POST", "/voices", data=body, headers={"Content-Type": body.content_type}
+        )
+        return _parse(VoiceResponse, response.json())
 
     def delete_voice(self, voice_id: str) -> dict[str, Any]:
         """Delete a voice."""
@@ -170,6 +206,9 @@ class TTSClient:
         repetition_penalty: float = 1.2,
         temperature: float = 0.7,
         seed: int = 0,
+        output_format: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        channels: int = 1,
     ) -> bytes:  # pylint: disable=too-many-arguments
         """Generate speech and return audio data.
 
@@ -182,24 +221,27 @@ class TTSClient:
             repetition_penalty: Repetition penalty
             temperature: Temperature for sampling
             seed: Random seed (0 for random)
+            output_format: mp3 (default), wav, pcm, opus, ogg or flac
+            sample_rate: Output sample rate in Hz (wav/pcm; default: server's)
+            channels: Output channels, 1 or 2 (wav, pcm, flac)
 
         Returns:
             Audio data as bytes
         """
         # Validate request using Pydantic model
-        try:
-            request_data = TTSRequest(
-                text=text,
-                voice_id=voice_id,
-                max_new_tokens=max_new_tokens,
-                chunk_length=chunk_length,
-                top_p=top_p,
-                repetition_penalty=repetition_penalty,
-                temperature=temperature,
-                seed=seed,
-            )
-        except ValidationError as e:
-            raise TTSValidationError(f"Invalid request parameters: {e}") from e
+        request_data = _speech_request(
+            text,
+            voice_id,
+            max_new_tokens=max_new_tokens,
+            chunk_length=chunk_length,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            temperature=temperature,
+            seed=seed,
+            output_format=output_format,
+            sample_rate=sample_rate,
+            channels=channels,
+        )
 
         response = self._make_request(
             "POST",
@@ -210,6 +252,31 @@ class TTSClient:
 
         return response.content
 
+    def stream_speech(
+        self,
+        text: str,
+        voice_id: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        live: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[bytes]:
+        """Generate speech and yield the audio as it arrives.
+
+        Args:
+            text: Text to convert to speech
+            voice_id: Voice ID to use
+            chunk_size: Maximum bytes per yielded chunk
+            live: Use `/tts/stream`, which sends WAV while S2 is still generating,
+                instead of the mp3 from `/tts`
+            **kwargs: Sampling parameters as for generate_speech
+
+        Yields:
+            Audio data chunks
+        """
+        request_data = _speech_request(text, voice_id, **kwargs)
+        endpoint = "/tts/stream" if live else "/tts"
+        yield from self._stream(endpoint, request_data.model_dump(), chunk_size)
+
     def generate_dialogue(
         self,
         turns: list,
@@ -219,6 +286,9 @@ class TTSClient:
         repetition_penalty: float = 1.2,
         temperature: float = 0.7,
         seed: int = 0,
+        output_format: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        channels: int = 1,
     ) -> bytes:  # pylint: disable=too-many-arguments
         """Generate a multi-speaker dialogue and return audio data.
 
@@ -228,26 +298,24 @@ class TTSClient:
                 S2 speaker; the whole dialogue is generated in a single call.
             max_new_tokens, chunk_length, top_p, repetition_penalty, temperature, seed:
                 Shared sampling parameters.
+            output_format, sample_rate, channels: Output encoding, as for
+                generate_speech.
 
         Returns:
-            Audio data as bytes (mp3).
+            Audio data as bytes (mp3 unless output_format says otherwise).
         """
-        normalized = [
-            {"voice_id": t[0], "text": t[1]} if isinstance(t, (tuple, list)) else t
-            for t in turns
-        ]
-        try:
-            request_data = MultiTTSRequest(
-                turns=normalized,
-                max_new_tokens=max_new_tokens,
-                chunk_length=chunk_length,
-                top_p=top_p,
-                repetition_penalty=repetition_penalty,
-                temperature=temperature,
-                seed=seed,
-            )
-        except ValidationError as e:
-            raise TTSValidationError(f"Invalid request parameters: {e}") from e
+        request_data = _dialogue_request(
+            turns,
+            max_new_tokens=max_new_tokens,
+            chunk_length=chunk_length,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            temperature=temperature,
+            seed=seed,
+            output_format=output_format,
+            sample_rate=sample_rate,
+            channels=channels,
+        )
 
         response = self._make_request(
             "POST",
@@ -258,27 +326,75 @@ class TTSClient:
 
         return response.content
 
+    def stream_dialogue(
+        self,
+        turns: list,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        live: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[bytes]:
+        """Generate a multi-speaker dialogue and yield the audio as it arrives.
+
+        Args:
+            turns: Dialogue turns as for generate_dialogue
+            chunk_size: Maximum bytes per yielded chunk
+            live: Use `/tts/multi/stream` (WAV while generating) instead of the
+                mp3 from `/tts/multi`
+            **kwargs: Sampling parameters as for generate_dialogue
+
+        Yields:
+            Audio data chunks
+        """
+        request_data = _dialogue_request(turns, **kwargs)
+        endpoint = "/tts/multi/stream" if live else "/tts/multi"
+        yield from self._stream(endpoint, request_data.model_dump(), chunk_size)
+
+    def _stream(self, endpoint: str, payload: dict, chunk_size: int) -> Iterator[bytes]:
+        """POST `payload` and yield the response body without buffering it."""
+        response = self._make_request(
+            "POST",
+            endpoint,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            stream=True,
+        )
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        except requests.exceptions.RequestException as e:
+            raise TTSConnectionError(f"Stream interrupted: {e}") from e
+        finally:
+            response.close()
+
     def save_speech_to_file(
         self, text: str, voice_id: str, output_path: Union[str, Path], **kwargs
     ) -> Path:
         """Generate speech and save to file.
 
+        Audio is written chunk by chunk as it arrives, so memory use does not grow
+        with the length of the clip.
+
         Args:
             text: Text to convert to speech
             voice_id: Voice ID to use
             output_path: Path to save audio file
-            **kwargs: Additional parameters for generate_speech
+            **kwargs: Additional parameters for stream_speech
 
         Returns:
             Path to saved file
         """
-        audio_data = self.generate_speech(text, voice_id, **kwargs)
+        chunks = self.stream_speech(text, voice_id, **kwargs)
+        # Fail before touching the file if the request itself is rejected.
+        first = next(chunks, b"")
 
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(output_path, "wb") as f:
-            f.write(audio_data)
+            f.write(first)
+            for chunk in chunks:
+                f.write(chunk)
 
         return output_path
 
@@ -1,9 +1,20 @@
 """Pydantic models for PlomTTS client."""
 
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
+# Audio encodings the server can return; pcm is raw 16-bit little-endian samples.
+AudioFormat = Literal["mp3", "wav", "pcm", "opus", "ogg", "flac"]
+
+
+class ReferenceInfo(BaseModel):
+    """The preprocessed reference clip sent to Fish Audio S2."""
+
+    duration_seconds: float = Field(..., description="Clip duration in seconds")
+    sample_rate: int = Field(..., description="Clip sample rate in Hz")
+    channels: int = Field(..., description="Number of audio channels")
+
 
 class VoiceResponse(BaseModel):
     """Response model for voice information."""
@@ -14,6 +25,13 @@ class VoiceResponse(BaseModel):
     audio_format: str = Field(..., description="Audio file format (mp3, wav, etc.)")
     created_at: Optional[str] = Field(None, description="Creation timestamp")
     avatar_url: Optional[str] = Field(None, description="Avatar image URL")
+    status: Optional[str] = Field(
+        None,
+        description="Reference preprocessing state: pending, processing, ready, failed",
+    )
+    reference: Optional[ReferenceInfo] = Field(
+        None, description="Preprocessed reference clip, once ready"
+    )
 
 
 class VoiceListResponse(BaseModel):
@@ -43,14 +61,25 @@ class TTSRequest(BaseModel):
     )
     seed: int = Field(0, description="Random seed (0 for random)")
 
+    # Output encoding; None lets the server pick (mp3, or wav when streaming)
+    output_format: Optional[AudioFormat] = Field(
+        None, description="mp3, wav, pcm, opus, ogg or flac"
+    )
+    sample_rate: Optional[int] = Field(
+        None, description="Output sample rate in Hz", ge=8000, le=48000
+    )
+    channels: int = Field(1, description="Output channels (wav, pcm, flac)", ge=1, le=2)
+
 
 class DialogueTurn(BaseModel):
     """One turn in a multi-speaker dialogue."""
 
     voice_id: str = Field(..., description="Voice ID for this turn")
     text: str = Field(
-        ..., description="Text for this turn (may include [emotion] tags)",
-        min_length=1, max_length=2500,
+        ...,
+        description="Text for this turn (may include [emotion] tags)",
+        min_length=1,
+        max_length=2500,
     )
 
 
@@ -71,6 +100,15 @@ class MultiTTSRequest(BaseModel):
     )
     seed: int = Field(0, description="Random seed (0 for random)")
 
+    # Output encoding; None lets the server pick (mp3, or wav when streaming)
+    output_format: Optional[AudioFormat] = Field(
+        None, description="mp3, wav, pcm, opus, ogg or flac"
+    )
+    sample_rate: Optional[int] = Field(
+        None, description="Output sample rate in Hz", ge=8000, le=48000
+    )
+    channels: int = Field(1, description="Output channels (wav, pcm, flac)", ge=1, le=2)
+
 
 class TTSResponse(BaseModel):
     """Response model for TTS generation."""
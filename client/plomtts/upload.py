@@ -0,0 +1,92 @@
+"""Streaming multipart/form-data bodies for voice uploads."""
+
+import asyncio
+import io
+import os
+import uuid
+from typing import AsyncIterator, BinaryIO, Iterator, Optional
+
+# Bytes read from the audio file per chunk sent.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _remaining_size(fileobj: BinaryIO) -> Optional[int]:
+    """Bytes left between the current position and the end, if knowable."""
+    try:
+        start = fileobj.tell()
+        end = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(start)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - start
+
+
+class MultipartUpload:
+    """A multipart/form-data body that reads the audio file only while sending.
+
+    `requests` sends file-like bodies in blocks and `httpx` takes `aiter_bytes()`,
+    so the audio is never held in memory whole; the known total length becomes
+    the Content-Length header.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        file_field: str,
+        filename: str,
+        fileobj: BinaryIO,
+        content_type: str = "application/octet-stream",
+    ):
+        """Frame `fields` and the file part around `fileobj`."""
+        boundary = uuid.uuid4().hex
+        filename = filename.replace('"', "%22")
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+            for name, value in fields.items()
+        )
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; '
+            f'filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        size = _remaining_size(fileobj)
+        if size is None:
+            # Unseekable stream: its length is needed up front, so buffer it.
+            fileobj = io.BytesIO(fileobj.read())
+            size = len(fileobj.getbuffer())
+
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    def __len__(self) -> int:
+        """Total body size in bytes."""
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes of the body (all remaining if negative)."""
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield the body in chunks."""
+        while chunk := self.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        """Yield the body in chunks, reading the file in a worker thread."""
+        while chunk := await asyncio.to_thread(self.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
@@ -13,6 +13,7 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "requests>=2.31.0",
+        "httpx>=0.25.0",
         "pydantic>=2.0.0",
     ],
     extras_require={
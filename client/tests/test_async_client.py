@@ -0,0 +1,249 @@
+"""Tests for the asyncio PlomTTS client."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from plomtts import (
+    AsyncTTSClient,
+    TTSConnectionError,
+    TTSNotFoundError,
+    TTSRequest,
+    TTSServerError,
+    VoiceListResponse,
+    VoiceResponse,
+)
+
+VOICE = {
+    "id": "test_voice",
+    "name": "Test Voice",
+    "has_transcript": True,
+    "audio_format": "mp3",
+    "created_at": "2024-01-01T00:00:00Z",
+}
+
+
+def make_client(handler) -> AsyncTTSClient:
+    """Client whose requests are answered by `handler` instead of a server."""
+    return AsyncTTSClient(transport=httpx.MockTransport(handler))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncVoices:
+    """Voice management over the async client."""
+
+    def test_list_voices(self):
+        def handler(request):
+            assert request.url.path == "/voices"
+            return httpx.Response(200, json={"voices": [VOICE], "total": 1})
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.list_voices()
+
+        result = run(scenario())
+        assert isinstance(result, VoiceListResponse)
+        assert result.voices[0].id == "test_voice"
+
+    def test_get_voice_not_found(self):
+        def handler(request):
+            return httpx.Response(404, text="Voice not found")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                await client.get_voice("missing")
+
+        with pytest.raises(TTSNotFoundError):
+            run(scenario())
+
+    def test_create_voice_from_bytes(self):
+        def handler(request):
+            body = request.read()
+            assert b'name="name"' in body and b"my_voice" in body
+            assert b"fake audio" in body
+            return httpx.Response(200, json=VOICE)
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.create_voice(
+                    "my_voice", b"fake audio", audio_filename="sample.mp3"
+                )
+
+        assert isinstance(run(scenario()), VoiceResponse)
+
+    def test_create_voice_streams_file(self, tmp_path):
+        sample = tmp_path / "sample.mp3"
+        sample.write_bytes(b"a" * 200_000)
+
+        def handler(request):
+            assert isinstance(request.stream, httpx.AsyncByteStream)
+            assert "Transfer-Encoding" not in request.headers
+            body = request.content
+            assert int(request.headers["Content-Length"]) == len(body)
+            assert b'filename="sample.mp3"' in body and b"a" * 200_000 in body
+            return httpx.Response(200, json=VOICE)
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.create_voice("my_voice", sample)
+
+        assert isinstance(run(scenario()), VoiceResponse)
+
+
+class TestAsyncGeneration:
+    """Speech generation over the async client."""
+
+    def test_generate_speech(self):
+        def handler(request):
+            payload = json.loads(request.content)
+            assert payload["voice_id"] == "test_voice"
+            return httpx.Response(200, content=b"mp3 bytes")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.generate_speech("Hello", "test_voice")
+
+        assert run(scenario()) == b"mp3 bytes"
+
+    def test_server_error(self):
+        def handler(request):
+            return httpx.Response(503, text="busy")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                await client.generate_speech("Hello", "test_voice")
+
+        with pytest.raises(TTSServerError):
+            run(scenario())
+
+    def test_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                await client.generate_speech("Hello", "test_voice")
+
+        with pytest.raises(TTSConnectionError):
+            run(scenario())
+
+    def test_save_speech_to_file(self, tmp_path):
+        def handler(request):
+            return httpx.Response(200, content=b"mp3 bytes")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.save_speech_to_file(
+                    "Hello", "test_voice", tmp_path / "out" / "hello.mp3"
+                )
+
+        path = run(scenario())
+        assert path.read_bytes() == b"mp3 bytes"
+
+    def test_save_speech_to_file_writes_chunks_as_they_arrive(self, tmp_path):
+        output = tmp_path / "hello.mp3"
+        chunk = b"x" * 65536  # larger than the file buffer, so written through
+        on_disk = []
+
+        async def body():
+            for _ in range(3):
+                yield chunk
+                # The previous chunk is on disk before the next one is sent.
+                await asyncio.sleep(0.01)
+                on_disk.append(output.stat().st_size)
+
+        def handler(request):
+            return httpx.Response(200, content=body())
+
+        async def scenario():
+            async with make_client(handler) as client:
+                return await client.save_speech_to_file("Hello", "test_voice", output)
+
+        assert run(scenario()).read_bytes() == chunk * 3
+        assert on_disk == [len(chunk), 2 * len(chunk), 3 * len(chunk)]
+
+    def test_save_speech_to_file_error_leaves_no_file(self, tmp_path):
+        def handler(request):
+            return httpx.Response(404, text="Voice not found")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                await client.save_speech_to_file(
+                    "Hello", "missing", tmp_path / "hello.mp3"
+                )
+
+        with pytest.raises(TTSNotFoundError):
+            run(scenario())
+        assert not (tmp_path / "hello.mp3").exists()
+
+
+class TestGenerateMany:
+    """Bounded-concurrency bulk generation."""
+
+    def test_bounded_concurrency_and_completion_order(self):
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            text = json.loads(request.content)["text"]
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Earlier items take longer, so completion order is reversed.
+            await asyncio.sleep(0.01 * (10 - int(text)))
+            in_flight -= 1
+            return httpx.Response(200, content=text.encode())
+
+        async def scenario():
+            items = [{"text": str(i), "voice_id": "v"} for i in range(6)]
+            async with make_client(handler) as client:
+                return [
+                    pair async for pair in client.generate_many(items, concurrency=3)
+                ]
+
+        results = run(scenario())
+        assert sorted(results) == [(i, str(i).encode()) for i in range(6)]
+        assert [index for index, _ in results] != list(range(6))
+        assert peak == 3
+
+    def test_return_exceptions(self):
+        def handler(request):
+            if json.loads(request.content)["voice_id"] == "missing":
+                return httpx.Response(404, text="Voice not found")
+            return httpx.Response(200, content=b"ok")
+
+        async def scenario():
+            items = [
+                TTSRequest(text="a", voice_id="v"),
+                TTSRequest(text="b", voice_id="missing"),
+            ]
+            async with make_client(handler) as client:
+                return dict(
+                    [
+                        pair
+                        async for pair in client.generate_many(
+                            items, return_exceptions=True
+                        )
+                    ]
+                )
+
+        results = run(scenario())
+        assert results[0] == b"ok"
+        assert isinstance(results[1], TTSNotFoundError)
+
+    def test_failure_raises_by_default(self):
+        def handler(request):
+            return httpx.Response(500, text="boom")
+
+        async def scenario():
+            async with make_client(handler) as client:
+                async for _ in client.generate_many([{"text": "a", "voice_id": "v"}]):
+                    pass
+
+        with pytest.raises(TTSServerError):
+            run(scenario())
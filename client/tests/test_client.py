@@ -18,6 +18,7 @@ from plomtts import (
     VoiceListResponse,
     VoiceResponse,
 )
+from plomtts.upload import MultipartUpload
 
 
 @pytest.fixture
@@ -225,6 +226,38 @@ class TestTTSClient:
         assert isinstance(result, VoiceResponse)
         assert result.id == "test_voice"
 
+    @responses.activate
+    def test_create_voice_streams_body(
+        self, client, mock_voice_response, sample_audio_data
+    ):
+        """Test the upload body is streamed with a known Content-Length."""
+        audio_file = io.BytesIO(b"skip" + sample_audio_data)
+        audio_file.seek(4)
+
+        responses.add(
+            responses.POST,
+            "http://localhost:8420/voices",
+            json=mock_voice_response,
+            status=200,
+        )
+
+        client.create_voice(
+            name="test_voice",
+            audio=audio_file,
+            audio_filename="test.mp3",
+            transcript="Hello",
+        )
+
+        request = responses.calls[0].request
+        body = request.body
+        assert int(request.headers["Content-Length"]) == len(body)
+        assert b'name="name"\r\n\r\ntest_voice\r\n' in body
+        assert b'name="transcript"\r\n\r\nHello\r\n' in body
+        assert b'filename="test.mp3"' in body
+        assert sample_audio_data in body and b"skip" not in body
+        # Position restored for reuse
+        assert audio_file.tell() == 4
+
     def test_create_voice_missing_filename(self, client, sample_audio_data):
         """Test error when filename is missing for file object."""
         audio_file = io.BytesIO(sample_audio_data)
@@ -314,6 +347,34 @@ class TestTTSClient:
         assert request_data["top_p"] == 0.8
         assert request_data["seed"] == 42
 
+    @responses.activate
+    def test_generate_speech_output_format(self, client):
+        """Test requesting raw PCM output."""
+        responses.add(
+            responses.POST,
+            "http://localhost:8420/tts",
+            body=b"\x00\x00" * 160,
+            status=200,
+            headers={"Content-Type": "audio/pcm; rate=16000; channels=1"},
+        )
+
+        client.generate_speech(
+            text="Hello world",
+            voice_id="test_voice",
+            output_format="pcm",
+            sample_rate=16000,
+        )
+
+        request_data = json.loads(responses.calls[0].request.body)
+        assert request_data["output_format"] == "pcm"
+        assert request_data["sample_rate"] == 16000
+        assert request_data["channels"] == 1
+
+        with pytest.raises(TTSValidationError):
+            client.generate_speech(
+                text="Hello world", voice_id="test_voice", output_format="aac"
+            )
+
     def test_generate_speech_invalid_params(self, client):
         """Test speech generation with invalid parameters."""
         with pytest.raises(TTSValidationError):
@@ -347,6 +408,57 @@ class TestTTSClient:
         assert output_file.exists()
         assert output_file.read_bytes() == sample_audio_data
 
+    @responses.activate
+    def test_stream_speech_yields_chunks(self, client):
+        """Test streaming speech download in chunks."""
+        audio = bytes(range(256)) * 40
+        responses.add(
+            responses.POST,
+            "http://localhost:8420/tts",
+            body=audio,
+            status=200,
+        )
+
+        chunks = list(
+            client.stream_speech("Hello world", "test_voice", chunk_size=1024)
+        )
+
+        assert len(chunks) == 10
+        assert all(len(chunk) <= 1024 for chunk in chunks)
+        assert b"".join(chunks) == audio
+
+    @responses.activate
+    def test_stream_dialogue_live_endpoint(self, client):
+        """Test live dialogue streaming hits the streaming endpoint."""
+        responses.add(
+            responses.POST,
+            "http://localhost:8420/tts/multi/stream",
+            body=b"RIFF....WAVE",
+            status=200,
+        )
+
+        turns = [("alice", "Hi."), ("bob", "Hello.")]
+        audio = b"".join(client.stream_dialogue(turns, live=True))
+
+        assert audio == b"RIFF....WAVE"
+        body = json.loads(responses.calls[0].request.body)
+        assert body["turns"][1] == {"voice_id": "bob", "text": "Hello."}
+
+    @responses.activate
+    def test_save_speech_to_file_error_leaves_no_file(self, client, tmp_path):
+        """Test a rejected request does not create the output file."""
+        responses.add(
+            responses.POST,
+            "http://localhost:8420/tts",
+            json={"detail": "Voice not found"},
+            status=404,
+        )
+
+        output_file = tmp_path / "output.mp3"
+        with pytest.raises(TTSNotFoundError):
+            client.save_speech_to_file("Hello", "missing", output_file)
+        assert not output_file.exists()
+
     @responses.activate
     def test_server_error_handling(self, client):
         """Test handling of server errors."""
@@ -403,6 +515,25 @@ class TestTTSClient:
             mock_close.assert_called_once()
 
 
+class TestMultipartUpload:
+    """Test the streamed multipart body."""
+
+    def test_reads_in_chunks(self):
+        """Test chunked reads reproduce the whole body and its length."""
+        audio = bytes(range(256)) * 100
+        body = MultipartUpload({"name": "v"}, "audio", "a.mp3", io.BytesIO(audio))
+
+        chunks = []
+        while chunk := body.read(1000):
+            assert len(chunk) <= 1000
+            chunks.append(chunk)
+
+        data = b"".join(chunks)
+        assert len(data) == len(body)
+        assert audio in data
+        assert data.endswith(b"--\r\n")
+
+
 class TestIntegrationScenarios:
     """Integration test scenarios."""
 
@@ -0,0 +1,32 @@
+"""FastAPI dependencies shared by the API routers."""
+
+from typing import NamedTuple, Optional
+
+from fastapi import Header, Request
+
+from server.core.services import Services
+from server.models.tts import Priority
+
+
+class JobHeaders(NamedTuple):
+    """Scheduling hints sent as headers instead of in the request body."""
+
+    priority: Optional[Priority]
+    deadline_seconds: Optional[float]
+
+
+def get_services(request: Request) -> Services:
+    """Return the application's service container (created in the lifespan hook)."""
+    return request.app.state.services
+
+
+def get_job_headers(
+    x_priority: Optional[Priority] = Header(
+        None, description="Scheduling class: interactive, normal or batch"
+    ),
+    x_deadline_seconds: Optional[float] = Header(
+        None, description="Drop the job if it has not started within N seconds", gt=0
+    ),
+) -> JobHeaders:
+    """Read the optional X-Priority / X-Deadline-Seconds headers."""
+    return JobHeaders(priority=x_priority, deadline_seconds=x_deadline_seconds)
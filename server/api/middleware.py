@@ -0,0 +1,115 @@
+"""ASGI middleware: request IDs, HTTP metrics and the voice upload size limit.
+
+Implemented as plain ASGI (not `BaseHTTPMiddleware`) so streaming responses are
+passed through untouched and timed until their last byte.
+"""
+
+import time
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from server.core import metrics
+from server.core.config import settings
+from server.core.request_id import HEADER, new_request_id, request_id
+from server.core.voice_manager import UploadTooLargeError
+
+# Room for the form fields and part headers around the audio in a voice upload.
+MULTIPART_SLACK_BYTES = 1024 * 1024
+
+
+def _endpoint(scope: Scope) -> str:
+    """Route template (e.g. `/tts/batch/{job_id}`) so labels stay low-cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Assign a request ID and record request counts, latency and bytes."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle one ASGI connection scope."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(HEADER.lower().encode(), b"").decode("latin-1")
+        current = new_request_id(incoming)
+        token = request_id.set(current)
+
+        started = time.perf_counter()
+        status = 500
+        sent = 0
+        first_byte = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, sent, first_byte
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (HEADER.lower().encode(), current.encode()),
+                ]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if body and first_byte is None:
+                    first_byte = time.perf_counter() - started
+                sent += len(body)
+            await send(message)
+
+        metrics.IN_FLIGHT_REQUESTS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.IN_FLIGHT_REQUESTS.dec()
+            endpoint = _endpoint(scope)
+            metrics.REQUESTS.inc(
+                method=scope["method"], endpoint=endpoint, status=str(status)
+            )
+            metrics.REQUEST_SECONDS.observe(
+                time.perf_counter() - started, endpoint=endpoint
+            )
+            if first_byte is not None:
+                metrics.TIME_TO_FIRST_BYTE.observe(first_byte, endpoint=endpoint)
+            metrics.RESPONSE_BYTES.inc(sent, endpoint=endpoint)
+            request_id.reset(token)
+
+
+class UploadLimitMiddleware:
+    """Reject voice uploads whose Content-Length is over the limit, unread.
+
+    Starlette spools the whole multipart body before the endpoint runs, so the
+    endpoint's own check only fires after an oversized upload has been received.
+    Bodies without a Content-Length are still limited while they are copied.
+    """
+
+    def __init__(self, app: ASGIApp, path: str = "/voices"):
+        """Wrap `app`, guarding POSTs to `path`."""
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer 413 before reading the body if the declared size is too big."""
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].rstrip("/") == self.path
+        ):
+            headers = dict(scope.get("headers") or [])
+            length = headers.get(b"content-length", b"")
+            limit = settings.VOICE_UPLOAD_MAX_BYTES + MULTIPART_SLACK_BYTES
+            if length.isdigit() and int(length) > limit:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": str(UploadTooLargeError())},
+                    headers={"Connection": "close"},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
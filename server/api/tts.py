@@ -1,71 +1,214 @@
 """TTS generation API endpoints."""
 
-import pathlib
-import tempfile
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional, Union
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 
-from server.core.fish_client import FishSpeechClient
-from server.core.voice_manager import VoiceManager
-from server.models.tts import MultiTTSRequest, TTSRequest
+from server.api.dependencies import JobHeaders, get_job_headers, get_services
+from server.core import formats, metrics
+from server.core.audio_cache import CachedAudio, audio_cache_key
+from server.core.batch import ARCHIVE_FORMATS
+from server.core.config import settings
+from server.core.formats import OutputSpec
+from server.core.preprocess import VoiceNotReadyError
+from server.core.scheduler import Job, SchedulerError
+from server.core.services import Services
+from server.models.tts import (
+    BatchJobResponse,
+    BatchTTSRequest,
+    LongTTSRequest,
+    MultiTTSRequest,
+    Priority,
+    TTSRequest,
+)
 from server.utils.audio import get_audio_duration
+from server.utils.text import split_text
 
 router = APIRouter(prefix="/tts", tags=["tts"])
-fish_client = FishSpeechClient()
-voice_manager = VoiceManager()
 
-# Fish Audio S2 supports at most this many distinct speakers per dialogue.
-MAX_DIALOGUE_SPEAKERS = 5
 
+def _sampling_params(request: Union[TTSRequest, MultiTTSRequest]) -> dict:
+    """Shared sampling parameters forwarded to FishSpeechClient."""
+    return {
+        "max_new_tokens": request.max_new_tokens,
+        "chunk_length": request.chunk_length,
+        "top_p": request.top_p,
+        "repetition_penalty": request.repetition_penalty,
+        "temperature": request.temperature,
+        "seed": request.seed,
+    }
 
-@router.post("", response_class=FileResponse)
-async def generate_speech(request: TTSRequest):
+
+def _job(request: Union[TTSRequest, MultiTTSRequest], headers: JobHeaders) -> Job:
+    """Scheduling metadata from the request body, falling back to the headers."""
+    return Job.create(
+        request.priority or headers.priority,
+        request.deadline_seconds or headers.deadline_seconds,
+    )
+
+
+def _output(
+    request: Union[TTSRequest, MultiTTSRequest],
+    accept: Optional[str],
+    streaming: bool = False,
+) -> OutputSpec:
+    """Resolve the output format, answering 406/400 if it cannot be produced."""
+    try:
+        return formats.resolve(request, accept, streaming)
+    except formats.FormatNotAcceptableError as e:
+        raise HTTPException(status_code=406, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def _dialogue_voices(request: MultiTTSRequest, services: Services) -> list[str]:
+    """Validate every voice exists and return the distinct speakers in order."""
+    unique_voices: list[str] = []
+    for turn in request.turns:
+        if not services.voice_manager.voice_exists(turn.voice_id):
+            raise HTTPException(
+                status_code=404, detail=f"Voice '{turn.voice_id}' not found"
+            )
+        if turn.voice_id not in unique_voices:
+            unique_voices.append(turn.voice_id)
+    return unique_voices
+
+
+async def _render(
+    services: Services,
+    generate: Callable[[], Awaitable[bytes]],
+    cache_key: Optional[str],
+    operation: str,
+    output: OutputSpec,
+) -> CachedAudio:
+    """Run one generation and return its bytes and duration, all in memory.
+
+    The result is also stored in the audio cache when `cache_key` is set.
+    """
+    data = await generate()
+    with metrics.stage(operation, "convert"):
+        data, duration = await run_in_threadpool(formats.convert, data, output)
+    if duration is None:
+        # pydub may decode the whole clip; keep it off the event loop.
+        with metrics.stage(operation, "duration"):
+            duration = await run_in_threadpool(
+                get_audio_duration, data, output.container
+            )
+
+    if cache_key is not None:
+        await run_in_threadpool(services.audio_cache.put, cache_key, data, duration)
+    return CachedAudio(data=data, duration=duration)
+
+
+async def _generate_cached(
+    services: Services,
+    text: str,
+    voice_ids: list[str],
+    params: dict,
+    generate: Callable[[], Awaitable[bytes]],
+    output: OutputSpec,
+    job: Job,
+    operation: str = "speech",
+) -> tuple[CachedAudio, dict]:
+    """Serve a generation from cache, a coalesced in-flight job or a fresh S2 call.
+
+    Fixed-seed requests are reproducible, so repeats are served from the audio
+    cache without touching S2. Identical concurrent requests (any seed) of the
+    same priority share one upstream generation, scheduled under the first
+    caller's job; if the scheduler refuses that job (its deadline passed, its
+    queue was full), the others schedule their own. Returns the audio plus
+    cache/coalescing headers.
+    """
+    key = await run_in_threadpool(
+        audio_cache_key, text, voice_ids, params, output.cache_tag
+    )
+    cacheable = bool(params["seed"])
+    if cacheable:
+        cached = await run_in_threadpool(services.audio_cache.get, key)
+        if cached is not None:
+            metrics.CACHE_LOOKUPS.inc(cache="audio", result="hit")
+            return cached, {"X-Cache": "HIT"}
+    metrics.CACHE_LOOKUPS.inc(cache="audio", result="miss" if cacheable else "bypass")
+
+    audio, shared = await services.generation_flight.do(
+        f"{key}:{job.priority.value}",
+        lambda: _render(
+            services, generate, key if cacheable else None, operation, output
+        ),
+        retry_on=(SchedulerError,),
+    )
+    if shared:
+        metrics.CACHE_LOOKUPS.inc(cache="generation", result="coalesced")
+    return audio, {
+        "X-Cache": "MISS" if cacheable else "BYPASS",
+        "X-Coalesced": "true" if shared else "false",
+    }
+
+
+async def _primed(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pull the first chunk before responding so S2 errors still map to HTTP codes."""
+    first = await anext(stream)
+
+    async def relay() -> AsyncIterator[bytes]:
+        yield first
+        async for chunk in stream:
+            yield chunk
+
+    return relay()
+
+
+@router.post("", response_class=Response)
+async def generate_speech(
+    request: TTSRequest,
+    services: Services = Depends(get_services),
+    job_headers: JobHeaders = Depends(get_job_headers),
+    accept: Optional[str] = Header(None, description="Preferred audio media type"),
+):
     """Generate speech from text using specified voice."""
+    job = _job(request, job_headers)
     try:
         # Validate voice exists
-        if not voice_manager.voice_exists(request.voice_id):
+        if not services.voice_manager.voice_exists(request.voice_id):
             raise HTTPException(
                 status_code=404, detail=f"Voice '{request.voice_id}' not found"
             )
 
-        # Create temporary output file
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            output_path = pathlib.Path(temp_file.name)
-
-        try:
-            # Generate audio with fish-speech
-            fish_client.generate_audio_to_file(
+        output = _output(request, accept)
+        params = _sampling_params(request)
+        audio, cache_headers = await _generate_cached(
+            services,
+            request.text,
+            [request.voice_id],
+            params,
+            lambda: services.fish_client.generate_speech(
                 text=request.text,
                 voice_id=request.voice_id,
-                output_path=output_path,
-                max_new_tokens=request.max_new_tokens,
-                chunk_length=request.chunk_length,
-                top_p=request.top_p,
-                repetition_penalty=request.repetition_penalty,
-                temperature=request.temperature,
-                seed=request.seed,
-            )
-
-            # Return the audio file
-            return FileResponse(
-                path=str(output_path),
-                media_type="audio/mpeg",
-                filename=f"{request.voice_id}_{hash(request.text) % 10000}.mp3",
-                headers={
-                    "X-Voice-ID": request.voice_id,
-                    "X-Text-Length": str(len(request.text)),
-                    "X-Audio-Duration": str(get_audio_duration(output_path)),
-                },
-            )
+                job=job,
+                **params,
+                **output.s2_params(),
+            ),
+            output,
+            job,
+        )
 
-        except Exception as e:
-            # Clean up temp file on error
-            if output_path.exists():
-                output_path.unlink()
-            raise e
+        filename = f"{request.voice_id}_{hash(request.text) % 10000}.{output.extension}"
+        return Response(
+            content=audio.data,
+            media_type=output.media_type,
+            headers={
+                "Vary": "Accept",
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Voice-ID": request.voice_id,
+                "X-Text-Length": str(len(request.text)),
+                "X-Audio-Duration": str(audio.duration),
+                **cache_headers,
+            },
+        )
 
-    except HTTPException:
+    except (HTTPException, SchedulerError, VoiceNotReadyError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -73,63 +216,305 @@ async def generate_speech(request: TTSRequest):
         ) from e
 
 
-@router.post("/multi", response_class=FileResponse)
-async def generate_dialogue(request: MultiTTSRequest):
+@router.post("/multi", response_class=Response)
+async def generate_dialogue(
+    request: MultiTTSRequest,
+    services: Services = Depends(get_services),
+    job_headers: JobHeaders = Depends(get_job_headers),
+    accept: Optional[str] = Header(None, description="Preferred audio media type"),
+):
     """Generate a multi-speaker dialogue from ordered turns (Fish Audio S2)."""
+    job = _job(request, job_headers)
     try:
-        # Validate every voice exists and count distinct speakers.
-        unique_voices: list[str] = []
-        for turn in request.turns:
-            if not voice_manager.voice_exists(turn.voice_id):
-                raise HTTPException(
-                    status_code=404, detail=f"Voice '{turn.voice_id}' not found"
-                )
-            if turn.voice_id not in unique_voices:
-                unique_voices.append(turn.voice_id)
-
-        if len(unique_voices) > MAX_DIALOGUE_SPEAKERS:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Too many distinct voices ({len(unique_voices)}); Fish Audio S2 "
-                    f"supports at most {MAX_DIALOGUE_SPEAKERS} speakers per dialogue."
+        unique_voices = _dialogue_voices(request, services)
+        turns = [(t.voice_id, t.text) for t in request.turns]
+
+        output = _output(request, accept)
+        params = _sampling_params(request)
+        audio, cache_headers = await _generate_cached(
+            services,
+            json.dumps(turns),
+            unique_voices,
+            params,
+            lambda: services.fish_client.generate_dialogue(
+                turns=turns, job=job, **params, **output.s2_params()
+            ),
+            output,
+            job,
+            operation="dialogue",
+        )
+
+        filename = f"dialogue_{hash(tuple(turns)) % 10000}.{output.extension}"
+        return Response(
+            content=audio.data,
+            media_type=output.media_type,
+            headers={
+                "Vary": "Accept",
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Voices": ",".join(unique_voices),
+                "X-Turns": str(len(request.turns)),
+                "X-Audio-Duration": str(audio.duration),
+                **cache_headers,
+            },
+        )
+
+    except (HTTPException, SchedulerError, VoiceNotReadyError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Dialogue generation failed: {e}"
+        ) from e
+
+
+@router.post("/stream", response_class=StreamingResponse)
+async def stream_speech(
+    request: TTSRequest,
+    services: Services = Depends(get_services),
+    job_headers: JobHeaders = Depends(get_job_headers),
+    accept: Optional[str] = Header(None, description="Preferred audio media type"),
+):
+    """Stream speech (WAV) as Fish Audio S2 generates it, for low time-to-first-audio."""
+    job = _job(request, job_headers)
+    if not services.voice_manager.voice_exists(request.voice_id):
+        raise HTTPException(
+            status_code=404, detail=f"Voice '{request.voice_id}' not found"
+        )
+
+    output = _output(request, accept, streaming=True)
+
+    try:
+        stream = await _primed(
+            formats.relay_stream(
+                services.fish_client.stream_audio(
+                    text=request.text,
+                    voice_id=request.voice_id,
+                    job=job,
+                    sample_rate=output.sample_rate,
+                    **_sampling_params(request),
                 ),
+                output,
             )
+        )
+    except (SchedulerError, VoiceNotReadyError):
+        raise
+    except StopAsyncIteration as e:
+        raise HTTPException(
+            status_code=500, detail="TTS generation failed: empty audio stream"
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"TTS generation failed: {e}"
+        ) from e
 
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            output_path = pathlib.Path(temp_file.name)
-
-        try:
-            fish_client.generate_dialogue_to_file(
-                turns=[(t.voice_id, t.text) for t in request.turns],
-                output_path=output_path,
-                max_new_tokens=request.max_new_tokens,
-                chunk_length=request.chunk_length,
-                top_p=request.top_p,
-                repetition_penalty=request.repetition_penalty,
-                temperature=request.temperature,
-                seed=request.seed,
-            )
+    return StreamingResponse(
+        stream,
+        media_type=output.media_type,
+        headers={
+            "Vary": "Accept",
+            "X-Voice-ID": request.voice_id,
+            "X-Text-Length": str(len(request.text)),
+        },
+    )
+
+
+@router.post("/long", response_class=StreamingResponse)
+async def stream_long_speech(
+    request: LongTTSRequest,
+    services: Services = Depends(get_services),
+    job_headers: JobHeaders = Depends(get_job_headers),
+    accept: Optional[str] = Header(None, description="Preferred audio media type"),
+):
+    """Generate long-form speech as one WAV stream.
+
+    The text is split into sentence/paragraph segments that S2 renders
+    concurrently; audio streams out in order as soon as the first segment is done.
+    """
+    job = _job(request, job_headers)
+    if not services.voice_manager.voice_exists(request.voice_id):
+        raise HTTPException(
+            status_code=404, detail=f"Voice '{request.voice_id}' not found"
+        )
+
+    segments = split_text(
+        request.text, request.segment_chars or settings.LONGFORM_SEGMENT_CHARS
+    )
+    if not segments:
+        raise HTTPException(
+            status_code=400, detail="Text contains no speakable content"
+        )
+
+    output = _output(request, accept, streaming=True)
 
-            return FileResponse(
-                path=str(output_path),
-                media_type="audio/mpeg",
-                filename=f"dialogue_{hash(tuple((t.voice_id, t.text) for t in request.turns)) % 10000}.mp3",
-                headers={
-                    "X-Voices": ",".join(unique_voices),
-                    "X-Turns": str(len(request.turns)),
-                    "X-Audio-Duration": str(get_audio_duration(output_path)),
-                },
+    try:
+        stream = await _primed(
+            formats.relay_stream(
+                services.fish_client.stream_long_audio(
+                    segments,
+                    request.voice_id,
+                    settings.LONGFORM_CONCURRENCY,
+                    job=job,
+                    sample_rate=output.sample_rate,
+                    **_sampling_params(request),
+                ),
+                output,
             )
+        )
+    except (SchedulerError, VoiceNotReadyError):
+        raise
+    except StopAsyncIteration as e:
+        raise HTTPException(
+            status_code=500, detail="TTS generation failed: empty audio stream"
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"TTS generation failed: {e}"
+        ) from e
+
+    return StreamingResponse(
+        stream,
+        media_type=output.media_type,
+        headers={
+            "Vary": "Accept",
+            "X-Voice-ID": request.voice_id,
+            "X-Text-Length": str(len(request.text)),
+            "X-Segments": str(len(segments)),
+        },
+    )
+
 
-        except Exception as e:
-            if output_path.exists():
-                output_path.unlink()
-            raise e
+@router.post("/multi/stream", response_class=StreamingResponse)
+async def stream_dialogue(
+    request: MultiTTSRequest,
+    services: Services = Depends(get_services),
+    job_headers: JobHeaders = Depends(get_job_headers),
+    accept: Optional[str] = Header(None, description="Preferred audio media type"),
+):
+    """Stream a multi-speaker dialogue (WAV) as Fish Audio S2 generates it."""
+    job = _job(request, job_headers)
+    unique_voices = _dialogue_voices(request, services)
+    output = _output(request, accept, streaming=True)
 
-    except HTTPException:
+    try:
+        stream = await _primed(
+            formats.relay_stream(
+                services.fish_client.stream_dialogue(
+                    turns=[(t.voice_id, t.text) for t in request.turns],
+                    job=job,
+                    sample_rate=output.sample_rate,
+                    **_sampling_params(request),
+                ),
+                output,
+            )
+        )
+    except (SchedulerError, VoiceNotReadyError):
         raise
+    except StopAsyncIteration as e:
+        raise HTTPException(
+            status_code=500, detail="Dialogue generation failed: empty audio stream"
+        ) from e
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Dialogue generation failed: {e}"
         ) from e
+
+    return StreamingResponse(
+        stream,
+        media_type=output.media_type,
+        headers={
+            "Vary": "Accept",
+            "X-Voices": ",".join(unique_voices),
+            "X-Turns": str(len(request.turns)),
+        },
+    )
+
+
+@router.post("/batch", response_model=BatchJobResponse, status_code=202)
+async def submit_batch(
+    request: BatchTTSRequest, services: Services = Depends(get_services)
+):
+    """Queue a batch of generations and return its job id immediately.
+
+    Items are rendered by a background worker pool at batch priority (unless an
+    item sets its own) and go through the same audio cache as `POST /tts`.
+    """
+    for item in request.items:
+        if not services.voice_manager.voice_exists(item.voice_id):
+            raise HTTPException(
+                status_code=404, detail=f"Voice '{item.voice_id}' not found"
+            )
+        _output(item, None)
+
+    async def render(item: TTSRequest) -> CachedAudio:
+        output = formats.resolve(item)
+        params = _sampling_params(item)
+        job = Job.create(item.priority or Priority.BATCH, None)
+        audio, _ = await _generate_cached(
+            services,
+            item.text,
+            [item.voice_id],
+            params,
+            lambda: services.fish_client.generate_speech(
+                text=item.text,
+                voice_id=item.voice_id,
+                job=job,
+                **params,
+                **output.s2_params(),
+            ),
+            output,
+            job,
+            operation="batch",
+        )
+        return audio
+
+    job = await services.batches.submit(request.items, render)
+    return job.to_response(include_items=False)
+
+
+@router.get("/batch/{job_id}", response_model=BatchJobResponse)
+async def get_batch(job_id: str, services: Services = Depends(get_services)):
+    """Get a batch job's progress, including per-item status."""
+    job = services.batches.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job '{job_id}' not found")
+    return job.to_response()
+
+
+@router.get("/batch/{job_id}/download", response_class=StreamingResponse)
+async def download_batch(
+    job_id: str,
+    archive_format: str = Query(
+        "zip", alias="format", description="Archive format: zip or tar"
+    ),
+    services: Services = Depends(get_services),
+):
+    """Stream the job's finished clips (plus manifest.json) as a zip or tar archive.
+
+    Can be called before the job finishes; only completed items are included.
+    """
+    job = services.batches.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job '{job_id}' not found")
+    if archive_format not in ARCHIVE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported archive format '{archive_format}' (use zip or tar)",
+        )
+
+    return StreamingResponse(
+        services.batches.archive(job, archive_format),
+        media_type=ARCHIVE_FORMATS[archive_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="batch_{job_id}.{archive_format}"'
+            ),
+            "X-Batch-Status": job.status,
+        },
+    )
+
+
+@router.delete("/batch/{job_id}")
+async def delete_batch(job_id: str, services: Services = Depends(get_services)):
+    """Cancel a batch job's pending items and delete its results."""
+    if not await services.batches.remove(job_id):
+        raise HTTPException(status_code=404, detail=f"Batch job '{job_id}' not found")
+    return {"message": f"Batch job '{job_id}' deleted"}
@@ -1,21 +1,24 @@
 """Voice management API endpoints."""
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 
+from server.api.dependencies import get_services
 from server.core.config import settings
-from server.core.voice_manager import VoiceManager
+from server.core.services import Services
+from server.core.voice_manager import UploadTooLargeError
 from server.models.voice import VoiceListResponse, VoiceResponse
 
 router = APIRouter(prefix="/voices", tags=["voices"])
-voice_manager = VoiceManager()
 
 
 @router.get("", response_model=VoiceListResponse)
-async def list_voices():
+async def list_voices(services: Services = Depends(get_services)):
     """List all available voices."""
     try:
-        voices = voice_manager.list_voices()
+        voices = await run_in_threadpool(services.voice_manager.list_voices)
+        voices = await services.preprocessor.track(voices)
         return VoiceListResponse(voices=voices, total=len(voices))
     except Exception as e:
         raise HTTPException(
@@ -37,12 +40,12 @@ async def get_voice_avatar(voice_id: str):
 
 
 @router.get("/{voice_id}", response_model=VoiceResponse)
-async def get_voice(voice_id: str):
+async def get_voice(voice_id: str, services: Services = Depends(get_services)):
     """Get details of a specific voice."""
-    voice = voice_manager.get_voice(voice_id)
+    voice = await run_in_threadpool(services.voice_manager.get_voice, voice_id)
     if not voice:
         raise HTTPException(status_code=404, detail=f"Voice '{voice_id}' not found")
-    return voice
+    return (await services.preprocessor.track([voice]))[0]
 
 
 @router.post("", response_model=VoiceResponse)
@@ -50,6 +53,7 @@ async def create_voice(
     name: str = Form(..., description="Voice name"),
     audio: UploadFile = File(..., description="Audio file (MP3, WAV, FLAC, OGG)"),
     transcript: str = Form(None, description="Optional transcript text"),
+    services: Services = Depends(get_services),
 ):
     """Create a new voice from uploaded audio file."""
     try:
@@ -57,21 +61,30 @@ async def create_voice(
         if not audio.filename:
             raise HTTPException(status_code=400, detail="Audio filename is required")
 
-        # Read audio data
-        audio_data = await audio.read()
-        if not audio_data:
-            raise HTTPException(status_code=400, detail="Audio file is empty")
+        # UploadLimitMiddleware refuses oversized declared lengths up front;
+        # this catches uploads sent without a Content-Length before copying.
+        if audio.size is not None and audio.size > settings.VOICE_UPLOAD_MAX_BYTES:
+            raise UploadTooLargeError()
 
-        # Create the voice
-        voice = voice_manager.create_voice(
+        # Create the voice (copying and WAV conversion block, so keep them off the
+        # event loop)
+        voice = await run_in_threadpool(
+            services.voice_manager.create_voice,
             voice_id=name,
-            audio_data=audio_data,
+            audio_file=audio.file,
             audio_filename=audio.filename,
             transcript=transcript,
         )
 
-        return voice
+        # The reference clip is built in the background; the voice reports
+        # "pending" until it is ready.
+        await services.preprocessor.submit(voice.id)
+        return services.preprocessor.annotate(voice)
 
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
@@ -81,14 +94,16 @@ async def create_voice(
 
 
 @router.delete("/{voice_id}")
-async def delete_voice(voice_id: str):
+async def delete_voice(voice_id: str, services: Services = Depends(get_services)):
     """Delete a voice and all its files."""
+    voice_manager = services.voice_manager
     if not voice_manager.voice_exists(voice_id):
         raise HTTPException(status_code=404, detail=f"Voice '{voice_id}' not found")
 
     try:
-        success = voice_manager.delete_voice(voice_id)
+        success = await run_in_threadpool(voice_manager.delete_voice, voice_id)
         if success:
+            services.preprocessor.forget(voice_id)
             return {"message": f"Voice '{voice_id}' deleted successfully"}
         raise HTTPException(
             status_code=500, detail=f"Failed to delete voice '{voice_id}'"
@@ -0,0 +1,202 @@
+"""Content-addressed cache of generated audio for deterministic requests.
+
+A request with a fixed seed always renders the same audio, so its output is stored
+under a hash of everything that influences generation: text, voice, the voice's
+reference fingerprint, every sampling parameter and the output format. Small clips
+are kept in memory; everything is also written to a size-bounded disk tier that
+evicts the least recently used files first.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from server.core.reference_cache import voice_fingerprint
+
+
+@dataclass
+class CachedAudio:
+    """A cached generation result."""
+
+    data: bytes
+    duration: float
+
+
+def audio_cache_key(
+    text: str, voice_ids: list[str], params: dict, audio_format: str
+) -> str:
+    """Hash every input that influences a generation into a cache key."""
+    material = {
+        "text": text,
+        "voices": [[voice_id, voice_fingerprint(voice_id)] for voice_id in voice_ids],
+        "params": params,
+        "format": audio_format,
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class AudioCache:
+    """Two-tier (memory + disk) LRU cache of generated audio keyed by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: pathlib.Path,
+        max_disk_bytes: int,
+        max_memory_bytes: int,
+        max_memory_item_bytes: int,
+    ):
+        """Initialize the cache and index any audio already on disk."""
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.max_memory_item_bytes = max_memory_item_bytes
+        self._memory: OrderedDict[str, CachedAudio] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.enabled = max_disk_bytes > 0
+        if self.enabled:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._load_index()
+            except OSError as e:
+                print(f"⚠️  Audio cache disabled, cannot use {self.cache_dir}: {e}")
+                self.enabled = False
+
+    def _audio_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.audio"
+
+    def _meta_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Rebuild the disk LRU order from file access times."""
+        entries = []
+        for audio_file in self.cache_dir.glob("*.audio"):
+            stat = audio_file.stat()
+            entries.append((stat.st_atime_ns, audio_file.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        print(f"💾 Audio cache: {len(self._disk)} clips, {self._disk_bytes} bytes")
+
+    def get(self, key: str) -> Optional[CachedAudio]:
+        """Return cached audio for `key`, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.memory_hits += 1
+                return cached
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                audio_file = self._audio_path(key)
+                data = audio_file.read_bytes()
+                meta = json.loads(self._meta_path(key).read_text())
+                os.utime(audio_file)
+                cached = CachedAudio(data=data, duration=float(meta["duration"]))
+            except (OSError, ValueError, KeyError):
+                self._drop_disk(key)
+            else:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self.disk_hits += 1
+                self._remember(key, cached)
+                return cached
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes, duration: float) -> None:
+        """Store a generation in memory (if small) and on disk."""
+        if not self.enabled or not data or len(data) > self.max_disk_bytes:
+            return
+        audio_file = self._audio_path(key)
+        tmp_file = audio_file.with_suffix(".tmp")
+        try:
+            self._meta_path(key).write_text(json.dumps({"duration": duration}))
+            tmp_file.write_bytes(data)
+            tmp_file.replace(audio_file)
+        except OSError as e:
+            print(f"⚠️  Could not write audio cache entry: {e}")
+            tmp_file.unlink(missing_ok=True)
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._forget(old_key)
+                self.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._unlink(old_key)
+        self._remember(key, CachedAudio(data=data, duration=duration))
+
+    def stats(self) -> dict:
+        """Return cache counters for diagnostics."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+            }
+
+    def _remember(self, key: str, cached: CachedAudio) -> None:
+        """Keep a small clip in the memory tier, evicting LRU clips over budget."""
+        if len(cached.data) > self.max_memory_item_bytes:
+            return
+        with self._lock:
+            self._forget(key)
+            self._memory[key] = cached
+            self._memory_bytes += len(cached.data)
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old.data)
+
+    def _forget(self, key: str) -> None:
+        """Drop a key from the memory tier (caller holds the lock)."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old.data)
+
+    def _drop_disk(self, key: str) -> None:
+        """Remove a broken disk entry."""
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+        self._unlink(key)
+
+    def _unlink(self, key: str) -> None:
+        self._audio_path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
@@ -0,0 +1,326 @@
+"""Fish Audio S2 backends: per-node connection pools, health and routing.
+
+Each S2 server gets its own keep-alive pool and its own `Scheduler`, so
+concurrency is bounded per GPU box. `BackendPool` routes every call:
+
+- Voice affinity: a voice (or set of dialogue voices) hashes to a preferred
+  backend (rendezvous hashing), so its reference stays warm in that server's
+  `use_memory_cache`; adding or removing a node only moves that node's voices.
+- Spill-over: when the preferred backend has no free slot, the call goes to the
+  backend with the lowest latency-weighted load instead.
+- Health: nodes are probed in the background; a node that fails several calls
+  or probes in a row is ejected until a probe succeeds again.
+"""
+
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from server.core import metrics
+from server.core.config import settings
+from server.core.request_id import HEADER as REQUEST_ID_HEADER
+from server.core.request_id import request_id
+from server.core.scheduler import Scheduler
+
+HEALTH_TIMEOUT_SECONDS = 5
+
+# Latency assumed for a backend before its first call completes.
+INITIAL_LATENCY_SECONDS = 5.0
+# Weight of the newest sample in the moving average of call latency.
+LATENCY_SMOOTHING = 0.2
+
+
+class Backend:
+    """One Fish Audio S2 server with its connection pool and scheduler."""
+
+    def __init__(self, url: str):
+        """Open a keep-alive pool to `url`."""
+        self.url = url
+        self.scheduler = Scheduler(
+            max_concurrency=settings.FISH_SPEECH_MAX_CONCURRENCY,
+            max_queue_depth=settings.QUEUE_MAX_DEPTH,
+        )
+        self.limits = httpx.Limits(
+            max_connections=settings.FISH_SPEECH_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.FISH_SPEECH_MAX_KEEPALIVE,
+            keepalive_expiry=settings.FISH_SPEECH_KEEPALIVE_SECONDS,
+        )
+        # Long-lived keep-alive pool: one TCP handshake per socket, not per call.
+        # Waiting for a free pooled connection counts against the total deadline.
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits)
+        self.http = httpx.AsyncClient(
+            base_url=url,
+            transport=self._transport,
+            timeout=httpx.Timeout(
+                connect=settings.FISH_SPEECH_CONNECT_TIMEOUT,
+                read=settings.FISH_SPEECH_FIRST_BYTE_TIMEOUT,
+                write=settings.FISH_SPEECH_CONNECT_TIMEOUT,
+                pool=settings.FISH_SPEECH_TOTAL_TIMEOUT,
+            ),
+        )
+        self.healthy = True
+        # Result and wall-clock time of the latest background probe.
+        self.last_probe_ok: Optional[bool] = None
+        self.last_probe_at: Optional[float] = None
+        self.latency = INITIAL_LATENCY_SECONDS
+        self._consecutive_failures = 0
+        self.ejections = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        print(f"🐟 Initializing Fish Audio S2 backend: {url}")
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.http.aclose()
+
+    async def _trace(self, event_name: str, _info: dict) -> None:
+        """httpcore trace hook: count new TCP connections made by the pool."""
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def load(self) -> float:
+        """Latency-weighted load: expected wait for a new call on this backend."""
+        queued = self.scheduler.load() + 1
+        return queued / self.scheduler.max_concurrency * self.latency
+
+    def _begin(self, kwargs: dict) -> None:
+        """Count a call as started and tag it with the current request ID."""
+        self.requests_total += 1
+        self.in_flight += 1
+        metrics.S2_IN_FLIGHT.inc(backend=self.url)
+        content = kwargs.get("content")
+        if content:
+            metrics.S2_BYTES.inc(len(content), backend=self.url, direction="sent")
+        kwargs["headers"] = {
+            **(kwargs.get("headers") or {}),
+            REQUEST_ID_HEADER: request_id.get(),
+        }
+
+    def _end(self, ok: bool) -> None:
+        self.in_flight -= 1
+        metrics.S2_IN_FLIGHT.dec(backend=self.url)
+        metrics.S2_REQUESTS.inc(backend=self.url, outcome="ok" if ok else "error")
+
+    def record_success(self, elapsed: Optional[float] = None) -> None:
+        """Note a successful call (and its latency, when meaningful)."""
+        self._consecutive_failures = 0
+        if elapsed is not None:
+            self.latency += LATENCY_SMOOTHING * (elapsed - self.latency)
+
+    def record_failure(self) -> None:
+        """Note a failed call or probe; eject the backend after too many in a row."""
+        self.errors_total += 1
+        self._consecutive_failures += 1
+        failing = self._consecutive_failures >= settings.FISH_SPEECH_EJECT_AFTER
+        if self.healthy and failing:
+            self.healthy = False
+            self.ejections += 1
+            print(f"⚠️  Ejecting Fish Audio S2 backend {self.url}")
+
+    async def request(
+        self, method: str, url: str, total_timeout: float, **kwargs
+    ) -> httpx.Response:
+        """Send a request through the pool, enforcing an overall deadline.
+
+        Transport errors and 5xx answers count against the backend's health.
+        """
+        self._begin(kwargs)
+        started = time.monotonic()
+        ok = False
+        try:
+            async with asyncio.timeout(total_timeout):
+                response = await self.http.request(
+                    method, url, extensions={"trace": self._trace}, **kwargs
+                )
+            ok = response.status_code < 400
+        except Exception:
+            self.record_failure()
+            raise
+        finally:
+            self._end(ok)
+        metrics.S2_BYTES.inc(
+            len(response.content), backend=self.url, direction="received"
+        )
+        if response.status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success(time.monotonic() - started)
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a streaming request; latency is measured to the response headers.
+
+        Received bytes are counted by the caller as it consumes the body.
+        """
+        self._begin(kwargs)
+        started = time.monotonic()
+        ok = False
+        try:
+            async with self.http.stream(
+                method, url, extensions={"trace": self._trace}, **kwargs
+            ) as response:
+                if response.status_code >= 500:
+                    self.record_failure()
+                else:
+                    self.record_success(time.monotonic() - started)
+                ok = response.status_code < 400
+                yield response
+        except httpx.HTTPError:
+            ok = False
+            self.record_failure()
+            raise
+        finally:
+            self._end(ok)
+
+    async def probe(self) -> bool:
+        """Actively check `/v1/health`; a success re-admits an ejected backend."""
+        try:
+            response = await self.http.get(
+                "/v1/health",
+                timeout=HEALTH_TIMEOUT_SECONDS,
+                extensions={"trace": self._trace},
+            )
+            ok = response.status_code == 200
+        except Exception as e:
+            print(f"❌ Fish Audio S2 health check failed for {self.url}: {e}")
+            ok = False
+        self.last_probe_ok = ok
+        self.last_probe_at = time.time()
+        if ok:
+            self._consecutive_failures = 0
+            if not self.healthy:
+                print(f"✅ Fish Audio S2 backend {self.url} is back")
+            self.healthy = True
+        else:
+            self.record_failure()
+        return ok
+
+    def stats(self) -> dict:
+        """Return pool, load and latency counters for diagnostics."""
+        # httpcore exposes the live connections on the transport's pool.
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", [])
+        return {
+            "endpoint": self.url,
+            "healthy": self.healthy,
+            "last_probe_ok": self.last_probe_ok,
+            "ejections": self.ejections,
+            "latency_seconds": round(self.latency, 3),
+            "load": round(self.load(), 3),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "connections_opened": self.connections_opened,
+            "in_flight": self.in_flight,
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "scheduler": self.scheduler.stats(),
+        }
+
+
+def _affinity_score(key: str, backend: Backend) -> int:
+    """Rendezvous hash weight of `backend` for `key`."""
+    digest = hashlib.sha256(f"{key}|{backend.url}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class BackendPool:
+    """Routes S2 calls across one or more backends."""
+
+    def __init__(self, urls: list[str]):
+        """Create a backend per URL; health probing starts with `start()`."""
+        if not urls:
+            raise ValueError("❌ At least one Fish Audio S2 backend is required")
+        self.backends = [Backend(url) for url in urls]
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def choose(self, affinity: Optional[str] = None) -> Backend:
+        """Pick a backend for a call, preferring the one `affinity` maps to."""
+        candidates = [b for b in self.backends if b.healthy] or self.backends
+        least_loaded = min(candidates, key=Backend.load)
+        if affinity is None:
+            return least_loaded
+        preferred = max(candidates, key=lambda b: _affinity_score(affinity, b))
+        if preferred.scheduler.load() < preferred.scheduler.max_concurrency:
+            return preferred
+        return least_loaded
+
+    async def start(self) -> None:
+        """Begin background health probing."""
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(settings.FISH_SPEECH_HEALTH_INTERVAL)
+
+    async def probe_all(self) -> bool:
+        """Probe every backend; True if at least one is healthy."""
+        results = await asyncio.gather(*(b.probe() for b in self.backends))
+        return any(results)
+
+    async def aclose(self) -> None:
+        """Stop probing and close every backend's pool."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        await asyncio.gather(*(b.aclose() for b in self.backends))
+
+    def health(self) -> dict:
+        """Backend health as of the latest background probes (no S2 calls).
+
+        A backend counts as available once it has been probed and is not
+        ejected. Status is `ok` when all are available, `degraded` when some
+        are, `down` when none are and `unknown` before the first probe.
+        """
+        now = time.time()
+        available = sum(
+            1 for b in self.backends if b.healthy and b.last_probe_at is not None
+        )
+        if all(b.last_probe_at is None for b in self.backends):
+            status = "unknown"
+        elif available == len(self.backends):
+            status = "ok"
+        else:
+            status = "degraded" if available else "down"
+        return {
+            "status": status,
+            "available": available,
+            "total": len(self.backends),
+            "backends": [
+                {
+                    "endpoint": b.url,
+                    "healthy": b.healthy,
+                    "last_probe_ok": b.last_probe_ok,
+                    "last_probe_age_seconds": (
+                        round(now - b.last_probe_at, 1)
+                        if b.last_probe_at is not None
+                        else None
+                    ),
+                }
+                for b in self.backends
+            ],
+        }
+
+    def stats(self) -> dict:
+        """Per-backend load, latency, health and pool counters."""
+        return {
+            "healthy_backends": sum(1 for b in self.backends if b.healthy),
+            "backends": [b.stats() for b in self.backends],
+        }
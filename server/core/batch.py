@@ -0,0 +1,329 @@
+"""Asynchronous batch generation jobs.
+
+`POST /tts/batch` registers a job and returns immediately; a fixed pool of worker
+tasks renders the items against S2 (at batch priority, so interactive traffic
+still goes first) and writes each clip to `BATCH_DIR/<job id>/`. Workers take
+items from the active jobs round-robin, so one huge job cannot starve a small
+one submitted after it. Clients poll the job and download finished clips as a
+zip or tar stream.
+
+Jobs live in memory: a restart forgets them and clears their files. Finished
+jobs are deleted after `BATCH_RETENTION_SECONDS`.
+"""
+
+import asyncio
+import shutil
+import tarfile
+import time
+import uuid
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO, RawIOBase
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+from server.core import formats
+from server.core.audio_cache import CachedAudio
+from server.core.preprocess import VoiceNotReadyError
+from server.core.request_id import request_id
+from server.core.scheduler import QueueFullError
+from server.models.tts import BatchItemStatus, BatchJobResponse, TTSRequest
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ARCHIVE_FORMATS = {"zip": "application/zip", "tar": "application/x-tar"}
+
+RenderFn = Callable[[TTSRequest], Awaitable[CachedAudio]]
+
+
+@dataclass
+class BatchItem:
+    """One generation inside a batch job."""
+
+    request: TTSRequest
+    status: str = PENDING
+    filename: Optional[str] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchJob:
+    """A submitted batch and the progress of its items."""
+
+    def __init__(
+        self,
+        job_id: str,
+        requests: list[TTSRequest],
+        render: RenderFn,
+        directory: Path,
+    ):
+        """Register the items; nothing runs until workers pick them up."""
+        self.id = job_id
+        self.items = [BatchItem(request=r) for r in requests]
+        self.render = render
+        self.directory = directory
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+        self._next = 0  # index of the next item to hand to a worker
+
+    def count(self, status: str) -> int:
+        """Number of items in `status`."""
+        return sum(1 for item in self.items if item.status == status)
+
+    @property
+    def status(self) -> str:
+        """Overall job state derived from its items."""
+        if self.finished_at is None:
+            return RUNNING if self._next > 0 else "queued"
+        if self.count(COMPLETED):
+            return COMPLETED
+        return CANCELLED if self.count(CANCELLED) else FAILED
+
+    def next_pending(self) -> Optional[int]:
+        """Claim the next pending item, or None when all have been handed out."""
+        while self._next < len(self.items):
+            index = self._next
+            self._next += 1
+            if self.items[index].status == PENDING:
+                return index
+        return None
+
+    def has_pending(self) -> bool:
+        """Whether items remain to be handed out."""
+        return any(item.status == PENDING for item in self.items[self._next :])
+
+    def finish_if_done(self) -> bool:
+        """Stamp the finish time once no item is pending or running.
+
+        Returns True only for the call that finished the job.
+        """
+        if self.finished_at is not None or any(
+            item.status in (PENDING, RUNNING) for item in self.items
+        ):
+            return False
+        self.finished_at = datetime.now()
+        self._finished_monotonic = time.monotonic()
+        return True
+
+    def expired(self, retention_seconds: float) -> bool:
+        """Whether the job finished more than `retention_seconds` ago."""
+        return (
+            self._finished_monotonic is not None
+            and time.monotonic() - self._finished_monotonic > retention_seconds
+        )
+
+    def to_response(self, include_items: bool = True) -> BatchJobResponse:
+        """Serialize the job for the API."""
+        items = None
+        if include_items:
+            items = [
+                BatchItemStatus(
+                    index=index,
+                    voice_id=item.request.voice_id,
+                    status=item.status,
+                    filename=item.filename,
+                    duration_seconds=item.duration,
+                    error=item.error,
+                )
+                for index, item in enumerate(self.items)
+            ]
+        return BatchJobResponse(
+            job_id=self.id,
+            status=self.status,
+            total=len(self.items),
+            completed=self.count(COMPLETED),
+            failed=self.count(FAILED),
+            created_at=self.created_at.isoformat(),
+            finished_at=self.finished_at.isoformat() if self.finished_at else None,
+            items=items,
+        )
+
+
+class _ChunkWriter(RawIOBase):
+    """Write-only, non-seekable stream that buffers archive output until drained."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchManager:
+    """Registry of batch jobs plus the worker pool that renders them."""
+
+    def __init__(self, batch_dir: Path, workers: int, retention_seconds: float):
+        """Configure the pool; workers start with `start()`."""
+        self.batch_dir = batch_dir
+        self.worker_count = workers
+        self.retention_seconds = retention_seconds
+        self.jobs: dict[str, BatchJob] = {}
+        self._ready: deque[BatchJob] = deque()
+        self._wakeup = asyncio.Condition()
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Clear files left by a previous run and start the workers."""
+        await asyncio.to_thread(shutil.rmtree, self.batch_dir, ignore_errors=True)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+
+    async def aclose(self) -> None:
+        """Stop the workers (unfinished jobs are abandoned)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, requests: list[TTSRequest], render: RenderFn) -> BatchJob:
+        """Register a job and queue its items; returns without waiting."""
+        await self._sweep()
+        job_id = uuid.uuid4().hex
+        directory = self.batch_dir / job_id
+        await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+        job = BatchJob(job_id, requests, render, directory)
+        self.jobs[job_id] = job
+        async with self._wakeup:
+            self._ready.append(job)
+            self._wakeup.notify(len(job.items))
+        print(f"📦 Batch job {job_id} queued with {len(job.items)} items")
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """Look up a job by id."""
+        return self.jobs.get(job_id)
+
+    async def remove(self, job_id: str) -> bool:
+        """Cancel a job's pending items and delete it with its files."""
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        for item in job.items:
+            if item.status == PENDING:
+                item.status = CANCELLED
+        job.finish_if_done()
+        await asyncio.to_thread(shutil.rmtree, job.directory, ignore_errors=True)
+        return True
+
+    async def _sweep(self) -> None:
+        """Delete jobs whose retention period has passed."""
+        for job_id in [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.expired(self.retention_seconds)
+        ]:
+            await self.remove(job_id)
+
+    async def _next_item(self) -> tuple[BatchJob, int]:
+        """Wait for work and claim one item, rotating between jobs."""
+        async with self._wakeup:
+            while True:
+                while self._ready:
+                    job = self._ready.popleft()
+                    index = job.next_pending()
+                    if index is None:
+                        continue
+                    if job.has_pending():
+                        self._ready.append(job)
+                    return job, index
+                await self._wakeup.wait()
+
+    async def _worker(self) -> None:
+        while True:
+            job, index = await self._next_item()
+            item = job.items[index]
+            item.status = RUNNING
+            # Tag S2 calls and logs for this item the way HTTP requests are tagged.
+            request_id.set(f"{job.id}-{index}")
+            try:
+                audio = await self._render(job, item)
+                extension = formats.resolve(item.request).extension
+                filename = f"{index:05d}_{item.request.voice_id}.{extension}"
+                path = job.directory / filename
+                await asyncio.to_thread(path.write_bytes, audio.data)
+            except asyncio.CancelledError:
+                item.status = CANCELLED
+                raise
+            except Exception as e:
+                item.status = FAILED
+                item.error = str(e)
+            else:
+                item.status = COMPLETED
+                item.filename = filename
+                item.duration = audio.duration
+            finally:
+                if job.finish_if_done():
+                    print(
+                        f"📦 Batch job {job.id} {job.status}: "
+                        f"{job.count(COMPLETED)}/{len(job.items)} items"
+                    )
+
+    @staticmethod
+    async def _render(job: BatchJob, item: BatchItem) -> CachedAudio:
+        """Render one item, backing off while S2 is full or the voice is not ready."""
+        while True:
+            try:
+                return await job.render(item.request)
+            except (QueueFullError, VoiceNotReadyError) as e:
+                await asyncio.sleep(e.retry_after)
+
+    def archive(self, job: BatchJob, archive_format: str) -> Iterator[bytes]:
+        """Stream the job's finished clips plus a `manifest.json` as zip or tar.
+
+        Clips are already compressed, so the archive stores them as-is and one
+        clip is buffered at a time. Runs synchronously (in a worker thread).
+        """
+        writer = _ChunkWriter()
+        # Completed items always have a filename.
+        done = [
+            item.filename
+            for item in job.items
+            if item.status == COMPLETED and item.filename
+        ]
+        manifest = job.to_response().model_dump_json(indent=2).encode()
+
+        if archive_format == "zip":
+            with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_STORED) as zf:
+                for filename in done:
+                    zf.write(job.directory / filename, filename)
+                    yield writer.drain()
+                zf.writestr("manifest.json", manifest)
+        else:
+            with tarfile.open(fileobj=writer, mode="w|") as tf:
+                for filename in done:
+                    tf.add(job.directory / filename, arcname=filename)
+                    yield writer.drain()
+                info = tarfile.TarInfo("manifest.json")
+                info.size = len(manifest)
+                info.mtime = int(time.time())
+                tf.addfile(info, BytesIO(manifest))
+        yield writer.drain()
+
+    def stats(self) -> dict:
+        """Return batch counters for diagnostics."""
+        jobs = list(self.jobs.values())
+        return {
+            "workers": len(self._workers),
+            "jobs": len(jobs),
+            "active_jobs": sum(1 for job in jobs if job.finished_at is None),
+            "pending_items": sum(job.count(PENDING) for job in jobs),
+            "running_items": sum(job.count(RUNNING) for job in jobs),
+        }
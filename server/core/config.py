@@ -15,17 +15,156 @@ class Settings:
     FISH_SPEECH_HOST: str = os.getenv("FISH_SPEECH_HOST", "fish-speech")
     FISH_SPEECH_PORT: int = int(os.getenv("FISH_SPEECH_PORT", "8080"))
 
+    # Several S2 servers, comma-separated ("host:port" or full URLs). When unset,
+    # FISH_SPEECH_HOST:FISH_SPEECH_PORT is the only backend.
+    FISH_SPEECH_BACKENDS: str = os.getenv("FISH_SPEECH_BACKENDS", "")
+
+    # Backend health: probe interval (seconds) and how many consecutive failed
+    # calls/probes eject a backend from routing until a probe succeeds again.
+    FISH_SPEECH_HEALTH_INTERVAL: float = float(
+        os.getenv("FISH_SPEECH_HEALTH_INTERVAL", "10")
+    )
+    FISH_SPEECH_EJECT_AFTER: int = int(os.getenv("FISH_SPEECH_EJECT_AFTER", "3"))
+
+    # Connection pool to each S2 backend: how many sockets we may open against
+    # the GPU box and how long idle keep-alive connections are reused.
+    FISH_SPEECH_MAX_CONNECTIONS: int = int(
+        os.getenv("FISH_SPEECH_MAX_CONNECTIONS", "8")
+    )
+    FISH_SPEECH_MAX_KEEPALIVE: int = int(os.getenv("FISH_SPEECH_MAX_KEEPALIVE", "8"))
+    FISH_SPEECH_KEEPALIVE_SECONDS: float = float(
+        os.getenv("FISH_SPEECH_KEEPALIVE_SECONDS", "120")
+    )
+
+    # Per-phase timeouts (seconds). First byte covers the whole non-streaming
+    # generation; a long dialogue or a torch.compile recompile can take ~45s+.
+    FISH_SPEECH_CONNECT_TIMEOUT: float = float(
+        os.getenv("FISH_SPEECH_CONNECT_TIMEOUT", "5")
+    )
+    FISH_SPEECH_FIRST_BYTE_TIMEOUT: float = float(
+        os.getenv("FISH_SPEECH_FIRST_BYTE_TIMEOUT", "300")
+    )
+    FISH_SPEECH_TOTAL_TIMEOUT: float = float(
+        os.getenv("FISH_SPEECH_TOTAL_TIMEOUT", "330")
+    )
+
+    # Scheduler in front of each S2 backend: concurrent generations, and how many
+    # jobs of each priority class may wait before new ones are rejected (429).
+    FISH_SPEECH_MAX_CONCURRENCY: int = int(
+        os.getenv("FISH_SPEECH_MAX_CONCURRENCY", "2")
+    )
+    QUEUE_MAX_DEPTH: int = int(os.getenv("PLOMTTS_QUEUE_MAX_DEPTH", "32"))
+
     @property
     def fish_speech_url(self) -> str:
         """Get the Fish Audio S2 API base URL."""
         return f"http://{self.FISH_SPEECH_HOST}:{self.FISH_SPEECH_PORT}"
 
+    @property
+    def fish_speech_urls(self) -> list[str]:
+        """Base URLs of every Fish Audio S2 backend."""
+        backends = [
+            b.strip() for b in self.FISH_SPEECH_BACKENDS.split(",") if b.strip()
+        ]
+        if not backends:
+            return [self.fish_speech_url]
+        return [b if "://" in b else f"http://{b}" for b in backends]
+
     # Voice storage
     VOICES_DIR: Path = Path(os.getenv("PLOMTTS_VOICES_DIR", "/app/voices"))
 
+    # How often the in-memory voice index is reconciled with VOICES_DIR (seconds)
+    VOICE_INDEX_REFRESH_SECONDS: float = float(
+        os.getenv("PLOMTTS_VOICE_INDEX_REFRESH_SECONDS", "10")
+    )
+
     # Audio processing
     SUPPORTED_AUDIO_FORMATS: list[str] = ["mp3", "wav", "flac", "ogg"]
 
+    # Largest accepted voice upload; bigger uploads are rejected with 413
+    VOICE_UPLOAD_MAX_BYTES: int = (
+        int(os.getenv("PLOMTTS_VOICE_UPLOAD_MAX_MB", "50")) * 1024 * 1024
+    )
+
+    # Background reference preprocessing: worker processes, the sample rate of
+    # the trimmed reference clips, and how long a TTS request waits for a voice
+    # that is still being prepared before answering 503.
+    PREPROCESS_WORKERS: int = int(os.getenv("PLOMTTS_PREPROCESS_WORKERS", "2"))
+    REFERENCE_SAMPLE_RATE: int = int(
+        os.getenv("PLOMTTS_REFERENCE_SAMPLE_RATE", "44100")
+    )
+    PREPROCESS_WAIT_SECONDS: float = float(
+        os.getenv("PLOMTTS_PREPROCESS_WAIT_SECONDS", "30")
+    )
+
+    # Trimmed reference clip cache (in-memory budget, MB)
+    REFERENCE_CACHE_MAX_BYTES: int = (
+        int(os.getenv("PLOMTTS_REFERENCE_CACHE_MB", "64")) * 1024 * 1024
+    )
+    # Packed msgpack reference sets reused for recurring casts (in-memory, MB)
+    REFERENCE_SET_CACHE_MAX_BYTES: int = (
+        int(os.getenv("PLOMTTS_REFERENCE_SET_CACHE_MB", "64")) * 1024 * 1024
+    )
+
+    # Generated audio cache for fixed-seed requests
+    AUDIO_CACHE_DIR: Path = Path(
+        os.getenv("PLOMTTS_AUDIO_CACHE_DIR", "/app/cache/audio")
+    )
+    AUDIO_CACHE_DISK_BYTES: int = (
+        int(os.getenv("PLOMTTS_AUDIO_CACHE_DISK_MB", "1024")) * 1024 * 1024
+    )
+    AUDIO_CACHE_MEMORY_BYTES: int = (
+        int(os.getenv("PLOMTTS_AUDIO_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+    )
+    AUDIO_CACHE_MEMORY_ITEM_BYTES: int = (
+        int(os.getenv("PLOMTTS_AUDIO_CACHE_MEMORY_ITEM_KB", "512")) * 1024
+    )
+
+    # Long-form TTS: target characters per S2 request and how many segments of
+    # one request are generated concurrently.
+    LONGFORM_SEGMENT_CHARS: int = int(
+        os.getenv("PLOMTTS_LONGFORM_SEGMENT_CHARS", "400")
+    )
+    LONGFORM_CONCURRENCY: int = int(os.getenv("PLOMTTS_LONGFORM_CONCURRENCY", "2"))
+
+    # Dialogues are split into windows only beyond five speakers or when they
+    # would overflow S2's context; a non-zero value also caps the characters per
+    # window. How many windows render at once.
+    DIALOGUE_WINDOW_CHARS: int = int(os.getenv("PLOMTTS_DIALOGUE_WINDOW_CHARS", "0"))
+    DIALOGUE_CONCURRENCY: int = int(os.getenv("PLOMTTS_DIALOGUE_CONCURRENCY", "2"))
+
+    # Batch jobs: where finished clips are kept, how many items render at once
+    # and how long finished jobs stay downloadable.
+    BATCH_DIR: Path = Path(os.getenv("PLOMTTS_BATCH_DIR", "/app/cache/batch"))
+    BATCH_WORKERS: int = int(os.getenv("PLOMTTS_BATCH_WORKERS", "4"))
+    BATCH_RETENTION_SECONDS: float = (
+        float(os.getenv("PLOMTTS_BATCH_RETENTION_HOURS", "24")) * 3600
+    )
+
+    # Startup warm-up: synthetic generations sent to every backend before the
+    # server reports ready. Hot voices are comma-separated voice ids; speaker
+    # counts are the dialogue shapes to compile (empty for none).
+    WARMUP_ENABLED: bool = os.getenv("PLOMTTS_WARMUP", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    WARMUP_VOICES: str = os.getenv("PLOMTTS_WARMUP_VOICES", "")
+    WARMUP_SPEAKER_COUNTS: str = os.getenv("PLOMTTS_WARMUP_SPEAKER_COUNTS", "1,2,3,4,5")
+    WARMUP_TIMEOUT_SECONDS: float = float(
+        os.getenv("PLOMTTS_WARMUP_TIMEOUT_SECONDS", "600")
+    )
+
+    @property
+    def warmup_voices(self) -> list[str]:
+        """Voice ids to warm up individually."""
+        return [v.strip() for v in self.WARMUP_VOICES.split(",") if v.strip()]
+
+    @property
+    def warmup_speaker_counts(self) -> list[int]:
+        """Dialogue speaker counts to warm up."""
+        return [int(n) for n in self.WARMUP_SPEAKER_COUNTS.split(",") if n.strip()]
+
     def __init__(self):
         """Initialize settings and create directories."""
         self.VOICES_DIR.mkdir(parents=True, exist_ok=True)
@@ -2,25 +2,59 @@
 
 Replaces the old Fish-Speech v1.5 Gradio (`/partial`) integration. S2 is driven by a
 msgpack POST to `/v1/tts` (schema: ServeTTSRequest). Reference audio is sent inline as
-raw bytes and trimmed to a short clip on the fly so over-long voice samples never blow
-past the model's 8192-token context.
+raw bytes: the short trimmed clip built ahead of time by `server.core.preprocess`, so
+over-long voice samples never blow past the model's 8192-token context.
+
+Every call is async: HTTP goes through pooled keep-alive httpx clients (one per S2
+backend, see `server.core.backends`) and file work is pushed to a thread, so a slow
+generation never stalls the event loop serving other requests.
 """
 
+import asyncio
+import dataclasses
+import functools
 import pathlib
-import shutil
-import subprocess
+import random
 import tempfile
-import urllib.error
-import urllib.request
+import time
+from collections import deque
+from contextlib import AsyncExitStack, aclosing
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    Sequence,
+)
 
 import msgpack
 
+from server.core import metrics
+from server.core.backends import Backend, BackendPool
 from server.core.config import settings
-from server.utils.audio import convert_to_format
+from server.core.preprocess import (
+    REFERENCE_TRIM_SECONDS,
+    VoicePreprocessor,
+    reference_source,
+)
+from server.core.reference_cache import ReferenceCache, ReferenceSetCache
+from server.core.request_id import log_prefix
+from server.core.scheduler import Job
+from server.utils.concat import join_audio
+from server.utils.dialogue import DialogueWindow, plan_dialogue
+from server.utils.text import TextSegment
+from server.utils.wav import parse_wav, silence, smooth_edges, wav_header
+
+# S2 only streams raw WAV (a header followed by PCM chunks as they are decoded).
+STREAMING_FORMAT = "wav"
+
+# Pauses inserted between long-form segments, after their edge silence is trimmed.
+SENTENCE_PAUSE_SECONDS = 0.25
+PARAGRAPH_PAUSE_SECONDS = 0.6
 
-# Fish Audio S2 reference audio should be a short clip (10-30s recommended). Anything
-# longer wastes context and risks the 8192-token overflow that crashed v1.5.
-REFERENCE_TRIM_SECONDS = 24
+# Pause between the windows of a dialogue too long or too crowded for one S2 call.
+DIALOGUE_PAUSE_SECONDS = 0.35
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
@@ -28,92 +62,102 @@ def _clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
 
 
+def _pack_request(payload: dict, references: bytes) -> bytes:
+    """msgpack a ServeTTSRequest, splicing in an already packed `references` array."""
+    packer = msgpack.Packer(use_bin_type=True)
+    parts = [packer.pack_map_header(len(payload) + 1)]
+    for key, value in payload.items():
+        parts += [packer.pack(key), packer.pack(value)]
+    parts += [packer.pack("references"), references]
+    return b"".join(parts)
+
+
 class FishSpeechClient:
     """Client for the self-hosted Fish Audio S2 TTS server."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        reference_cache: ReferenceCache,
+        reference_sets: ReferenceSetCache,
+        backends: BackendPool,
+        preprocessor: VoicePreprocessor,
+    ):
         """Initialize the Fish Audio S2 client."""
-        self.api_endpoint = settings.fish_speech_url
-        print(f"🐟 Initializing Fish Audio S2 client with endpoint: {self.api_endpoint}")
-
-    def _get_reference_audio(
-        self, voice_dir: pathlib.Path, voice_name: str
-    ) -> pathlib.Path:
-        """Get reference audio file for voice (prefers WAV, auto-converts if needed)."""
-        # First, try to find WAV file (preferred for Fish-speech)
-        wav_file = voice_dir / f"{voice_name}.wav"
-        if wav_file.exists():
-            print(f"🎵 Using WAV reference audio: {wav_file}")
-            return wav_file
-
-        # If no WAV, look for other formats and convert to WAV
-        for ext in ["mp3", "flac", "ogg"]:
-            source_file = voice_dir / f"{voice_name}.{ext}"
-            if source_file.exists():
-                print(
-                    f"🔄 Converting {ext.upper()} to WAV for Fish-speech compatibility..."
-                )
-                if convert_to_format(source_file, wav_file, "wav"):
-                    print(f"✅ Created WAV version: {wav_file}")
-                    return wav_file
-                print(
-                    f"⚠️  Warning: WAV conversion failed, using {ext.upper()} directly"
-                )
-                return source_file
+        self.reference_cache = reference_cache
+        self.reference_sets = reference_sets
+        self.backends = backends
+        self.preprocessor = preprocessor
 
-        raise FileNotFoundError(
-            f"❌ Reference audio file not found for voice: {voice_name}"
-        )
+    def pool_stats(self) -> dict:
+        """Return per-backend routing, scheduler and connection pool counters."""
+        return self.backends.stats()
 
-    def _reference_bytes(self, reference_audio: pathlib.Path) -> bytes:
-        """Trim the reference clip to REFERENCE_TRIM_SECONDS and return WAV bytes.
+    async def _voice_reference(self, voice_id: str) -> dict:
+        """Build an S2 reference ({audio, text}) for one voice.
 
-        S2 clones from a short reference; trimming here means every voice works
-        regardless of how long its stored sample is, with no need to touch the
-        (LFS-tracked) source files.
+        Only the preprocessed clip is read; if it is missing or stale, wait for the
+        preprocessing pipeline to (re)build it.
         """
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            trimmed = pathlib.Path(tmp.name)
-        try:
-            subprocess.run(
-                [
-                    "ffmpeg", "-y", "-i", str(reference_audio),
-                    "-t", str(REFERENCE_TRIM_SECONDS),
-                    "-ac", "1", str(trimmed),
-                ],
-                capture_output=True,
-                check=True,
-            )
-            return trimmed.read_bytes()
-        except subprocess.CalledProcessError:
-            # Fall back to the untrimmed file rather than failing outright.
-            print("⚠️  Reference trim failed; sending untrimmed audio")
-            return reference_audio.read_bytes()
-        finally:
-            trimmed.unlink(missing_ok=True)
-
-    def _voice_reference(self, voice_id: str) -> dict:
-        """Build an S2 reference ({audio, text}) for one voice."""
         voice_dir = settings.VOICES_DIR / voice_id
         if not voice_dir.exists():
             raise ValueError(f"❌ Voice not found: {voice_id}")
 
-        reference_audio = self._get_reference_audio(voice_dir, voice_id)
-
         reference_transcript = voice_dir / f"{voice_id}.txt"
         if not reference_transcript.exists():
             raise FileNotFoundError(f"❌ Transcript not found for voice: {voice_id}")
 
+        source = await asyncio.to_thread(reference_source, voice_id)
+        audio = await asyncio.to_thread(self.reference_cache.get, voice_id, source)
+        if audio is None:
+            await self.preprocessor.wait_ready(voice_id)
+            audio = await asyncio.to_thread(self.reference_cache.get, voice_id, source)
+            if audio is None:
+                raise RuntimeError(f"❌ Reference clip missing for voice: {voice_id}")
+
         return {
-            "audio": self._reference_bytes(reference_audio),
-            "text": reference_transcript.read_text().strip(),
+            "audio": audio,
+            "text": (await asyncio.to_thread(reference_transcript.read_text)).strip(),
         }
 
-    def _post_tts(
-        self, text: str, references: list, output_path: pathlib.Path, **kwargs
-    ) -> pathlib.Path:
-        """POST a ServeTTSRequest to S2 /v1/tts and write the mp3 to output_path."""
-        # Map plomtts params onto S2's ServeTTSRequest, clamping to its valid ranges.
+    async def _references(self, voice_ids: list[str]) -> bytes:
+        """The S2 `references` array for `voice_ids` (in order), packed as msgpack.
+
+        A cast seen before is served from the reference-set cache while none of
+        its voices changed, skipping clip and transcript reads and the packing.
+        """
+        key = await asyncio.to_thread(ReferenceSetCache.key, voice_ids)
+        if key is not None:
+            packed = self.reference_sets.get(key)
+            if packed is not None:
+                return packed
+
+        started = time.perf_counter()
+        # Prepare every voice's reference concurrently; order follows voice_ids.
+        references = await asyncio.gather(
+            *(self._voice_reference(v) for v in voice_ids)
+        )
+        prepared = time.perf_counter()
+        packed = msgpack.packb(references, use_bin_type=True)
+        if key is not None:
+            self.reference_sets.put(
+                key,
+                packed,
+                prepare_seconds=prepared - started,
+                serialize_seconds=time.perf_counter() - prepared,
+            )
+        return packed
+
+    def _build_payload(
+        self,
+        text: str,
+        streaming: bool = False,
+        audio_format: str = "mp3",
+        **kwargs,
+    ) -> dict:
+        """Map plomtts params onto S2's ServeTTSRequest, clamping to its valid ranges.
+
+        `references` is left out: it is spliced in already packed (`_pack_request`).
+        """
         max_new_tokens = kwargs.get("max_new_tokens", 0)
         if max_new_tokens <= 0:
             max_new_tokens = 1024  # S2 default; v1.5 used 0 to mean "auto"
@@ -121,90 +165,408 @@ class FishSpeechClient:
 
         payload = {
             "text": text,
-            "references": references,
-            "format": "mp3",
+            "format": STREAMING_FORMAT if streaming else audio_format,
             "chunk_length": int(_clamp(kwargs.get("chunk_length", 200), 100, 300)),
             "max_new_tokens": max_new_tokens,
             "top_p": _clamp(kwargs.get("top_p", 0.8), 0.1, 1.0),
-            "repetition_penalty": _clamp(kwargs.get("repetition_penalty", 1.1), 0.9, 2.0),
+            "repetition_penalty": _clamp(
+                kwargs.get("repetition_penalty", 1.1), 0.9, 2.0
+            ),
             "temperature": _clamp(kwargs.get("temperature", 0.8), 0.1, 1.0),
             "seed": seed if seed else None,
             # Same voice → same trimmed reference bytes every call, so caching the
             # encoded reference speeds up repeat requests (e.g. the HA voice).
             "use_memory_cache": "on",
             "normalize": True,
-            "streaming": False,
+            "streaming": streaming,
         }
+        if kwargs.get("sample_rate"):
+            payload["sample_rate"] = kwargs["sample_rate"]
+        return payload
+
+    async def _post_tts(
+        self,
+        text: str,
+        references: bytes,
+        job: Optional[Job] = None,
+        affinity: Optional[str] = None,
+        operation: str = "speech",
+        backend: Optional[Backend] = None,
+        **kwargs,
+    ) -> bytes:
+        """POST a ServeTTSRequest to S2 /v1/tts and return the encoded audio.
+
+        The backend is chosen by `affinity` (the voices involved) and load unless
+        one is given; the call then waits for a slot in that backend's scheduler.
+        SchedulerError propagates unchanged so the API can answer 429/504. Stage
+        timings are recorded under `operation`.
+        """
+        with metrics.stage(operation, "serialize"):
+            payload = self._build_payload(text, **kwargs)
+            data = _pack_request(payload, references)
+
+        backend = backend or self.backends.choose(affinity)
+        async with AsyncExitStack() as stack:
+            with metrics.stage(operation, "queue"):
+                await stack.enter_async_context(backend.scheduler.slot(job))
+            print(f"{log_prefix()}🎵 Generating audio for: {text[:60]}...")
+            try:
+                with metrics.stage(operation, "s2_generate"):
+                    response = await backend.request(
+                        "POST",
+                        "/v1/tts",
+                        settings.FISH_SPEECH_TOTAL_TIMEOUT,
+                        content=data,
+                        headers={"Content-Type": "application/msgpack"},
+                    )
+            except Exception as e:
+                raise RuntimeError(f"❌ Fish Audio S2 API call failed: {e}") from e
+
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"❌ Fish Audio S2 generation failed ({response.status_code}): "
+                f"{response.text}"
+            )
+        if not response.content:
+            raise RuntimeError("❌ Fish Audio S2 returned empty audio")
+        return response.content
+
+    async def _stream_tts(
+        self,
+        text: str,
+        references: bytes,
+        job: Optional[Job] = None,
+        affinity: Optional[str] = None,
+        operation: str = "stream",
+        **kwargs,
+    ) -> AsyncIterator[bytes]:
+        """POST a streaming ServeTTSRequest and yield WAV chunks as S2 produces them.
+
+        The scheduler slot is held until the stream is fully consumed or closed.
+        """
+        with metrics.stage(operation, "serialize"):
+            payload = self._build_payload(text, streaming=True, **kwargs)
+            data = _pack_request(payload, references)
+
+        backend = self.backends.choose(affinity)
+        async with AsyncExitStack() as stack:
+            with metrics.stage(operation, "queue"):
+                await stack.enter_async_context(backend.scheduler.slot(job))
+            print(f"{log_prefix()}🎵 Streaming audio for: {text[:60]}...")
+            stack.enter_context(metrics.stage(operation, "s2_generate"))
+            try:
+                async with backend.stream(
+                    "POST",
+                    "/v1/tts",
+                    content=data,
+                    headers={"Content-Type": "application/msgpack"},
+                ) as response:
+                    if response.status_code >= 400:
+                        detail = (await response.aread()).decode(errors="replace")
+                        raise RuntimeError(
+                            "❌ Fish Audio S2 generation failed "
+                            f"({response.status_code}): {detail}"
+                        )
+                    async for chunk in response.aiter_bytes():
+                        if chunk:
+                            metrics.S2_BYTES.inc(
+                                len(chunk), backend=backend.url, direction="received"
+                            )
+                            yield chunk
+            except RuntimeError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"❌ Fish Audio S2 API call failed: {e}") from e
+
+    async def _dialogue_request(
+        self, turns: list, speakers: Optional[list] = None
+    ) -> tuple[str, bytes]:
+        """Build the speaker-tagged text and packed, ordered references for a dialogue.
+
+        `speakers` fixes the `<|speaker:N|>` order; by default it is the order in
+        which voices first speak.
+        """
+        if speakers is None:
+            speakers = list(dict.fromkeys(voice_id for voice_id, _ in turns))
+        speaker_index = {voice_id: index for index, voice_id in enumerate(speakers)}
+        references = await self._references(speakers)
+
+        text = "".join(
+            f"<|speaker:{speaker_index[voice_id]}|>{line.strip()}"
+            for voice_id, line in turns
+        )
+        return text, references
+
+    async def _render_window(
+        self, window: DialogueWindow, operation: str, **kwargs
+    ) -> bytes:
+        """Generate one dialogue window in a single S2 call."""
+        with metrics.stage(operation, "reference"):
+            text, references = await self._dialogue_request(
+                window.turns, window.speakers
+            )
+        return await self._post_tts(
+            text,
+            references,
+            affinity=",".join(window.speakers),
+            operation=operation,
+            **kwargs,
+        )
 
-        print(f"🎵 Generating audio for: {text[:60]}...")
-        data = msgpack.packb(payload, use_bin_type=True)
-        request = urllib.request.Request(
-            f"{self.api_endpoint}/v1/tts",
-            data=data,
-            headers={"Content-Type": "application/msgpack"},
-            method="POST",
+    @staticmethod
+    def _plan_dialogue(turns: list) -> list[DialogueWindow]:
+        """Windows for a dialogue; a single one whenever S2 can take it whole."""
+        return plan_dialogue(
+            turns, REFERENCE_TRIM_SECONDS, settings.DIALOGUE_WINDOW_CHARS or None
         )
+
+    def _window_calls(
+        self,
+        windows: list[DialogueWindow],
+        job: Optional[Job],
+        operation: str,
+        **kwargs,
+    ) -> list[Callable[[], Awaitable[bytes]]]:
+        """One render call per window, sharing a seed and the job's priority.
+
+        Only the first window is held to the job deadline; the rest belong to a
+        response that has already started.
+        """
+        job = job or Job()
+        follow_up = dataclasses.replace(job, deadline=None)
+        if not kwargs.get("seed"):
+            # Same seed in every window keeps each voice's delivery consistent.
+            kwargs["seed"] = random.randint(1, 2**31 - 1)
+        return [
+            functools.partial(
+                self._render_window,
+                window,
+                job=job if index == 0 else follow_up,
+                operation=operation,
+                **kwargs,
+            )
+            for index, window in enumerate(windows)
+        ]
+
+    @staticmethod
+    async def _pipelined(
+        calls: Sequence[Callable[[], Awaitable[bytes]]], concurrency: int
+    ) -> AsyncGenerator[bytes, None]:
+        """Run `calls` up to `concurrency` at a time, yielding results in order.
+
+        Work is only started `concurrency` results ahead of the consumer; closing
+        the generator cancels whatever is still running.
+        """
+        pending: deque[asyncio.Task] = deque()
+        remaining = deque(calls)
+
+        def schedule() -> None:
+            while remaining and len(pending) < concurrency:
+                pending.append(asyncio.ensure_future(remaining.popleft()()))
+
         try:
-            # 300s: a long dialogue (or the first multi-speaker call, which triggers a
-            # torch.compile recompile for the new tensor shape) can take ~45s+.
-            with urllib.request.urlopen(request, timeout=300) as response:
-                output_path.write_bytes(response.read())
-        except urllib.error.HTTPError as e:
-            detail = e.read().decode(errors="replace")
-            raise RuntimeError(
-                f"❌ Fish Audio S2 generation failed ({e.code}): {detail}"
-            ) from e
-        except Exception as e:
-            raise RuntimeError(f"❌ Fish Audio S2 API call failed: {e}") from e
+            schedule()
+            while pending:
+                result = await pending.popleft()
+                schedule()
+                yield result
+        finally:
+            # Client went away or a call failed: stop the rest of the work.
+            for task in pending:
+                if task.done() and not task.cancelled():
+                    task.exception()
+                else:
+                    task.cancel()
 
-        if not output_path.exists() or output_path.stat().st_size == 0:
-            raise RuntimeError("❌ Fish Audio S2 returned empty audio")
+    @staticmethod
+    async def _joined_wav(
+        clips: AsyncIterator[bytes],
+        pause_before: Callable[[int], float],
+        operation: str,
+    ) -> AsyncIterator[bytes]:
+        """Join WAV clips into one stream: a header, then each clip's PCM.
 
-        print(f"📁 Saved generated audio to {output_path}")
-        return output_path
+        Clip edges are trimmed and `pause_before(index)` seconds of silence go
+        before every clip after the first, so no re-encoding happens.
+        """
+        stream_format = None
+        index = 0
+        async for data in clips:
+            clip_format, pcm = parse_wav(data)
+            if stream_format is None:
+                stream_format = clip_format
+                yield wav_header(stream_format)
+            elif clip_format != stream_format:
+                raise RuntimeError(
+                    f"❌ Segment {index} format {clip_format} does not match "
+                    f"{stream_format}"
+                )
+            else:
+                yield silence(stream_format, pause_before(index))
+            with metrics.stage(operation, "stitch"):
+                pcm = await asyncio.to_thread(smooth_edges, pcm, stream_format)
+            yield pcm
+            index += 1
+
+    async def generate_speech(self, text: str, voice_id: str, **kwargs) -> bytes:
+        """Generate single-voice speech and return the mp3 bytes."""
+        with metrics.stage("speech", "reference"):
+            references = await self._references([voice_id])
+        return await self._post_tts(
+            text, references, affinity=voice_id, operation="speech", **kwargs
+        )
+
+    async def generate_dialogue(
+        self, turns: list, job: Optional[Job] = None, **kwargs
+    ) -> bytes:
+        """Generate a multi-speaker dialogue and return the encoded audio.
 
-    def generate_audio_to_file(
+        `turns` is a list of (voice_id, text) pairs. Each unique voice becomes one S2
+        reference; its position is the `<|speaker:N|>` id used to tag that voice's lines,
+        so a dialogue that fits S2 is generated in a single context-aware call. Dialogues
+        too long for S2's context, or with more than five speakers, are planned as windows
+        (`server.utils.dialogue`) rendered a few at a time and joined in order.
+        """
+        windows = self._plan_dialogue(turns)
+        if len(windows) == 1:
+            return await self._render_window(
+                windows[0], job=job, operation="dialogue", **kwargs
+            )
+
+        print(f"{log_prefix()}🗣️ Dialogue split into {len(windows)} windows")
+        calls = self._window_calls(windows, job, "dialogue", **kwargs)
+        async with aclosing(
+            self._pipelined(calls, settings.DIALOGUE_CONCURRENCY)
+        ) as clips:
+            parts = [clip async for clip in clips]
+        with metrics.stage("dialogue", "stitch"):
+            return await asyncio.to_thread(
+                join_audio,
+                parts,
+                kwargs.get("audio_format", "mp3"),
+                DIALOGUE_PAUSE_SECONDS,
+            )
+
+    async def generate_audio_to_file(
         self, text: str, voice_id: str, output_path: pathlib.Path, **kwargs
     ) -> pathlib.Path:
         """Generate single-voice speech and write it (mp3) to output_path."""
-        reference = self._voice_reference(voice_id)
-        return self._post_tts(text, [reference], output_path, **kwargs)
+        audio = await self.generate_speech(text, voice_id, **kwargs)
+        with metrics.stage("speech", "write"):
+            await asyncio.to_thread(output_path.write_bytes, audio)
+        print(f"📁 Saved generated audio to {output_path}")
+        return output_path
 
-    def generate_dialogue_to_file(
+    async def generate_dialogue_to_file(
         self, turns: list, output_path: pathlib.Path, **kwargs
     ) -> pathlib.Path:
-        """Generate a multi-speaker dialogue and write it (mp3) to output_path.
+        """Generate a multi-speaker dialogue and write it (mp3) to output_path."""
+        audio = await self.generate_dialogue(turns, **kwargs)
+        with metrics.stage("dialogue", "write"):
+            await asyncio.to_thread(output_path.write_bytes, audio)
+        print(f"📁 Saved generated audio to {output_path}")
+        return output_path
 
-        `turns` is a list of (voice_id, text) pairs. Each unique voice becomes one S2
-        reference; its position is the `<|speaker:N|>` id used to tag that voice's lines,
-        so the whole conversation is generated in a single context-aware call.
+    async def stream_audio(
+        self, text: str, voice_id: str, **kwargs
+    ) -> AsyncIterator[bytes]:
+        """Generate single-voice speech, yielding WAV chunks as they are decoded."""
+        with metrics.stage("stream", "reference"):
+            references = await self._references([voice_id])
+        async for chunk in self._stream_tts(
+            text, references, affinity=voice_id, operation="stream", **kwargs
+        ):
+            yield chunk
+
+    async def stream_dialogue(
+        self, turns: list, job: Optional[Job] = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        """Generate a multi-speaker dialogue, yielding WAV chunks as they are decoded.
+
+        A dialogue planned as several windows is streamed window by window, like
+        long-form speech: each window's PCM goes out as soon as it is rendered.
         """
-        references: list = []
-        speaker_index: dict = {}
-        for voice_id, _ in turns:
-            if voice_id not in speaker_index:
-                speaker_index[voice_id] = len(references)
-                references.append(self._voice_reference(voice_id))
+        windows = self._plan_dialogue(turns)
+        if len(windows) == 1:
+            window = windows[0]
+            with metrics.stage("stream_dialogue", "reference"):
+                text, references = await self._dialogue_request(
+                    window.turns, window.speakers
+                )
+            async for chunk in self._stream_tts(
+                text,
+                references,
+                job=job,
+                affinity=",".join(window.speakers),
+                operation="stream_dialogue",
+                **kwargs,
+            ):
+                yield chunk
+            return
 
-        text = "".join(
-            f"<|speaker:{speaker_index[voice_id]}|>{line.strip()}"
-            for voice_id, line in turns
+        print(f"{log_prefix()}🗣️ Dialogue split into {len(windows)} windows")
+        calls = self._window_calls(
+            windows, job, "stream_dialogue", audio_format="wav", **kwargs
         )
-        return self._post_tts(text, references, output_path, **kwargs)
+        async with aclosing(
+            self._pipelined(calls, settings.DIALOGUE_CONCURRENCY)
+        ) as clips:
+            async for chunk in self._joined_wav(
+                clips, lambda _: DIALOGUE_PAUSE_SECONDS, "stream_dialogue"
+            ):
+                yield chunk
 
-    def generate_audio(self, text: str, voice_id: str, **kwargs) -> pathlib.Path:
+    async def stream_long_audio(
+        self,
+        segments: list[TextSegment],
+        voice_id: str,
+        concurrency: int,
+        job: Optional[Job] = None,
+        **kwargs,
+    ) -> AsyncIterator[bytes]:
+        """Generate long-form speech segment by segment, yielding one WAV stream.
+
+        Up to `concurrency` segments are rendered by S2 at once, ahead of the one
+        being sent, and emitted strictly in order: the header and first segment go
+        out as soon as segment one is done. Segments are joined in the PCM domain
+        with trimmed edges and a fixed pause, so no re-encoding happens.
+
+        The job deadline only gates the first segment: once audio is flowing,
+        later segments must not be dropped mid-stream.
+        """
+        job = job or Job()
+        with metrics.stage("long", "reference"):
+            references = await self._references([voice_id])
+        follow_up = dataclasses.replace(job, deadline=None)
+        calls = [
+            functools.partial(
+                self._post_tts,
+                segment.text,
+                references,
+                job=job if index == 0 else follow_up,
+                affinity=voice_id,
+                operation="long",
+                audio_format="wav",
+                **kwargs,
+            )
+            for index, segment in enumerate(segments)
+        ]
+
+        def pause_before(index: int) -> float:
+            if segments[index - 1].paragraph_end:
+                return PARAGRAPH_PAUSE_SECONDS
+            return SENTENCE_PAUSE_SECONDS
+
+        async with aclosing(self._pipelined(calls, concurrency)) as clips:
+            async for chunk in self._joined_wav(clips, pause_before, "long"):
+                yield chunk
+
+    async def generate_audio(self, text: str, voice_id: str, **kwargs) -> pathlib.Path:
         """Generate audio and return a path to a temp mp3 (compatibility wrapper)."""
         with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
             output_path = pathlib.Path(tmp.name)
-        return self.generate_audio_to_file(text, voice_id, output_path, **kwargs)
+        return await self.generate_audio_to_file(text, voice_id, output_path, **kwargs)
 
-    def health_check(self) -> bool:
-        """Check if the Fish Audio S2 service is healthy."""
-        try:
-            with urllib.request.urlopen(
-                f"{self.api_endpoint}/v1/health", timeout=5
-            ) as response:
-                return response.status == 200
-        except Exception as e:
-            print(f"❌ Fish Audio S2 health check failed: {e}")
-            return False
+    async def health_check(self) -> bool:
+        """Probe every Fish Audio S2 backend; True if at least one is healthy."""
+        return await self.backends.probe_all()
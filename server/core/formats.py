@@ -0,0 +1,292 @@
+"""Output audio formats and how each one is obtained from Fish Audio S2.
+
+S2 encodes mp3, wav and opus itself, so those are requested natively and
+passed through untouched. Raw PCM is requested as WAV and sent without its
+header, so the sample rate S2 actually produced can be checked. FLAC is the
+only format S2 cannot produce: it is requested as WAV and encoded with ffmpeg.
+
+The requested sample rate is forwarded to S2, but backends that ignore it
+answer at their native rate; WAV, PCM and FLAC output is then resampled here.
+
+The format comes from the request's `output_format` or, failing that, from
+the `Accept` header; mp3 remains the default.
+"""
+
+import shutil
+import subprocess
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Optional, Union
+
+from server.models.tts import AudioFormat, MultiTTSRequest, TTSRequest
+from server.utils.wav import Resampler, parse_wav, resample, to_stereo, wav_header
+
+DEFAULT_FORMAT = AudioFormat.MP3
+
+# Fish Audio S2 renders at this rate unless asked for another.
+S2_SAMPLE_RATE = 44100
+
+# output format -> (format requested from S2, media type, file extension)
+_FORMATS = {
+    AudioFormat.MP3: ("mp3", "audio/mpeg", "mp3"),
+    AudioFormat.WAV: ("wav", "audio/wav", "wav"),
+    AudioFormat.PCM: ("wav", "audio/pcm", "pcm"),
+    AudioFormat.OPUS: ("opus", "audio/ogg; codecs=opus", "opus"),
+    AudioFormat.OGG: ("opus", "audio/ogg; codecs=opus", "ogg"),
+    AudioFormat.FLAC: ("wav", "audio/flac", "flac"),
+}
+
+# Give up looking for the start of the PCM after this much streamed header.
+STREAM_HEADER_MAX_BYTES = 64 * 1024
+
+# Formats whose PCM passes through plomtts (so channels can be adjusted).
+_PCM_FORMATS = (AudioFormat.WAV, AudioFormat.PCM, AudioFormat.FLAC)
+
+# Formats the streaming endpoints can produce.
+STREAM_FORMATS = (AudioFormat.WAV, AudioFormat.PCM)
+
+# Accept media types (lowercase, without parameters) -> output format.
+_MEDIA_TYPES = {
+    "audio/mpeg": AudioFormat.MP3,
+    "audio/mp3": AudioFormat.MP3,
+    "audio/wav": AudioFormat.WAV,
+    "audio/wave": AudioFormat.WAV,
+    "audio/x-wav": AudioFormat.WAV,
+    "audio/pcm": AudioFormat.PCM,
+    "audio/opus": AudioFormat.OPUS,
+    "audio/ogg": AudioFormat.OGG,
+    "audio/flac": AudioFormat.FLAC,
+    "audio/x-flac": AudioFormat.FLAC,
+}
+
+
+class FormatNotAcceptableError(ValueError):
+    """None of the media types in the Accept header can be produced."""
+
+
+@dataclass(frozen=True)
+class OutputSpec:
+    """A resolved output format."""
+
+    format: AudioFormat
+    sample_rate: Optional[int] = None
+    channels: int = 1
+
+    @property
+    def s2_format(self) -> str:
+        """The format requested from Fish Audio S2."""
+        return _FORMATS[self.format][0]
+
+    @property
+    def media_type(self) -> str:
+        """Content-Type of the response."""
+        if self.format == AudioFormat.PCM:
+            return (
+                f"audio/pcm; rate={self.sample_rate}; channels={self.channels}; "
+                "encoding=s16le"
+            )
+        return _FORMATS[self.format][1]
+
+    @property
+    def extension(self) -> str:
+        """File extension for downloads and batch archives."""
+        return _FORMATS[self.format][2]
+
+    @property
+    def container(self) -> str:
+        """Container name understood by `get_audio_duration`."""
+        return "ogg" if self.s2_format == "opus" else self.extension
+
+    @property
+    def cache_tag(self) -> str:
+        """Distinguishes renditions of the same generation in the audio cache."""
+        if self.format == AudioFormat.MP3:
+            if self.sample_rate is None:
+                return "mp3"  # keeps keys written before formats were selectable
+            return f"mp3:{self.sample_rate}"
+        return f"{self.format.value}:{self.sample_rate or 0}:{self.channels}"
+
+    def s2_params(self) -> dict:
+        """Extra ServeTTSRequest fields for this output."""
+        params: dict[str, Union[str, int]] = {"audio_format": self.s2_format}
+        if self.sample_rate is not None:
+            params["sample_rate"] = self.sample_rate
+        return params
+
+
+def _parse_media_range(item: str) -> tuple[str, dict, float]:
+    """Split `type/subtype; k=v; q=0.5` into (type, params, quality)."""
+    media_type, *raw_params = [part.strip() for part in item.split(";")]
+    params = {}
+    for raw in raw_params:
+        name, _, value = raw.partition("=")
+        params[name.strip().lower()] = value.strip().strip('"')
+    try:
+        quality = float(params.pop("q", 1))
+    except ValueError:
+        quality = 0.0
+    return media_type.lower(), params, quality
+
+
+def negotiate(accept: Optional[str]) -> Optional[tuple[AudioFormat, dict]]:
+    """Preferred output format (and its media type parameters) from an Accept header.
+
+    Returns None when the header expresses no preference (missing, `*/*` or
+    `audio/*` first). Raises FormatNotAcceptableError if nothing listed is
+    available.
+    """
+    if not accept:
+        return None
+    ranges = [_parse_media_range(item) for item in accept.split(",") if item.strip()]
+    ranges.sort(key=lambda r: r[2], reverse=True)
+    for media_type, params, quality in ranges:
+        if quality <= 0:
+            continue
+        if media_type in ("*/*", "audio/*"):
+            return None
+        if media_type in _MEDIA_TYPES:
+            return _MEDIA_TYPES[media_type], params
+    raise FormatNotAcceptableError(
+        f"Cannot produce any of '{accept}'; available: "
+        + ", ".join(sorted(set(_MEDIA_TYPES)))
+    )
+
+
+def resolve(
+    request: Union[TTSRequest, MultiTTSRequest],
+    accept: Optional[str] = None,
+    streaming: bool = False,
+) -> OutputSpec:
+    """Output format for a request: its `output_format`, else the Accept header.
+
+    Streaming endpoints relay S2's WAV stream as it arrives, so they offer only
+    mono wav and pcm. Raises FormatNotAcceptableError for an unsatisfiable
+    Accept header and ValueError for an invalid combination of options.
+    """
+    audio_format = request.output_format
+    sample_rate = request.sample_rate
+    channels = request.channels
+    if audio_format is None:
+        negotiated = negotiate(accept)
+        default = AudioFormat.WAV if streaming else DEFAULT_FORMAT
+        audio_format = negotiated[0] if negotiated else default
+        params = negotiated[1] if negotiated else {}
+        try:
+            sample_rate = int(params.get("rate", 0)) or sample_rate
+            channels = int(params.get("channels", 0)) or channels
+        except ValueError as e:
+            raise ValueError(f"Invalid media type parameters in '{accept}'") from e
+
+    if streaming and (audio_format not in STREAM_FORMATS or channels != 1):
+        message = "Streaming endpoints produce mono wav or pcm only"
+        if request.output_format is None:
+            raise FormatNotAcceptableError(message)
+        raise ValueError(message)
+    if channels not in (1, 2):
+        raise ValueError("channels must be 1 or 2")
+    if channels != 1 and audio_format not in _PCM_FORMATS:
+        raise ValueError(f"{audio_format.value} output is mono; use wav, pcm or flac")
+    if audio_format == AudioFormat.PCM and sample_rate is None:
+        # Raw PCM carries no header, so the rate is always stated explicitly.
+        sample_rate = S2_SAMPLE_RATE
+    if audio_format == AudioFormat.FLAC and shutil.which("ffmpeg") is None:
+        raise FormatNotAcceptableError("flac output needs ffmpeg on the server")
+    return OutputSpec(audio_format, sample_rate, channels)
+
+
+def _encode_flac(wav: bytes) -> bytes:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "wav", "-i", "pipe:0", "-f", "flac", "pipe:1"],
+        input=wav,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(
+            f"❌ FLAC encoding failed: {result.stderr.decode(errors='replace')}"
+        )
+    return result.stdout
+
+
+def convert(data: bytes, spec: OutputSpec) -> tuple[bytes, Optional[float]]:
+    """Turn S2's response into the requested output; returns (audio, duration).
+
+    Natively encoded formats are returned unchanged with no duration (the
+    caller reads it from the headers). Runs synchronously (in a worker thread).
+    """
+    if spec.format not in _PCM_FORMATS:
+        return data, None
+
+    source_format, pcm = parse_wav(data)
+    wav_format = source_format
+    if spec.sample_rate is not None and wav_format.sample_rate != spec.sample_rate:
+        # S2 ignored the requested rate and answered at its native one.
+        pcm = resample(pcm, wav_format, spec.sample_rate)
+        wav_format = replace(wav_format, sample_rate=spec.sample_rate)
+    if wav_format.channels != spec.channels:
+        if wav_format.channels != 1:
+            raise RuntimeError(
+                f"❌ Fish Audio S2 returned {wav_format.channels}-channel audio"
+            )
+        pcm = to_stereo(pcm, wav_format)
+        wav_format = replace(wav_format, channels=2)
+    if wav_format != source_format:
+        data = wav_header(wav_format, len(pcm)) + pcm
+
+    duration = round(len(pcm) / wav_format.frame_bytes / wav_format.sample_rate, 3)
+    if spec.format == AudioFormat.PCM:
+        return pcm, duration
+    if spec.format == AudioFormat.FLAC:
+        return _encode_flac(data), duration
+    return data, duration
+
+
+async def relay_stream(
+    stream: AsyncIterator[bytes], spec: OutputSpec
+) -> AsyncIterator[bytes]:
+    """Relay S2's streamed WAV as `spec`'s stream format (wav or raw pcm).
+
+    If S2 streams at another rate than requested, the PCM is resampled chunk by
+    chunk and WAV output gets a new header announcing the requested rate.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        offset = _data_offset(buffer)
+        if offset is not None:
+            break
+        if len(buffer) > STREAM_HEADER_MAX_BYTES:
+            raise RuntimeError("❌ Streamed audio has no WAV data chunk")
+    else:
+        if buffer and spec.format == AudioFormat.WAV:
+            yield buffer
+        return
+
+    wav_format, _ = parse_wav(buffer[:offset])
+    if spec.sample_rate is None or wav_format.sample_rate == spec.sample_rate:
+        start = offset if spec.format == AudioFormat.PCM else 0
+        if buffer[start:]:
+            yield buffer[start:]
+        async for chunk in stream:
+            yield chunk
+        return
+
+    resampler = Resampler(wav_format, spec.sample_rate)
+    if spec.format == AudioFormat.WAV:
+        yield wav_header(replace(wav_format, sample_rate=spec.sample_rate))
+    if pcm := resampler.feed(buffer[offset:]):
+        yield pcm
+    async for chunk in stream:
+        if pcm := resampler.feed(chunk):
+            yield pcm
+
+
+def _data_offset(header: bytes) -> Optional[int]:
+    """Offset of the first PCM byte in a (partial) WAV stream, once known."""
+    pos = 12
+    while pos + 8 <= len(header):
+        chunk_id = header[pos : pos + 4]
+        if chunk_id == b"data":
+            return pos + 8
+        size = int.from_bytes(header[pos + 4 : pos + 8], "little")
+        pos += 8 + size + size % 2
+    return None
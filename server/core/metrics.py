@@ -0,0 +1,291 @@
+"""Prometheus-style metrics, rendered in the text exposition format at `/metrics`.
+
+A small self-contained implementation (counters, gauges and histograms with
+labels) so the server needs no extra dependency. Metrics are module-level and
+updated where the work happens; values that already live in other components
+(scheduler queues, backend health, preprocessing backlog) are copied into
+gauges when `/metrics` is scraped, see `Services.export_metrics`.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Generic, Iterator, TypeVar
+
+# Latency buckets (seconds): sub-millisecond cache hits up to multi-minute S2 calls.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# Per-series state: a float for counters and gauges, _Buckets for histograms.
+_V = TypeVar("_V")
+
+
+class _Metric(Generic[_V]):
+    """A named family of time series, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple[str, ...], _V] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key: tuple[str, ...], value: _V) -> list[str]:
+        raise NotImplementedError
+
+
+class _ScalarMetric(_Metric[float]):
+    """A metric whose series each hold a single number."""
+
+    def _render_series(self, key: tuple[str, ...], value: float) -> list[str]:
+        labels = _format_labels(self.labelnames, key)
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Counter(_ScalarMetric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add `amount` to the series selected by `labels`."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(_ScalarMetric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        """Set the series selected by `labels`."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add `amount` (negative to subtract) to the series."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Subtract `amount` from the series."""
+        self.inc(-amount, **labels)
+
+
+@dataclass
+class _Buckets:
+    """One histogram series: per-bucket counts plus the sum and count."""
+
+    counts: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric[_Buckets]):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Buckets([0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.counts[i] += 1
+                    break
+            series.total += value
+            series.count += 1
+
+    def _render_series(self, key: tuple[str, ...], value: _Buckets) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, value.counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value.total)}")
+        lines.append(f"{self.name}_count{labels} {value.count}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# HTTP layer (recorded by server.api.middleware)
+REQUESTS = Counter(
+    "plomtts_requests_total",
+    "HTTP requests handled.",
+    ("method", "endpoint", "status"),
+)
+REQUEST_SECONDS = Histogram(
+    "plomtts_request_duration_seconds",
+    "Time from receiving a request to sending the last response byte.",
+    ("endpoint",),
+)
+TIME_TO_FIRST_BYTE = Histogram(
+    "plomtts_time_to_first_byte_seconds",
+    "Time from receiving a request to sending the first response body byte.",
+    ("endpoint",),
+)
+RESPONSE_BYTES = Counter(
+    "plomtts_response_bytes_total",
+    "Response body bytes sent.",
+    ("endpoint",),
+)
+IN_FLIGHT_REQUESTS = Gauge(
+    "plomtts_in_flight_requests",
+    "HTTP requests currently being handled.",
+)
+
+# Generation pipeline
+STAGE_SECONDS = Histogram(
+    "plomtts_stage_duration_seconds",
+    "Time spent in each stage of a generation.",
+    ("operation", "stage"),
+)
+STAGE_ERRORS = Counter(
+    "plomtts_stage_errors_total",
+    "Generation stages that raised.",
+    ("operation", "stage"),
+)
+CACHE_LOOKUPS = Counter(
+    "plomtts_cache_lookups_total",
+    "Cache lookups by cache and result (hit, disk_hit, miss, bypass, coalesced).",
+    ("cache", "result"),
+)
+REFERENCE_SET_SAVED_SECONDS = Counter(
+    "plomtts_reference_set_saved_seconds_total",
+    "Work skipped by reusing packed reference sets (prepare, serialize).",
+    ("work",),
+)
+
+# Fish Audio S2 backends
+S2_REQUESTS = Counter(
+    "plomtts_s2_requests_total",
+    "Calls made to Fish Audio S2, by backend and outcome.",
+    ("backend", "outcome"),
+)
+S2_BYTES = Counter(
+    "plomtts_s2_bytes_total",
+    "Bytes exchanged with Fish Audio S2 (sent: request payloads, received: audio).",
+    ("backend", "direction"),
+)
+S2_IN_FLIGHT = Gauge(
+    "plomtts_s2_in_flight",
+    "Fish Audio S2 calls currently in flight.",
+    ("backend",),
+)
+S2_HEALTHY = Gauge(
+    "plomtts_s2_backend_healthy",
+    "1 if the backend is receiving traffic, 0 if ejected.",
+    ("backend",),
+)
+QUEUE_DEPTH = Gauge(
+    "plomtts_queue_depth",
+    "Jobs waiting for a Fish Audio S2 slot, by backend and priority.",
+    ("backend", "priority"),
+)
+
+# Background work
+PREPROCESS_QUEUE = Gauge(
+    "plomtts_preprocess_queue_depth",
+    "Voices waiting for their reference clip to be built.",
+)
+BATCH_PENDING = Gauge(
+    "plomtts_batch_pending_items",
+    "Batch items not yet rendered.",
+)
+
+
+@contextmanager
+def stage(operation: str, name: str) -> Iterator[None]:
+    """Time one generation stage, counting it as an error if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(operation=operation, stage=name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(
+            time.perf_counter() - started, operation=operation, stage=name
+        )
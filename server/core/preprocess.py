@@ -0,0 +1,380 @@
+"""Background preprocessing of voice references.
+
+Fish Audio S2 clones from a short mono clip, so every voice sample is turned
+into `<voice>.ref.wav` (mono, edge silence removed, trimmed to
+REFERENCE_TRIM_SECONDS and resampled to REFERENCE_SAMPLE_RATE) plus
+`<voice>.ref.json` with its duration, sample rate and source fingerprint.
+
+The work runs in a process pool: new uploads are queued as soon as they are
+saved, and at startup every voice whose artifact is missing or was built from
+another version of its source is queued. Generation only ever reads finished artifacts; a request for
+a voice that is still being prepared moves it to the front of the queue and
+waits briefly, then gets a 503.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import pathlib
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from server.core.config import settings
+from server.core.reference_cache import ReferenceCache, reference_fingerprint
+from server.models.voice import ReferenceInfo, VoiceResponse
+from server.utils.wav import WavFormat, parse_wav, smooth_edges, to_mono, wav_header
+
+# Fish Audio S2 reference audio should be a short clip (10-30s recommended). Anything
+# longer wastes context and risks the 8192-token overflow that crashed v1.5.
+REFERENCE_TRIM_SECONDS = 24
+
+# Source formats in the order they are preferred as the reference.
+SOURCE_FORMATS = ["wav", "mp3", "flac", "ogg"]
+
+# Level below which leading/trailing audio counts as silence (ffmpeg path).
+SILENCE_THRESHOLD_DB = -50
+
+PENDING = "pending"
+PROCESSING = "processing"
+READY = "ready"
+FAILED = "failed"
+
+
+class VoiceNotReadyError(Exception):
+    """The voice's reference is still being prepared."""
+
+    def __init__(self, voice_id: str, retry_after: int):
+        """Record when the client should try again (seconds)."""
+        super().__init__(f"Voice '{voice_id}' is still being prepared")
+        self.retry_after = retry_after
+
+
+def reference_source(voice_id: str) -> pathlib.Path:
+    """The uploaded sample a voice's reference is built from."""
+    voice_dir = settings.VOICES_DIR / voice_id
+    for ext in SOURCE_FORMATS:
+        source = voice_dir / f"{voice_id}.{ext}"
+        if source.exists():
+            return source
+    raise FileNotFoundError(f"❌ Reference audio file not found for voice: {voice_id}")
+
+
+def _ffmpeg_reference(
+    source: pathlib.Path, target: pathlib.Path, sample_rate: int
+) -> bool:
+    """Render the reference clip with ffmpeg; False if ffmpeg is missing or fails."""
+    if shutil.which("ffmpeg") is None:
+        return False
+    strip = f"silenceremove=start_periods=1:start_threshold={SILENCE_THRESHOLD_DB}dB"
+    filters = ",".join(
+        [strip, f"atrim=0:{REFERENCE_TRIM_SECONDS}", "areverse", strip, "areverse"]
+    )
+    command = ["ffmpeg", "-y", "-v", "error", "-i", str(source)]
+    command += ["-af", filters, "-ac", "1", "-ar", str(sample_rate)]
+    command += ["-c:a", "pcm_s16le", "-f", "wav", str(target)]
+    result = subprocess.run(command, capture_output=True, check=False)
+    return result.returncode == 0
+
+
+def _pcm_reference(source: pathlib.Path, target: pathlib.Path) -> None:
+    """Render the reference clip from a PCM WAV without ffmpeg (no resampling)."""
+    if source.suffix != ".wav":
+        raise RuntimeError(f"ffmpeg is required to decode {source.suffix} samples")
+    wav_format, pcm = parse_wav(source.read_bytes())
+    pcm = pcm[: wav_format.frames(REFERENCE_TRIM_SECONDS) * wav_format.frame_bytes]
+    pcm = to_mono(pcm, wav_format)
+    mono = WavFormat(1, wav_format.sample_rate, wav_format.bits_per_sample)
+    pcm = smooth_edges(pcm, mono)
+    target.write_bytes(wav_header(mono, len(pcm)) + pcm)
+
+
+def build_reference(source: str, target: str, metadata: str, sample_rate: int) -> dict:
+    """Write the reference clip and its metadata for `source`. Runs in a worker process.
+
+    Raises if the source cannot be decoded.
+    """
+    source_path = pathlib.Path(source)
+    target_path = pathlib.Path(target)
+    metadata_path = pathlib.Path(metadata)
+    mtime_ns, size = reference_fingerprint(source_path)
+
+    tmp = target_path.with_name(target_path.name + ".tmp")
+    try:
+        if not _ffmpeg_reference(source_path, tmp, sample_rate):
+            _pcm_reference(source_path, tmp)
+        wav_format, pcm = parse_wav(tmp.read_bytes())
+        if not pcm:
+            raise ValueError("reference audio is silent")
+        tmp.replace(target_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    frames = len(pcm) // wav_format.frame_bytes
+    info = {
+        "source": source_path.name,
+        "source_mtime_ns": mtime_ns,
+        "source_size": size,
+        "duration_seconds": round(frames / wav_format.sample_rate, 3),
+        "sample_rate": wav_format.sample_rate,
+        "channels": wav_format.channels,
+        "bytes": target_path.stat().st_size,
+        "created_at": datetime.now().isoformat(),
+    }
+    tmp = metadata_path.with_name(metadata_path.name + ".tmp")
+    tmp.write_text(json.dumps(info, indent=2))
+    tmp.replace(metadata_path)
+    return info
+
+
+@dataclass
+class VoiceState:
+    """Preprocessing progress of one voice."""
+
+    fingerprint: tuple[int, int]
+    status: str = PENDING
+    error: Optional[str] = None
+    metadata: Optional[dict] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class VoicePreprocessor:
+    """Queue of voices whose reference clip needs (re)building."""
+
+    def __init__(self, reference_cache: ReferenceCache, workers: int):
+        """Configure the pool; nothing runs until `start()`."""
+        self.reference_cache = reference_cache
+        self.worker_count = workers
+        self.states: dict[str, VoiceState] = {}
+        self._queue: deque[str] = deque()
+        self._wakeup = asyncio.Condition()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers: list[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+
+    async def start(self, voice_ids: list[str]) -> None:
+        """Start the worker processes and queue every voice without a fresh artifact."""
+        # Spawned (not forked) workers: the server process runs threads.
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        existing = await asyncio.to_thread(self._load_existing, voice_ids)
+        for voice_id in voice_ids:
+            if voice_id in existing:
+                state = VoiceState(existing[voice_id]["fingerprint"], status=READY)
+                state.metadata = existing[voice_id]["metadata"]
+                state.done.set()
+                self.states[voice_id] = state
+                continue
+            try:
+                await self.submit(voice_id)
+            except FileNotFoundError:
+                print(f"⚠️  Skipping {voice_id}: no audio file found")
+        queued = len(voice_ids) - len(existing)
+        print(f"🧪 Voice references: {len(existing)} ready, {queued} queued")
+
+    def _load_existing(self, voice_ids: list[str]) -> dict[str, dict]:
+        """Metadata of voices whose artifact was built from their current source."""
+        existing = {}
+        for voice_id in voice_ids:
+            try:
+                fingerprint = reference_fingerprint(reference_source(voice_id))
+                metadata = json.loads(
+                    self.reference_cache.metadata_path(voice_id).read_text()
+                )
+                if not self.reference_cache.disk_path(voice_id).exists():
+                    continue
+            except (OSError, ValueError):
+                continue
+            built_from = (metadata.get("source_mtime_ns"), metadata.get("source_size"))
+            if built_from == fingerprint:
+                existing[voice_id] = {"fingerprint": fingerprint, "metadata": metadata}
+        return existing
+
+    async def aclose(self) -> None:
+        """Stop the workers and the process pool (queued voices are abandoned)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, voice_id: str, urgent: bool = False) -> VoiceState:
+        """Queue a voice unless its artifact is already current or being built.
+
+        `urgent` moves a queued voice to the front (a request is waiting on it).
+        """
+        fingerprint = await asyncio.to_thread(
+            lambda: reference_fingerprint(reference_source(voice_id))
+        )
+        state = self.states.get(voice_id)
+        if state is not None and state.fingerprint == fingerprint:
+            if urgent and state.status == PENDING and voice_id in self._queue:
+                self._queue.remove(voice_id)
+                self._queue.appendleft(voice_id)
+            return state
+        if state is not None and state.status in (PENDING, PROCESSING):
+            # Source replaced mid-flight: the worker rebuilds when it notices.
+            state.fingerprint = fingerprint
+            return state
+
+        state = VoiceState(fingerprint)
+        self.states[voice_id] = state
+        async with self._wakeup:
+            self._enqueue(voice_id, urgent)
+            self._wakeup.notify()
+        return state
+
+    def _enqueue(self, voice_id: str, urgent: bool) -> None:
+        if urgent:
+            self._queue.appendleft(voice_id)
+        else:
+            self._queue.append(voice_id)
+
+    async def wait_ready(self, voice_id: str) -> VoiceState:
+        """Wait until a voice's reference is built, queueing it if needed.
+
+        Raises VoiceNotReadyError after PREPROCESS_WAIT_SECONDS and RuntimeError
+        if the sample could not be processed.
+        """
+        state = await self.submit(voice_id, urgent=True)
+        try:
+            async with asyncio.timeout(settings.PREPROCESS_WAIT_SECONDS):
+                await state.done.wait()
+        except TimeoutError as e:
+            raise VoiceNotReadyError(voice_id, self._retry_after(voice_id)) from e
+        if state.status == FAILED:
+            raise RuntimeError(
+                f"❌ Reference preprocessing failed for voice '{voice_id}': "
+                f"{state.error}"
+            )
+        return state
+
+    def _retry_after(self, voice_id: str) -> int:
+        """Rough seconds until the voice is processed: a few per voice ahead of it."""
+        try:
+            ahead = self._queue.index(voice_id)
+        except ValueError:
+            ahead = 0
+        return max(1, 2 * (ahead // self.worker_count + 1))
+
+    def forget(self, voice_id: str) -> None:
+        """Drop a deleted voice from the queue and the readiness table."""
+        self.states.pop(voice_id, None)
+        if voice_id in self._queue:
+            self._queue.remove(voice_id)
+
+    def status(self, voice_id: str) -> Optional[VoiceState]:
+        """Current preprocessing state of a voice (None if never seen)."""
+        return self.states.get(voice_id)
+
+    async def track(self, voices: list[VoiceResponse]) -> list[VoiceResponse]:
+        """Annotate voices with their readiness, queueing any never seen before.
+
+        Voices copied onto the volume after startup are picked up here.
+        """
+        for voice in voices:
+            if voice.id not in self.states:
+                try:
+                    await self.submit(voice.id)
+                except FileNotFoundError:
+                    continue
+        return [self.annotate(voice) for voice in voices]
+
+    def annotate(self, voice: VoiceResponse) -> VoiceResponse:
+        """Copy of `voice` with its preprocessing status and reference details."""
+        state = self.states.get(voice.id)
+        reference = None
+        if state is not None and state.metadata is not None:
+            reference = ReferenceInfo(
+                duration_seconds=state.metadata["duration_seconds"],
+                sample_rate=state.metadata["sample_rate"],
+                channels=state.metadata["channels"],
+            )
+        return voice.model_copy(
+            update={
+                "status": state.status if state else PENDING,
+                "reference": reference,
+            }
+        )
+
+    async def _next(self) -> tuple[str, VoiceState]:
+        async with self._wakeup:
+            while True:
+                while self._queue:
+                    voice_id = self._queue.popleft()
+                    state = self.states.get(voice_id)
+                    if state is not None:
+                        return voice_id, state
+                await self._wakeup.wait()
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            voice_id, state = await self._next()
+            state.status = PROCESSING
+            fingerprint = state.fingerprint
+            try:
+                # Drop the previous clip from memory before it is replaced on disk.
+                self.reference_cache.drop(voice_id)
+                source = await asyncio.to_thread(reference_source, voice_id)
+                metadata = await loop.run_in_executor(
+                    self._pool,
+                    build_reference,
+                    str(source),
+                    str(self.reference_cache.disk_path(voice_id)),
+                    str(self.reference_cache.metadata_path(voice_id)),
+                    settings.REFERENCE_SAMPLE_RATE,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                state.status = FAILED
+                state.error = str(e) or type(e).__name__
+                self.failed += 1
+                print(f"❌ Failed to prepare reference for '{voice_id}': {e}")
+            else:
+                state.status = READY
+                state.error = None
+                state.metadata = metadata
+                self.processed += 1
+                print(
+                    f"✅ Prepared reference for '{voice_id}' "
+                    f"({metadata['duration_seconds']}s @ {metadata['sample_rate']} Hz)"
+                )
+            if self.states.get(voice_id) is not state:
+                # Deleted while processing: do not leave artifacts behind.
+                await asyncio.to_thread(self.reference_cache.invalidate, voice_id)
+            elif state.fingerprint != fingerprint:
+                # Source replaced while processing: build again.
+                state.status = PENDING
+                async with self._wakeup:
+                    self._enqueue(voice_id, urgent=False)
+                    self._wakeup.notify()
+                continue
+            state.done.set()
+
+    def stats(self) -> dict:
+        """Return preprocessing counters for diagnostics."""
+        states = list(self.states.values())
+        return {
+            "workers": self.worker_count,
+            "queued": len(self._queue),
+            **{
+                status: sum(1 for s in states if s.status == status)
+                for status in (PENDING, PROCESSING, READY, FAILED)
+            },
+            "processed": self.processed,
+            "failed_total": self.failed,
+        }
@@ -0,0 +1,237 @@
+"""Cache of trimmed Fish Audio S2 reference clips.
+
+The preprocessing pipeline (`server.core.preprocess`) writes each voice's trimmed
+mono clip next to the voice as `<voice>.ref.wav`, with its metadata in
+`<voice>.ref.json`. Generation reads the clip through an in-memory LRU (bounded
+by a byte budget) keyed on the source file's fingerprint.
+
+On top of that, `ReferenceSetCache` keeps whole `references` arrays already packed
+as msgpack, so a recurring cast of voices is sent to S2 without rebuilding them.
+"""
+
+import json
+import pathlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from server.core import metrics
+from server.core.config import settings
+
+REFERENCE_SUFFIX = ".ref.wav"
+METADATA_SUFFIX = ".ref.json"
+
+
+def reference_fingerprint(source: pathlib.Path) -> tuple[int, int]:
+    """Return (mtime_ns, size) for a source reference file."""
+    stat = source.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def voice_fingerprint(voice_id: str) -> list:
+    """Return (name, mtime_ns, size) for every sample/transcript file of a voice.
+
+    Changes whenever the voice's reference audio or transcript is replaced.
+    """
+    voice_dir = settings.VOICES_DIR / voice_id
+    fingerprint = []
+    for ext in [*settings.SUPPORTED_AUDIO_FORMATS, "txt"]:
+        path = voice_dir / f"{voice_id}.{ext}"
+        try:
+            fingerprint.append([path.name, *reference_fingerprint(path)])
+        except OSError:
+            continue
+    return fingerprint
+
+
+class ReferenceCache:
+    """LRU of trimmed reference WAV bytes keyed by voice id and source fingerprint."""
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache holding at most `max_bytes` of audio."""
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[tuple[int, int], bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def disk_path(voice_id: str) -> pathlib.Path:
+        """Location of the persisted trimmed clip for a voice."""
+        return settings.VOICES_DIR / voice_id / f"{voice_id}{REFERENCE_SUFFIX}"
+
+    @staticmethod
+    def metadata_path(voice_id: str) -> pathlib.Path:
+        """Location of the metadata written alongside the trimmed clip."""
+        return settings.VOICES_DIR / voice_id / f"{voice_id}{METADATA_SUFFIX}"
+
+    def get(self, voice_id: str, source: pathlib.Path) -> Optional[bytes]:
+        """Return the cached trimmed clip for `source`, or None if stale/missing."""
+        fingerprint = reference_fingerprint(source)
+        with self._lock:
+            entry = self._entries.get(voice_id)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(voice_id)
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="reference", result="hit")
+                return entry[1]
+
+        # Fall back to the on-disk copy if its metadata says it was built from
+        # exactly this source (an older mtime can still be a different file).
+        try:
+            metadata = json.loads(self.metadata_path(voice_id).read_text())
+            built_from = (metadata.get("source_mtime_ns"), metadata.get("source_size"))
+            if built_from == fingerprint:
+                data = self.disk_path(voice_id).read_bytes()
+                if data:
+                    self._store(voice_id, fingerprint, data)
+                    with self._lock:
+                        self.disk_hits += 1
+                    metrics.CACHE_LOOKUPS.inc(cache="reference", result="disk_hit")
+                    return data
+        except (OSError, ValueError):
+            pass
+
+        with self._lock:
+            self.misses += 1
+        metrics.CACHE_LOOKUPS.inc(cache="reference", result="miss")
+        return None
+
+    def drop(self, voice_id: str) -> None:
+        """Forget a voice's clip in memory (the disk copy is kept)."""
+        with self._lock:
+            entry = self._entries.pop(voice_id, None)
+            if entry is not None:
+                self._bytes -= len(entry[1])
+
+    def invalidate(self, voice_id: str) -> None:
+        """Drop a voice's cached clip from memory and disk."""
+        self.drop(voice_id)
+        self.disk_path(voice_id).unlink(missing_ok=True)
+        self.metadata_path(voice_id).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """Return cache counters for diagnostics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def _store(self, voice_id: str, fingerprint: tuple[int, int], data: bytes) -> None:
+        """Insert an entry and evict least-recently-used clips over budget."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(voice_id, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[voice_id] = (fingerprint, data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+@dataclass
+class _ReferenceSet:
+    packed: bytes
+    # Work skipped on every reuse: preparing the references and packing them.
+    prepare_seconds: float
+    serialize_seconds: float
+
+
+class ReferenceSetCache:
+    """LRU of msgpack-packed S2 `references` arrays for ordered sets of voices.
+
+    The key is the voice ids in speaker order, each with its files' fingerprint
+    and its trimmed clip's mtime, so replacing a voice's sample, transcript or
+    clip simply yields a new key; stale sets age out of the LRU.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache holding at most `max_bytes` of packed sets."""
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, _ReferenceSet] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_prepare_seconds = 0.0
+        self.saved_serialize_seconds = 0.0
+
+    @staticmethod
+    def key(voice_ids: list[str]) -> Optional[tuple]:
+        """Cache key for `voice_ids` in this order, or None if a clip is not built."""
+        parts = []
+        for voice_id in voice_ids:
+            try:
+                clip_mtime = ReferenceCache.disk_path(voice_id).stat().st_mtime_ns
+            except OSError:
+                return None
+            fingerprint = tuple(tuple(entry) for entry in voice_fingerprint(voice_id))
+            parts.append((voice_id, clip_mtime, fingerprint))
+        return tuple(parts)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Return the packed set for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_prepare_seconds += entry.prepare_seconds
+                self.saved_serialize_seconds += entry.serialize_seconds
+        if entry is None:
+            metrics.CACHE_LOOKUPS.inc(cache="reference_set", result="miss")
+            return None
+        metrics.CACHE_LOOKUPS.inc(cache="reference_set", result="hit")
+        metrics.REFERENCE_SET_SAVED_SECONDS.inc(entry.prepare_seconds, work="prepare")
+        metrics.REFERENCE_SET_SAVED_SECONDS.inc(
+            entry.serialize_seconds, work="serialize"
+        )
+        return entry.packed
+
+    def put(
+        self,
+        key: tuple,
+        packed: bytes,
+        prepare_seconds: float,
+        serialize_seconds: float,
+    ) -> None:
+        """Store a packed set with the time it took to build, evicting over budget."""
+        if len(packed) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.packed)
+            self._entries[key] = _ReferenceSet(
+                packed, prepare_seconds, serialize_seconds
+            )
+            self._bytes += len(packed)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.packed)
+
+    def stats(self) -> dict:
+        """Return cache counters, including the build time saved by hits."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "saved_prepare_seconds": round(self.saved_prepare_seconds, 3),
+                "saved_serialize_seconds": round(self.saved_serialize_seconds, 3),
+            }
@@ -0,0 +1,31 @@
+"""Per-request IDs, carried from the HTTP layer into logs and Fish Audio S2 calls.
+
+The ID comes from the client's `X-Request-ID` header when present (so a caller
+can correlate its own logs) or is generated, and is echoed on the response.
+Tasks started while handling a request inherit it through the context.
+"""
+
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+HEADER = "X-Request-ID"
+
+# Accept caller-supplied IDs only if they are short and log-safe.
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Use a valid caller-supplied ID, otherwise generate one."""
+    if incoming and _VALID_ID.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def log_prefix() -> str:
+    """`[<request id>] ` for log lines, or nothing outside a request."""
+    current = request_id.get()
+    return "" if current == "-" else f"[{current}] "
@@ -0,0 +1,185 @@
+"""Priority scheduler and admission control in front of Fish Audio S2.
+
+Every S2 call takes a slot from a `Scheduler` first. At most `max_concurrency`
+calls run at once; the rest wait in a priority queue so an interactive request
+jumps ahead of queued batch work. Each priority class has a bounded queue (a full
+queue is rejected with a Retry-After estimate) and jobs whose deadline passes
+while queued are dropped before they reach the GPU.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from server.models.tts import Priority
+
+# Lower rank is served first.
+PRIORITY_RANK = {Priority.INTERACTIVE: 0, Priority.NORMAL: 1, Priority.BATCH: 2}
+
+# Initial guess for how long one S2 call holds a slot, before any were measured.
+INITIAL_SERVICE_SECONDS = 5.0
+# Weight of the newest sample in the moving average of service time.
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class SchedulerError(Exception):
+    """A job was refused by the scheduler."""
+
+
+class QueueFullError(SchedulerError):
+    """The job's priority queue is at capacity."""
+
+    def __init__(self, priority: Priority, retry_after: int):
+        """Record when the client should try again (seconds)."""
+        super().__init__(f"{priority.value} queue is full")
+        self.retry_after = retry_after
+
+
+class DeadlineExpiredError(SchedulerError):
+    """The job's deadline passed before it could start."""
+
+
+@dataclass(frozen=True)
+class Job:
+    """Scheduling metadata attached to one API request."""
+
+    priority: Priority = Priority.NORMAL
+    deadline: Optional[float] = None  # time.monotonic() timestamp
+
+    @classmethod
+    def create(
+        cls, priority: Optional[Priority], deadline_seconds: Optional[float]
+    ) -> "Job":
+        """Build a job from a priority and a relative deadline (both optional)."""
+        return cls(
+            priority=priority or Priority.NORMAL,
+            deadline=(
+                time.monotonic() + deadline_seconds if deadline_seconds else None
+            ),
+        )
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if there is no deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    seq: int
+    job: Job = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class Scheduler:
+    """Bounded-concurrency priority queue for S2 calls."""
+
+    def __init__(self, max_concurrency: int, max_queue_depth: int):
+        """Run up to `max_concurrency` jobs; queue `max_queue_depth` per class."""
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self._active = 0
+        self._heap: list[_Waiter] = []
+        self._queued = {priority: 0 for priority in Priority}
+        self._seq = itertools.count()
+        self._service_seconds = INITIAL_SERVICE_SECONDS
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @asynccontextmanager
+    async def slot(self, job: Optional[Job] = None) -> AsyncIterator[None]:
+        """Hold one S2 slot for the duration of the block."""
+        await self.acquire(job or Job())
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_seconds += SERVICE_TIME_SMOOTHING * (
+                time.monotonic() - started - self._service_seconds
+            )
+            self.release()
+
+    async def acquire(self, job: Job) -> None:
+        """Wait for a slot, honouring priority, queue limits and the job deadline."""
+        remaining = job.remaining()
+        if remaining is not None and remaining <= 0:
+            self.expired += 1
+            raise DeadlineExpiredError("Deadline expired before generation started")
+
+        if self._active < self.max_concurrency and not any(self._queued.values()):
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if self._queued[job.priority] >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(job.priority, self._retry_after(job.priority))
+
+        waiter = _Waiter(
+            rank=PRIORITY_RANK[job.priority],
+            seq=next(self._seq),
+            job=job,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._heap, waiter)
+        self._queued[job.priority] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), remaining)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done():
+                # The slot was granted just as we gave up: hand it on.
+                self.release()
+            else:
+                waiter.future.cancel()
+                self._queued[job.priority] -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.expired += 1
+                raise DeadlineExpiredError(
+                    "Deadline expired while queued for Fish Audio S2"
+                ) from e
+            raise
+
+    def release(self) -> None:
+        """Return a slot and start the highest-priority waiting job."""
+        self._active -= 1
+        while self._heap and self._active < self.max_concurrency:
+            waiter = heapq.heappop(self._heap)
+            if waiter.future.done():  # abandoned (timed out or cancelled)
+                continue
+            self._queued[waiter.job.priority] -= 1
+            self._active += 1
+            self.admitted += 1
+            waiter.future.set_result(None)
+
+    def load(self) -> int:
+        """Jobs running or waiting."""
+        return self._active + sum(self._queued.values())
+
+    def _retry_after(self, priority: Priority) -> int:
+        """Estimate seconds until a job of this priority could start."""
+        rank = PRIORITY_RANK[priority]
+        ahead = self._active + sum(
+            count for p, count in self._queued.items() if PRIORITY_RANK[p] <= rank
+        )
+        return max(1, math.ceil(ahead / self.max_concurrency * self._service_seconds))
+
+    def stats(self) -> dict:
+        """Return scheduler counters for diagnostics."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self._active,
+            "queued": {p.value: count for p, count in self._queued.items()},
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "avg_service_seconds": round(self._service_seconds, 3),
+        }
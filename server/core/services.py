@@ -0,0 +1,144 @@
+"""Application-wide service container.
+
+Every router shares one voice registry, one Fish Audio S2 client (with its
+backend pool) and one set of caches. The container is created by the FastAPI
+lifespan hook and handed to endpoints through dependency injection.
+"""
+
+import asyncio
+
+from server.core import metrics
+from server.core.audio_cache import AudioCache
+from server.core.backends import BackendPool
+from server.core.batch import BatchManager
+from server.core.config import settings
+from server.core.fish_client import FishSpeechClient
+from server.core.preprocess import VoicePreprocessor
+from server.core.reference_cache import ReferenceCache, ReferenceSetCache
+from server.core.singleflight import SingleFlight
+from server.core.voice_manager import VoiceManager
+from server.core.warmup import Warmup
+
+# How long shutdown waits for in-flight generations before closing the S2 pool.
+SHUTDOWN_DRAIN_SECONDS = 30
+
+
+class Services:
+    """Owns the long-lived components shared by every request."""
+
+    def __init__(self):
+        """Build every shared component once."""
+        self.reference_cache = ReferenceCache(settings.REFERENCE_CACHE_MAX_BYTES)
+        self.reference_sets = ReferenceSetCache(settings.REFERENCE_SET_CACHE_MAX_BYTES)
+        self.audio_cache = AudioCache(
+            cache_dir=settings.AUDIO_CACHE_DIR,
+            max_disk_bytes=settings.AUDIO_CACHE_DISK_BYTES,
+            max_memory_bytes=settings.AUDIO_CACHE_MEMORY_BYTES,
+            max_memory_item_bytes=settings.AUDIO_CACHE_MEMORY_ITEM_BYTES,
+        )
+        self.generation_flight = SingleFlight()
+        self.voice_manager = VoiceManager(self.reference_cache)
+        self.preprocessor = VoicePreprocessor(
+            self.reference_cache, workers=settings.PREPROCESS_WORKERS
+        )
+        self.backends = BackendPool(settings.fish_speech_urls)
+        self.fish_client = FishSpeechClient(
+            self.reference_cache,
+            self.reference_sets,
+            self.backends,
+            self.preprocessor,
+        )
+        self.warmup = Warmup(self.fish_client, self.voice_manager)
+        self.batches = BatchManager(
+            batch_dir=settings.BATCH_DIR,
+            workers=settings.BATCH_WORKERS,
+            retention_seconds=settings.BATCH_RETENTION_SECONDS,
+        )
+
+    async def start(self) -> None:
+        """Start background work: S2 probes, preprocessing, batches and warm-up."""
+        await self.backends.start()
+        voices = await asyncio.to_thread(self.voice_manager.list_voices)
+        await self.preprocessor.start([voice.id for voice in voices])
+        await self.batches.start()
+        await self.warmup.start()
+
+    def stats(self) -> dict:
+        """Runtime diagnostics: S2 backends, schedulers and cache counters."""
+        return {
+            "fish_speech": self.fish_client.pool_stats(),
+            "reference_cache": self.reference_cache.stats(),
+            "reference_sets": self.reference_sets.stats(),
+            "preprocessing": self.preprocessor.stats(),
+            "audio_cache": self.audio_cache.stats(),
+            "coalescing": self.generation_flight.stats(),
+            "batch": self.batches.stats(),
+            "warmup": self.warmup.stats(),
+        }
+
+    def health(self, voices_count: int) -> dict:
+        """Readiness summary built from cached state only; never calls S2.
+
+        Ready means warm-up has finished and at least one backend passed its
+        latest background probe without being ejected since.
+        """
+        backends = self.backends.health()
+        schedulers = [b.scheduler.stats() for b in self.backends.backends]
+        if not self.warmup.finished:
+            status = "warming_up"
+        elif backends["available"] == 0:
+            status = "unavailable"
+        else:
+            status = "ready"
+        audio_cache = self.audio_cache.stats()
+        reference_cache = self.reference_cache.stats()
+        reference_sets = self.reference_sets.stats()
+        preprocessing = self.preprocessor.stats()
+        return {
+            "status": status,
+            "fish_speech_status": backends["status"],
+            "voices_count": voices_count,
+            "queue_depth": sum(sum(s["queued"].values()) for s in schedulers),
+            "active_generations": sum(s["active"] for s in schedulers),
+            "backends": backends["backends"],
+            "preprocessing": {
+                "queued": preprocessing["queued"],
+                "failed": preprocessing["failed"],
+            },
+            "caches": {
+                "audio": {
+                    "enabled": audio_cache["enabled"],
+                    "entries": audio_cache["disk_entries"],
+                    "bytes": audio_cache["disk_bytes"],
+                },
+                "reference": {
+                    "entries": reference_cache["entries"],
+                    "bytes": reference_cache["bytes"],
+                },
+                "reference_sets": {
+                    "entries": reference_sets["entries"],
+                    "bytes": reference_sets["bytes"],
+                },
+            },
+            "warmup": self.warmup.stats(),
+        }
+
+    def export_metrics(self) -> None:
+        """Copy queue depths and backend health into their `/metrics` gauges."""
+        for backend in self.backends.backends:
+            metrics.S2_HEALTHY.set(int(backend.healthy), backend=backend.url)
+            queued = backend.scheduler.stats()["queued"]
+            for priority, depth in queued.items():
+                metrics.QUEUE_DEPTH.set(depth, backend=backend.url, priority=priority)
+        metrics.PREPROCESS_QUEUE.set(self.preprocessor.stats()["queued"])
+        metrics.BATCH_PENDING.set(self.batches.stats()["pending_items"])
+
+    async def aclose(self) -> None:
+        """Drain in-flight generations, then close the S2 connection pools."""
+        await self.warmup.aclose()
+        await self.batches.aclose()
+        pending = await self.generation_flight.drain(SHUTDOWN_DRAIN_SECONDS)
+        if pending:
+            print(f"⚠️  Shutting down with {pending} generation(s) still running")
+        await self.preprocessor.aclose()
+        await self.backends.aclose()
@@ -0,0 +1,71 @@
+"""Request coalescing ("single-flight") for identical in-flight generations.
+
+When several clients ask for the exact same audio at the same moment, only the
+first request reaches Fish Audio S2; the others await that generation and receive
+the same bytes.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Share one in-flight coroutine between concurrent callers with the same key."""
+
+    def __init__(self):
+        """Initialize with no in-flight work."""
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> tuple[Any, bool]:
+        """Run `fn` once per key at a time; return (result, shared).
+
+        `shared` is True when this caller joined a generation started by another
+        request. The work runs as its own task, so a disconnecting caller does not
+        cancel the generation for the others. A caller whose shared generation
+        fails with one of `retry_on` (an error about the leader's request rather
+        than the work) tries again, leading a new generation if none is running,
+        instead of inheriting the error.
+        """
+        while True:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._done(key, t))
+                self.leaders += 1
+                return await asyncio.shield(task), False
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(task), True
+            except retry_on:
+                continue
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished task and mark its exception as retrieved."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def drain(self, timeout: float) -> int:
+        """Wait up to `timeout` seconds for in-flight work; return how many remain."""
+        tasks = list(self._inflight.values())
+        if not tasks:
+            return 0
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        return len(pending)
+
+    def stats(self) -> dict:
+        """Return coalescing counters for diagnostics."""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -2,89 +2,194 @@
 
 import pathlib
 import shutil
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import BinaryIO, List, Optional
 
 from server.core.config import settings
+from server.core.reference_cache import ReferenceCache
 from server.models.voice import VoiceResponse
-from server.utils.audio import convert_to_format, get_audio_format, validate_audio_file
+from server.utils.audio import get_audio_format, validate_audio_file
+
+# Uploads are copied to disk in blocks of this size.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """The uploaded audio exceeds VOICE_UPLOAD_MAX_BYTES."""
+
+    def __init__(self):
+        """Describe the configured limit."""
+        limit_mb = settings.VOICE_UPLOAD_MAX_BYTES // (1024 * 1024)
+        super().__init__(f"❌ Audio file exceeds the {limit_mb} MB upload limit")
+
+
+def _spool(source: BinaryIO, target: pathlib.Path) -> int:
+    """Copy `source` to `target` in chunks, enforcing the upload size limit."""
+    written = 0
+    with open(target, "wb") as f:
+        while chunk := source.read(UPLOAD_CHUNK_BYTES):
+            written += len(chunk)
+            if written > settings.VOICE_UPLOAD_MAX_BYTES:
+                raise UploadTooLargeError()
+            f.write(chunk)
+    return written
 
 
 class VoiceManager:
     """Manages voice models and files."""
 
-    def __init__(self):
-        """Initialize voice manager."""
+    def __init__(self, reference_cache: ReferenceCache):
+        """Initialize voice manager and build the voice index."""
         self.voices_dir = settings.VOICES_DIR
+        self.reference_cache = reference_cache
         self.voices_dir.mkdir(parents=True, exist_ok=True)
 
-    def list_voices(self) -> List[VoiceResponse]:
-        """List all available voices."""
-        voices = []
+        # voice id -> (voice directory mtime, VoiceResponse or None if unusable).
+        # Scanning a voice costs several stat calls, so entries are only rebuilt
+        # when the voice's directory mtime changes (files added/removed/replaced).
+        self._index: dict[str, tuple[int, Optional[VoiceResponse]]] = {}
+        self._sorted: Optional[List[VoiceResponse]] = None
+        self._lock = threading.Lock()
+        self._last_reconcile = 0.0
+        self._reconcile(force=True)
+
+    def _scan_voice(self, voice_dir: pathlib.Path) -> Optional[VoiceResponse]:
+        """Build a VoiceResponse for one voice directory (None if it has no audio)."""
+        # Look for audio files
+        audio_file = None
+        for ext in settings.SUPPORTED_AUDIO_FORMATS:
+            potential_file = voice_dir / f"{voice_dir.name}.{ext}"
+            if potential_file.exists():
+                audio_file = potential_file
+                break
+
+        if not audio_file:
+            print(f"⚠️  Skipping {voice_dir.name}: no audio file found")
+            return None
+
+        # Check for transcript
+        transcript_file = voice_dir / f"{voice_dir.name}.txt"
+        has_transcript = transcript_file.exists()
+
+        # Get creation time (use directory creation time)
+        try:
+            created_at = datetime.fromtimestamp(voice_dir.stat().st_ctime).isoformat()
+        except (OSError, ValueError):
+            created_at = None
+
+        # Check for local avatar image
+        avatar_url = None
+        for ext in ("png", "jpg", "jpeg"):
+            if (voice_dir / f"{voice_dir.name}.{ext}").exists():
+                avatar_url = f"/voices/{voice_dir.name}/avatar"
+                break
+
+        return VoiceResponse(
+            id=voice_dir.name,
+            name=voice_dir.name,
+            has_transcript=has_transcript,
+            audio_format=get_audio_format(audio_file),
+            created_at=created_at,
+            avatar_url=avatar_url,
+        )
 
+    def _reconcile(self, force: bool = False) -> None:
+        """Sync the index with VOICES_DIR, at most once per refresh interval.
+
+        Catches voices added, removed or edited outside the API (e.g. copied onto
+        the volume). Only voices whose directory mtime changed are rescanned.
+        """
+        now = time.monotonic()
+        interval = settings.VOICE_INDEX_REFRESH_SECONDS
+        if not force and now - self._last_reconcile < interval:
+            return
+        self._last_reconcile = now
+
+        seen: dict[str, tuple[pathlib.Path, int]] = {}
         for voice_dir in self.voices_dir.iterdir():
-            if not voice_dir.is_dir():
+            try:
+                stat = voice_dir.stat()
+            except OSError:
                 continue
+            if voice_dir.is_dir():
+                seen[voice_dir.name] = (voice_dir, stat.st_mtime_ns)
 
-            # Look for audio files
-            audio_file = None
-            for ext in settings.SUPPORTED_AUDIO_FORMATS:
-                potential_file = voice_dir / f"{voice_dir.name}.{ext}"
-                if potential_file.exists():
-                    audio_file = potential_file
-                    break
+        with self._lock:
+            current = dict(self._index)
+        changed = {
+            voice_id: (voice_dir, mtime)
+            for voice_id, (voice_dir, mtime) in seen.items()
+            if voice_id not in current or current[voice_id][0] != mtime
+        }
+        removed = [voice_id for voice_id in current if voice_id not in seen]
+        if not changed and not removed:
+            return
 
-            if not audio_file:
-                print(f"⚠️  Skipping {voice_dir.name}: no audio file found")
-                continue
+        rebuilt = {
+            voice_id: (mtime, self._scan_voice(voice_dir))
+            for voice_id, (voice_dir, mtime) in changed.items()
+        }
 
-            # Check for transcript
-            transcript_file = voice_dir / f"{voice_dir.name}.txt"
-            has_transcript = transcript_file.exists()
+        with self._lock:
+            for voice_id in removed:
+                self._index.pop(voice_id, None)
+            self._index.update(rebuilt)
+            self._sorted = None
 
-            # Get creation time (use directory creation time)
-            try:
-                created_at = datetime.fromtimestamp(
-                    voice_dir.stat().st_ctime
-                ).isoformat()
-            except (OSError, ValueError):
-                created_at = None
-
-            # Check for local avatar image
-            avatar_url = None
-            for ext in ("png", "jpg", "jpeg"):
-                if (voice_dir / f"{voice_dir.name}.{ext}").exists():
-                    avatar_url = f"/voices/{voice_dir.name}/avatar"
-                    break
-
-            voice = VoiceResponse(
-                id=voice_dir.name,
-                name=voice_dir.name,
-                has_transcript=has_transcript,
-                audio_format=get_audio_format(audio_file),
-                created_at=created_at,
-                avatar_url=avatar_url,
-            )
-            voices.append(voice)
+    def _refresh_voice(self, voice_id: str) -> Optional[VoiceResponse]:
+        """Rescan one voice immediately and update its index entry."""
+        voice_dir = self.voices_dir / voice_id
+        try:
+            mtime = voice_dir.stat().st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._index.pop(voice_id, None)
+                self._sorted = None
+            return None
+        voice = self._scan_voice(voice_dir)
+        with self._lock:
+            self._index[voice_id] = (mtime, voice)
+            self._sorted = None
+        return voice
 
-        return sorted(voices, key=lambda v: v.name)
+    def list_voices(self) -> List[VoiceResponse]:
+        """List all available voices."""
+        self._reconcile()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    (voice for _, voice in self._index.values() if voice),
+                    key=lambda v: v.name,
+                )
+            return list(self._sorted)
+
+    def count_voices(self) -> int:
+        """Number of usable voices, reconciling the index at most once per interval."""
+        self._reconcile()
+        with self._lock:
+            return sum(1 for _, voice in self._index.values() if voice)
 
     def get_voice(self, voice_id: str) -> Optional[VoiceResponse]:
         """Get a specific voice by ID."""
-        voices = self.list_voices()
-        for voice in voices:
-            if voice.id == voice_id:
-                return voice
-        return None
+        self._reconcile()
+        with self._lock:
+            entry = self._index.get(voice_id)
+        return entry[1] if entry else None
 
     def create_voice(
         self,
         voice_id: str,
-        audio_data: bytes,
+        audio_file: BinaryIO,
         audio_filename: str,
         transcript: Optional[str] = None,
     ) -> VoiceResponse:
-        """Create a new voice from audio data."""
+        """Create a new voice from an uploaded audio file object.
+
+        The audio is copied to the voice directory in chunks, so it is never held
+        in memory whole.
+        """
         # Validate voice ID
         if not voice_id or not voice_id.replace("_", "").replace("-", "").isalnum():
             raise ValueError(
@@ -97,6 +202,8 @@ class VoiceManager:
             raise ValueError(f"❌ Voice '{voice_id}' already exists")
 
         voice_dir.mkdir(parents=True)
+        # Never serve a trimmed clip left over from a previous voice with this id.
+        self.reference_cache.invalidate(voice_id)
 
         try:
             # Determine audio format from filename
@@ -108,8 +215,8 @@ class VoiceManager:
 
             # Save audio file
             audio_file_path = voice_dir / f"{voice_id}.{audio_format}"
-            with open(audio_file_path, "wb") as f:
-                f.write(audio_data)
+            if not _spool(audio_file, audio_file_path):
+                raise ValueError("❌ Audio file is empty")
 
             # Validate the saved audio file
             if not validate_audio_file(audio_file_path):
@@ -123,29 +230,13 @@ class VoiceManager:
             else:
                 print("⚠️  No transcript provided - you'll need to add one manually")
 
-            # 🎵 Create WAV version for Fish-speech compatibility
-            wav_file_path = voice_dir / f"{voice_id}.wav"
-            if audio_format != "wav":
-                print(
-                    f"🔄 Converting {audio_format.upper()} to WAV for Fish-speech compatibility..."
-                )
-                if convert_to_format(audio_file_path, wav_file_path, "wav"):
-                    print(f"✅ Created WAV version: {wav_file_path}")
-                else:
-                    print(
-                        f"⚠️  Warning: Failed to create WAV version, Fish-speech may not work properly"
-                    )
-
             print(f"✅ Created voice '{voice_id}' with audio format: {audio_format}")
 
-            # Return the created voice
-            return VoiceResponse(
-                id=voice_id,
-                name=voice_id,
-                has_transcript=transcript is not None,
-                audio_format=audio_format,
-                created_at=datetime.now().isoformat(),
-            )
+            # Index the new voice right away and return it
+            voice = self._refresh_voice(voice_id)
+            if voice is None:
+                raise ValueError(f"❌ Voice '{voice_id}' could not be indexed")
+            return voice
 
         except Exception as e:
             # Clean up on failure
@@ -161,7 +252,9 @@ class VoiceManager:
             return False
 
         try:
+            self.reference_cache.invalidate(voice_id)
             shutil.rmtree(voice_dir)
+            self._refresh_voice(voice_id)
             print(f"🗑️  Deleted voice '{voice_id}'")
             return True
         except (OSError, PermissionError) as e:
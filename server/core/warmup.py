@@ -0,0 +1,260 @@
+"""Startup warm-up: synthetic generations before the server takes traffic.
+
+Fish Audio S2 compiles its model (torch.compile) for every new input shape, so
+the first dialogue with a given number of speakers can stall for tens of
+seconds. Warm-up sends one short generation per hot voice and one dialogue per
+configured speaker count to every backend, and the server reports not-ready
+until every one of them has succeeded, so load balancers keep traffic away.
+
+On first boot warm-up runs alongside reference preprocessing, so it waits for
+the references of the voices it uses before sending anything. Failed
+generations are retried a few times. A backend the pool ejects is dropped from
+the warm-up, so one dead backend does not hold back the healthy ones; beyond
+that, only WARMUP_TIMEOUT_SECONDS lets the server report ready with shapes
+still cold.
+"""
+
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, Optional
+
+from server.core.backends import Backend
+from server.core.config import settings
+from server.core.fish_client import FishSpeechClient
+from server.core.preprocess import VoiceNotReadyError
+from server.core.scheduler import Job, QueueFullError
+from server.core.voice_manager import VoiceManager
+from server.models.tts import Priority
+
+# Status values reported in /stats and /health/ready.
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+DISABLED = "disabled"
+
+WARMUP_TEXT = "Warming up the speech model."
+
+# Queued behind any real request that arrives while warming up.
+WARMUP_JOB = Job(priority=Priority.BATCH)
+
+# Pause before retrying a warm-up generation that failed.
+RETRY_SECONDS = 5.0
+# Failed attempts after which a shape is given up on one backend.
+MAX_ATTEMPTS = 5
+# How often a running generation checks that its backend was not ejected.
+HEALTH_POLL_SECONDS = 1.0
+
+# (label, generate) for one warm-up generation, sent to each backend.
+Shape = tuple[str, Callable[[Backend], Awaitable[bytes]]]
+
+
+class Warmup:
+    """Runs the warm-up generations in the background and tracks progress."""
+
+    def __init__(self, fish_client: FishSpeechClient, voice_manager: VoiceManager):
+        """Prepare a warm-up; nothing is sent until `start()`."""
+        self.fish_client = fish_client
+        self.voice_manager = voice_manager
+        self.status = PENDING
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.given_up = 0
+        self.skipped_backends: list[str] = []
+        self.timed_out = False
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        """True once warm-up no longer holds back readiness."""
+        return self.status in (DONE, TIMED_OUT, FAILED, DISABLED)
+
+    async def start(self) -> None:
+        """Begin warming up every backend in the background."""
+        if not settings.WARMUP_ENABLED:
+            self.status = DISABLED
+            return
+        if self._task is None:
+            self.status = RUNNING
+            self._task = asyncio.create_task(self._run())
+
+    def _voices(self) -> tuple[list[str], list[str]]:
+        """Hot voices, and the dialogue casting order (hot voices first)."""
+        known = [voice.id for voice in self.voice_manager.list_voices()]
+        hot = []
+        for voice_id in settings.warmup_voices:
+            if voice_id in known:
+                hot.append(voice_id)
+            else:
+                print(f"⚠️  Warm-up voice '{voice_id}' not found; skipping")
+        cast = hot + [voice_id for voice_id in known if voice_id not in hot]
+        return hot, cast
+
+    async def _with_references(self, voice_ids: list[str], needed: int) -> list[str]:
+        """The first `needed` of `voice_ids` whose reference clips are built.
+
+        Waits for as long as preprocessing takes; voices whose sample cannot be
+        processed are skipped.
+        """
+        ready: list[str] = []
+        for voice_id in voice_ids:
+            if len(ready) == needed:
+                break
+            while True:
+                try:
+                    await self.fish_client.preprocessor.wait_ready(voice_id)
+                except VoiceNotReadyError:
+                    continue  # still queued behind first-boot preprocessing
+                except RuntimeError as e:
+                    print(f"⚠️  Warm-up skipping voice '{voice_id}': {e}")
+                else:
+                    ready.append(voice_id)
+                break
+        return ready
+
+    def _plan(self, hot: list[str], cast: list[str]) -> list[Shape]:
+        """Every warm-up generation, for voices whose references are ready."""
+        shapes: list[Shape] = [
+            (f"voice '{voice_id}'", functools.partial(self._speech, voice_id))
+            for voice_id in hot
+        ]
+        for count in settings.warmup_speaker_counts:
+            if count > len(cast):
+                print(f"⚠️  Only {len(cast)} voices; skipping {count}-speaker warm-up")
+                continue
+            turns = [(voice_id, WARMUP_TEXT) for voice_id in cast[:count]]
+            shapes.append(
+                (f"{count}-speaker dialogue", functools.partial(self._dialogue, turns))
+            )
+        return shapes
+
+    async def _speech(self, voice_id: str, backend: Backend) -> bytes:
+        return await self.fish_client.generate_speech(
+            WARMUP_TEXT, voice_id, job=WARMUP_JOB, backend=backend
+        )
+
+    async def _dialogue(self, turns: list[tuple[str, str]], backend: Backend) -> bytes:
+        return await self.fish_client.generate_dialogue(
+            turns, job=WARMUP_JOB, backend=backend
+        )
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        status = DONE
+        try:
+            async with asyncio.timeout(settings.WARMUP_TIMEOUT_SECONDS):
+                hot, cast = await asyncio.to_thread(self._voices)
+                hot = await self._with_references(hot, len(hot))
+                most_speakers = max(settings.warmup_speaker_counts, default=0)
+                cast = await self._with_references(cast, most_speakers)
+                shapes = self._plan(hot, cast)
+
+                backends = self.fish_client.backends.backends
+                self.total = len(shapes) * len(backends)
+                print(
+                    f"🔥 Warming up {len(backends)} backend(s) with "
+                    f"{len(shapes)} generation(s) each"
+                )
+                await asyncio.gather(*(self._warm(b, shapes) for b in backends))
+        except TimeoutError:
+            status = TIMED_OUT
+            self.timed_out = True
+            print(
+                f"⚠️  Warm-up timed out after {settings.WARMUP_TIMEOUT_SECONDS:.0f}s "
+                f"with {self.total - self.completed} generation(s) still cold; "
+                "serving anyway"
+            )
+        except Exception as e:
+            status = FAILED
+            print(f"❌ Warm-up failed: {e}")
+        self.duration = time.perf_counter() - started
+        self.status = status
+        print(
+            f"🔥 Warm-up {status} in {self.duration:.1f}s: "
+            f"{self.completed}/{self.total} warmed, {self.failed} failed attempt(s), "
+            f"{self.given_up} given up, {len(self.skipped_backends)} backend(s) skipped"
+        )
+
+    async def _warm(self, backend: Backend, shapes: list[Shape]) -> None:
+        """Run every warm-up generation on one backend, one at a time.
+
+        A failed generation is retried up to MAX_ATTEMPTS times. If the pool
+        ejects the backend, its remaining shapes leave the readiness count.
+        """
+        for index, (label, generate) in enumerate(shapes):
+            attempts = 0
+            while True:
+                if not backend.healthy:
+                    self.total -= len(shapes) - index
+                    self.skipped_backends.append(backend.url)
+                    print(f"⚠️  Warm-up skipping ejected backend {backend.url}")
+                    return
+                try:
+                    await self._attempt(backend, generate)
+                except (QueueFullError, VoiceNotReadyError) as e:
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    self.failed += 1
+                    attempts += 1
+                    if not backend.healthy:
+                        continue
+                    if attempts >= MAX_ATTEMPTS:
+                        self.given_up += 1
+                        print(
+                            f"❌ Warm-up {label} on {backend.url} failed "
+                            f"{attempts} times; giving up: {e}"
+                        )
+                        break
+                    print(
+                        f"⚠️  Warm-up {label} on {backend.url} failed: {e}; "
+                        f"retrying in {RETRY_SECONDS:.0f}s"
+                    )
+                    await asyncio.sleep(RETRY_SECONDS)
+                else:
+                    self.completed += 1
+                    break
+
+    @staticmethod
+    async def _attempt(
+        backend: Backend, generate: Callable[[Backend], Awaitable[bytes]]
+    ) -> None:
+        """Run one generation, abandoning it if the backend is ejected meanwhile."""
+        task = asyncio.ensure_future(generate(backend))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=HEALTH_POLL_SECONDS)
+                if not task.done() and not backend.healthy:
+                    task.cancel()
+                    raise RuntimeError("backend was ejected")
+        finally:
+            if not task.done():
+                task.cancel()
+        task.result()
+
+    async def aclose(self) -> None:
+        """Stop a warm-up that is still running."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        """Return warm-up progress for diagnostics."""
+        return {
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "given_up": self.given_up,
+            "skipped_backends": self.skipped_backends,
+            "timed_out": self.timed_out,
+            "duration_seconds": (
+                round(self.duration, 3) if self.duration is not None else None
+            ),
+        }
@@ -1,12 +1,45 @@
 """Main FastAPI application for plomtts."""
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from server.api import tts, voices
+from server.api.dependencies import get_services
+from server.api.middleware import RequestMetricsMiddleware, UploadLimitMiddleware
+from server.core import metrics
 from server.core.config import settings
-from server.core.fish_client import FishSpeechClient
-from server.core.voice_manager import VoiceManager
+from server.core.preprocess import VoiceNotReadyError
+from server.core.scheduler import DeadlineExpiredError, QueueFullError
+from server.core.services import Services
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared service container on startup and drain it on shutdown."""
+    print("🚀 Starting plomtts server...")
+    print(f"📁 Voices directory: {settings.VOICES_DIR}")
+    print(f"🐟 Fish-speech backends: {', '.join(settings.fish_speech_urls)}")
+
+    # Ensure voices directory exists
+    settings.VOICES_DIR.mkdir(parents=True, exist_ok=True)
+
+    services = Services()
+    await services.start()
+    app.state.services = services
+
+    # Log available voices
+    all_voices = services.voice_manager.list_voices()
+    print(f"🎵 Found {len(all_voices)} voices: {[v.name for v in all_voices]}")
+
+    yield
+
+    print("👋 Shutting down plomtts server...")
+    await services.aclose()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -15,6 +48,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware to allow requests from all origins
@@ -24,16 +58,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(UploadLimitMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """Shed load when a priority queue is full."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Server busy: {exc}"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(DeadlineExpiredError)
+async def deadline_expired_handler(request: Request, exc: DeadlineExpiredError):
+    """The request's deadline passed before generation could start."""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(VoiceNotReadyError)
+async def voice_not_ready_handler(request: Request, exc: VoiceNotReadyError):
+    """The voice's reference clip is still being preprocessed."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 # Include routers
 app.include_router(voices.router)
 app.include_router(tts.router)
 
-# Initialize components
-fish_client = FishSpeechClient()
-voice_manager = VoiceManager()
-
 
 @app.get("/", tags=["root"])
 async def root():
@@ -47,24 +107,48 @@ async def root():
 
 
 @app.get("/health", tags=["health"])
-async def health():
-    """Health check endpoint."""
+async def health(services: Services = Depends(get_services)):
+    """Health check endpoint (always 200; see /health/ready for readiness)."""
+    return {
+        "status": "ok",
+        "fish_speech_status": services.backends.health()["status"],
+        "voices_count": await asyncio.to_thread(services.voice_manager.count_voices),
+    }
+
+
+@app.get("/health/live", tags=["health"])
+async def live():
+    """Liveness: the process is up and its event loop is responsive."""
     return {"status": "ok"}
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event."""
-    print("🚀 Starting plomtts server...")
-    print(f"📁 Voices directory: {settings.VOICES_DIR}")
-    print(f"🐟 Fish-speech endpoint: {settings.fish_speech_url}")
+@app.get("/health/ready", tags=["health"])
+async def ready(services: Services = Depends(get_services)):
+    """Readiness: 503 while warming up or with no usable S2 backend.
 
-    # Ensure voices directory exists
-    settings.VOICES_DIR.mkdir(parents=True, exist_ok=True)
+    Served from the background backend probes and in-memory counters, so it is
+    cheap to poll.
+    """
+    voices_count = await asyncio.to_thread(services.voice_manager.count_voices)
+    summary = services.health(voices_count)
+    if summary["status"] != "ready":
+        return JSONResponse(status_code=503, content=summary)
+    return summary
 
-    # Log available voices
-    all_voices = voice_manager.list_voices()
-    print(f"🎵 Found {len(all_voices)} voices: {[v.name for v in all_voices]}")
+
+@app.get("/stats", tags=["health"])
+async def stats(services: Services = Depends(get_services)):
+    """Runtime diagnostics: S2 connection pool and cache counters."""
+    return services.stats()
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics_endpoint(services: Services = Depends(get_services)):
+    """Prometheus metrics: request latency, per-stage timings, caches and queues."""
+    services.export_metrics()
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,34 @@
 """Pydantic models for voice management."""
 
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
+# Upper bound for a single long-form request (roughly a book chapter).
+LONGFORM_MAX_CHARS = 100_000
+# Upper bound for the number of items in one batch job.
+BATCH_MAX_ITEMS = 5000
+
+
+class Priority(str, Enum):
+    """Scheduling class for generation requests (interactive is served first)."""
+
+    INTERACTIVE = "interactive"
+    NORMAL = "normal"
+    BATCH = "batch"
+
+
+class AudioFormat(str, Enum):
+    """Encoding of the generated audio."""
+
+    MP3 = "mp3"
+    WAV = "wav"
+    PCM = "pcm"  # raw 16-bit little-endian samples
+    OPUS = "opus"
+    OGG = "ogg"  # Opus in an Ogg container, same bytes as opus
+    FLAC = "flac"
+
 
 class TTSRequest(BaseModel):
     """Request model for TTS generation."""
@@ -25,14 +50,60 @@ class TTSRequest(BaseModel):
     )
     seed: int = Field(0, description="Random seed (0 for random)")
 
+    # Output encoding (see server.core.formats)
+    output_format: Optional[AudioFormat] = Field(
+        None,
+        description="mp3, wav, pcm, opus, ogg or flac (default: Accept, else mp3)",
+    )
+    sample_rate: Optional[int] = Field(
+        None,
+        description="Output sample rate in Hz (default: S2's own)",
+        ge=8000,
+        le=48000,
+    )
+    channels: int = Field(1, description="Output channels (wav, pcm, flac)", ge=1, le=2)
+
+    # Scheduling (not part of the generated audio)
+    priority: Optional[Priority] = Field(
+        None, description="Scheduling class (default: X-Priority header or normal)"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        description="Drop the job if it has not started on S2 within this many seconds",
+        gt=0,
+    )
+
+
+class LongTTSRequest(TTSRequest):
+    """Request model for long-form TTS (articles, chapters).
+
+    The text is split on paragraph and sentence boundaries and each segment is
+    generated as its own S2 request.
+    """
+
+    text: str = Field(
+        ...,
+        description="Text to convert to speech",
+        min_length=1,
+        max_length=LONGFORM_MAX_CHARS,
+    )
+    segment_chars: Optional[int] = Field(
+        None,
+        description="Target characters per segment (default: server setting)",
+        ge=100,
+        le=2500,
+    )
+
 
 class DialogueTurn(BaseModel):
     """One turn in a multi-speaker dialogue."""
 
     voice_id: str = Field(..., description="Voice ID for this turn")
     text: str = Field(
-        ..., description="Text for this turn (may include [emotion] tags)",
-        min_length=1, max_length=2500,
+        ...,
+        description="Text for this turn (may include [emotion] tags)",
+        min_length=1,
+        max_length=2500,
     )
 
 
@@ -40,7 +111,8 @@ class MultiTTSRequest(BaseModel):
     """Request model for multi-speaker dialogue generation.
 
     Turns are rendered in order; each unique voice maps to one Fish Audio S2
-    `<|speaker:N|>` and the whole dialogue is generated in a single context-aware call.
+    `<|speaker:N|>`. A dialogue with up to five speakers that fits one call is generated
+    in a single context-aware call; larger ones are rendered in consecutive windows.
     """
 
     turns: list[DialogueTurn] = Field(
@@ -59,6 +131,72 @@ class MultiTTSRequest(BaseModel):
     )
     seed: int = Field(0, description="Random seed (0 for random)")
 
+    # Output encoding (see server.core.formats)
+    output_format: Optional[AudioFormat] = Field(
+        None,
+        description="mp3, wav, pcm, opus, ogg or flac (default: Accept, else mp3)",
+    )
+    sample_rate: Optional[int] = Field(
+        None,
+        description="Output sample rate in Hz (default: S2's own)",
+        ge=8000,
+        le=48000,
+    )
+    channels: int = Field(1, description="Output channels (wav, pcm, flac)", ge=1, le=2)
+
+    # Scheduling (not part of the generated audio)
+    priority: Optional[Priority] = Field(
+        None, description="Scheduling class (default: X-Priority header or normal)"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        description="Drop the job if it has not started on S2 within this many seconds",
+        gt=0,
+    )
+
+
+class BatchTTSRequest(BaseModel):
+    """Request model for an asynchronous batch of TTS generations.
+
+    Items run at `batch` priority unless they set their own; deadlines are ignored.
+    """
+
+    items: list[TTSRequest] = Field(
+        ..., description="Generations to run", min_length=1, max_length=BATCH_MAX_ITEMS
+    )
+
+
+class BatchItemStatus(BaseModel):
+    """Progress of one item in a batch job."""
+
+    index: int = Field(..., description="Position of the item in the request")
+    voice_id: str = Field(..., description="Voice ID used")
+    status: str = Field(
+        ..., description="pending, running, completed, failed or cancelled"
+    )
+    filename: Optional[str] = Field(None, description="File name in the archive")
+    duration_seconds: Optional[float] = Field(
+        None, description="Audio duration in seconds"
+    )
+    error: Optional[str] = Field(None, description="Failure reason")
+
+
+class BatchJobResponse(BaseModel):
+    """Response model for a batch job."""
+
+    job_id: str = Field(..., description="Batch job identifier")
+    status: str = Field(
+        ..., description="queued, running, completed, failed or cancelled"
+    )
+    total: int = Field(..., description="Number of items")
+    completed: int = Field(..., description="Items generated successfully")
+    failed: int = Field(..., description="Items that failed")
+    created_at: str = Field(..., description="Submission timestamp")
+    finished_at: Optional[str] = Field(None, description="Completion timestamp")
+    items: Optional[list[BatchItemStatus]] = Field(
+        None, description="Per-item progress"
+    )
+
 
 class TTSResponse(BaseModel):
     """Response model for TTS generation."""
@@ -13,6 +13,14 @@ class VoiceCreate(BaseModel):
     transcript: Optional[str] = Field(None, description="Optional transcript text")
 
 
+class ReferenceInfo(BaseModel):
+    """The preprocessed reference clip sent to Fish Audio S2."""
+
+    duration_seconds: float = Field(..., description="Clip duration in seconds")
+    sample_rate: int = Field(..., description="Clip sample rate in Hz")
+    channels: int = Field(..., description="Number of audio channels")
+
+
 class VoiceResponse(BaseModel):
     """Response model for voice information."""
 
@@ -23,6 +31,13 @@ class VoiceResponse(BaseModel):
     audio_format: str = Field(..., description="Audio file format (mp3, wav, etc.)")
     created_at: Optional[str] = Field(None, description="Creation timestamp")
     avatar_url: Optional[str] = Field(None, description="Avatar image URL")
+    status: Optional[str] = Field(
+        default=None,
+        description="Reference preprocessing state: pending, processing, ready, failed",
+    )
+    reference: Optional[ReferenceInfo] = Field(
+        default=None, description="Preprocessed reference clip, once ready"
+    )
 
 
 class VoiceListResponse(BaseModel):
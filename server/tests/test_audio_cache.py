@@ -0,0 +1,127 @@
+"""Tests for the generated audio cache."""
+
+import os
+
+import pytest
+
+from server.core.audio_cache import AudioCache, audio_cache_key
+from server.core.config import settings
+
+
+def make_cache(tmp_path, disk: int = 100, memory: int = 100, item: int = 100):
+    return AudioCache(
+        tmp_path,
+        max_disk_bytes=disk,
+        max_memory_bytes=memory,
+        max_memory_item_bytes=item,
+    )
+
+
+class TestAudioCacheKey:
+    """Everything that changes the audio changes the key."""
+
+    def test_inputs_change_the_key(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "VOICES_DIR", tmp_path)
+        key = audio_cache_key("hello", ["alice"], {"seed": 1}, "mp3")
+        assert key == audio_cache_key("hello", ["alice"], {"seed": 1}, "mp3")
+        assert key != audio_cache_key("hello!", ["alice"], {"seed": 1}, "mp3")
+        assert key != audio_cache_key("hello", ["bob"], {"seed": 1}, "mp3")
+        assert key != audio_cache_key("hello", ["alice"], {"seed": 2}, "mp3")
+        assert key != audio_cache_key("hello", ["alice"], {"seed": 1}, "wav:0:1")
+
+    def test_replacing_a_voice_changes_the_key(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "VOICES_DIR", tmp_path)
+        (tmp_path / "alice").mkdir()
+        sample = tmp_path / "alice" / "alice.wav"
+        sample.write_bytes(b"sample")
+        key = audio_cache_key("hello", ["alice"], {"seed": 1}, "mp3")
+        sample.write_bytes(b"another sample")
+        assert audio_cache_key("hello", ["alice"], {"seed": 1}, "mp3") != key
+
+
+class TestAudioCache:
+    """Memory tier in front of a byte-bounded disk tier, both LRU."""
+
+    def test_put_then_get_from_memory(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put("a", b"audio", 1.5)
+        cached = cache.get("a")
+        assert (cached.data, cached.duration) == (b"audio", 1.5)
+        assert (cache.memory_hits, cache.disk_hits) == (1, 0)
+
+    def test_miss(self, tmp_path):
+        cache = make_cache(tmp_path)
+        assert cache.get("a") is None
+        assert cache.misses == 1
+
+    def test_large_clips_skip_the_memory_tier(self, tmp_path):
+        cache = make_cache(tmp_path, item=4)
+        cache.put("a", b"audio", 1.0)
+        assert cache.stats()["memory_entries"] == 0
+        assert cache.get("a").data == b"audio"
+        assert cache.disk_hits == 1
+
+    def test_disk_hit_is_promoted_to_memory(self, tmp_path):
+        make_cache(tmp_path).put("a", b"audio", 1.0)
+        cache = make_cache(tmp_path)  # a restart: memory is empty
+        assert cache.get("a").data == b"audio"
+        assert cache.get("a").data == b"audio"
+        assert (cache.disk_hits, cache.memory_hits) == (1, 1)
+
+    def test_memory_tier_evicts_least_recently_used(self, tmp_path):
+        cache = make_cache(tmp_path, memory=10)
+        cache.put("a", b"12345", 1.0)
+        cache.put("b", b"12345", 1.0)
+        cache.get("a")
+        cache.put("c", b"12345", 1.0)
+
+        stats = cache.stats()
+        assert (stats["memory_entries"], stats["memory_bytes"]) == (2, 10)
+        cache.get("b")
+        assert cache.disk_hits == 1  # b only survived on disk
+
+    def test_disk_tier_evicts_least_recently_used(self, tmp_path):
+        cache = make_cache(tmp_path, disk=10, memory=0)
+        cache.put("a", b"12345", 1.0)
+        cache.put("b", b"12345", 1.0)
+        cache.get("a")
+        cache.put("c", b"12345", 1.0)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.evictions == 1
+        assert not (tmp_path / "b.audio").exists()
+        assert cache.stats()["disk_bytes"] == 10
+
+    def test_restart_keeps_disk_lru_order(self, tmp_path):
+        cache = make_cache(tmp_path, disk=10, memory=0)
+        cache.put("a", b"12345", 1.0)
+        cache.put("b", b"12345", 1.0)
+        os.utime(tmp_path / "a.audio", ns=(1, 1))
+        os.utime(tmp_path / "b.audio", ns=(2, 2))
+
+        cache = make_cache(tmp_path, disk=10, memory=0)
+        cache.put("c", b"12345", 1.0)
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+    def test_broken_disk_entry_is_dropped(self, tmp_path):
+        make_cache(tmp_path).put("a", b"audio", 1.0)
+        (tmp_path / "a.json").write_text("not json")
+
+        cache = make_cache(tmp_path)
+        assert cache.get("a") is None
+        assert not (tmp_path / "a.audio").exists()
+        assert cache.stats()["disk_entries"] == 0
+
+    def test_disabled_without_a_disk_budget(self, tmp_path):
+        cache = make_cache(tmp_path, disk=0)
+        cache.put("a", b"audio", 1.0)
+        assert cache.get("a") is None
+        assert not cache.stats()["enabled"]
+
+    @pytest.mark.parametrize("data", [b"", b"x" * 101])
+    def test_empty_or_oversized_clips_are_not_stored(self, tmp_path, data):
+        cache = make_cache(tmp_path)
+        cache.put("a", data, 1.0)
+        assert cache.stats()["disk_entries"] == 0
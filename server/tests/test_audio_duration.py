@@ -0,0 +1,174 @@
+"""Tests for header-based audio duration parsing."""
+
+import struct
+
+import pytest
+
+from server.utils.audio_duration import (
+    estimate_duration,
+    flac_duration,
+    mp3_duration,
+    ogg_duration,
+    wav_duration,
+)
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, stereo, no padding: 417-byte frames.
+MP3_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_BYTES = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+# Stereo MPEG-1 Layer III side information is 32 bytes.
+SIDE_INFO = b"\x00" * 32
+
+
+def mp3_frame(payload: bytes = b"") -> bytes:
+    """One MP3 frame whose body starts with `payload`."""
+    body = payload.ljust(MP3_FRAME_BYTES - 4, b"\x00")
+    return MP3_HEADER + body
+
+
+def xing_frame(frames: int, tag: bytes = b"Xing") -> bytes:
+    """A Xing/Info summary frame announcing `frames` audio frames."""
+    return mp3_frame(SIDE_INFO + tag + struct.pack(">II", 0x1, frames))
+
+
+def vbri_frame(frames: int) -> bytes:
+    """A Fraunhofer VBRI summary frame announcing `frames` audio frames."""
+    vbri = b"VBRI" + struct.pack(">HHHI", 1, 0, 50, 0) + struct.pack(">I", frames)
+    return mp3_frame(b"\x00" * 32 + vbri)
+
+
+def id3v2(size: int) -> bytes:
+    """An ID3v2 tag with a `size`-byte body (syncsafe size field)."""
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x03\x00\x00" + syncsafe + b"\x00" * size
+
+
+def wav(data_bytes: int, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """A PCM16 WAV file with `data_bytes` of silence."""
+    byte_rate = sample_rate * channels * 2
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, byte_rate, channels * 2, 16)
+    body = (
+        b"WAVE"
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", data_bytes)
+        + b"\x00" * data_bytes
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def flac(total_samples: int, sample_rate: int = 44100) -> bytes:
+    """A FLAC stream consisting of just the marker and a STREAMINFO block."""
+    # sample rate (20) | channels-1 (3) | bits-1 (5) | total samples (36)
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = b"\x00" * 10 + struct.pack(">Q", packed) + b"\x00" * 16
+    return b"fLaC" + b"\x00" + (34).to_bytes(3, "big") + streaminfo
+
+
+def ogg_page(serial: int, granule: int, body: bytes, flags: int = 0) -> bytes:
+    """One Ogg page holding `body` in a single lacing run."""
+    lacing = [255] * (len(body) // 255) + [len(body) % 255]
+    header = b"OggS" + bytes([0, flags]) + struct.pack("<qIII", granule, serial, 0, 0)
+    return header + bytes([len(lacing)]) + bytes(lacing) + body
+
+
+def opus_stream(serial: int, samples_48k: int, pre_skip: int = 312) -> bytes:
+    """An Ogg Opus stream ending at granule `pre_skip + samples_48k`."""
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", pre_skip, 48000, 0, 0)
+    return ogg_page(serial, 0, head, flags=0x02) + ogg_page(
+        serial, pre_skip + samples_48k, b"\x00" * 10, flags=0x04
+    )
+
+
+class TestMp3:
+    """MP3 duration from summary headers and frame walks."""
+
+    def test_xing_header(self):
+        data = xing_frame(100) + mp3_frame() * 3
+        assert mp3_duration(data) == pytest.approx(100 * MP3_FRAME_SECONDS)
+
+    def test_info_header(self):
+        data = xing_frame(40, tag=b"Info") + mp3_frame() * 3
+        assert mp3_duration(data) == pytest.approx(40 * MP3_FRAME_SECONDS)
+
+    def test_vbri_header(self):
+        data = vbri_frame(250) + mp3_frame() * 3
+        assert mp3_duration(data) == pytest.approx(250 * MP3_FRAME_SECONDS)
+
+    def test_frame_walk_without_summary(self):
+        data = mp3_frame() * 10
+        assert mp3_duration(data) == pytest.approx(10 * MP3_FRAME_SECONDS)
+
+    def test_frame_walk_skips_id3_tags(self):
+        data = id3v2(64) + mp3_frame() * 5 + b"TAG" + b"\x00" * 125
+        assert mp3_duration(data) == pytest.approx(5 * MP3_FRAME_SECONDS)
+
+    def test_no_frames(self):
+        assert mp3_duration(b"\x00" * 1000) is None
+
+    def test_truncated_xing_header(self):
+        data = xing_frame(100)[: 4 + 32 + 8]
+        assert estimate_duration(data) is None
+
+
+class TestWav:
+    """WAV duration from the fmt and data chunks."""
+
+    def test_data_chunk(self):
+        assert wav_duration(wav(32000)) == pytest.approx(1.0)
+
+    def test_streamed_size_uses_available_bytes(self):
+        data = bytearray(wav(16000))
+        data[data.index(b"data") + 4 : data.index(b"data") + 8] = b"\xff" * 4
+        assert wav_duration(bytes(data)) == pytest.approx(0.5)
+
+    def test_truncated_data_chunk(self):
+        assert wav_duration(wav(32000)[:-16000]) == pytest.approx(0.5, abs=0.01)
+
+    def test_truncated_before_fmt(self):
+        assert wav_duration(wav(32000)[:16]) is None
+
+
+class TestFlac:
+    """FLAC duration from STREAMINFO."""
+
+    def test_streaminfo(self):
+        assert flac_duration(flac(88200)) == pytest.approx(2.0)
+
+    def test_unknown_length(self):
+        assert flac_duration(flac(0)) is None
+
+    def test_truncated(self):
+        assert flac_duration(flac(88200)[:20]) is None
+
+
+class TestOgg:
+    """Ogg Opus/Vorbis duration from granule positions."""
+
+    def test_opus(self):
+        assert ogg_duration(opus_stream(1, 48000)) == pytest.approx(1.0)
+
+    def test_chained_streams_are_summed(self):
+        data = opus_stream(1, 48000) + opus_stream(2, 24000)
+        assert ogg_duration(data) == pytest.approx(1.5)
+
+    def test_truncated_final_page_header(self):
+        data = opus_stream(1, 48000)
+        assert ogg_duration(data[:-30]) is None
+
+    def test_truncated_chained_stream_keeps_earlier_streams(self):
+        data = opus_stream(1, 48000) + opus_stream(2, 24000)[:-30]
+        assert ogg_duration(data) == pytest.approx(1.0)
+
+
+class TestEstimateDuration:
+    """Format sniffing in front of the parsers."""
+
+    def test_sniffs_container(self):
+        assert estimate_duration(wav(16000)) == pytest.approx(0.5)
+        assert estimate_duration(flac(44100)) == pytest.approx(1.0)
+
+    def test_unknown_format(self):
+        assert estimate_duration(b"not audio at all") is None
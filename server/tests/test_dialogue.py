@@ -0,0 +1,67 @@
+"""Tests for dialogue window planning."""
+
+from server.utils.dialogue import context_budget_chars, plan_dialogue
+
+REFERENCE_SECONDS = 24
+
+
+def sentence(n: int) -> str:
+    return f"This is sentence number {n} of the dialogue. "
+
+
+class TestSingleWindow:
+    """Dialogues S2 can take whole stay one context-aware call."""
+
+    def test_short_dialogue(self):
+        turns = [("alice", "Hi!"), ("bob", "Hello."), ("alice", "How are you?")]
+        [window] = plan_dialogue(turns, REFERENCE_SECONDS)
+        assert window.turns == turns
+        assert window.speakers == ["alice", "bob"]
+
+    def test_ordinary_long_dialogue_is_not_split(self):
+        # ~1,900 characters and five speakers: still inside the context.
+        turns = [(f"voice{i % 5}", sentence(i) * 2) for i in range(20)]
+        assert sum(len(text) for _, text in turns) > 1500
+        assert len(plan_dialogue(turns, REFERENCE_SECONDS)) == 1
+
+    def test_budget_shrinks_with_speakers(self):
+        assert context_budget_chars(1, 24) > context_budget_chars(5, 24)
+        assert context_budget_chars(5, 0) > context_budget_chars(5, 24)
+
+
+class TestWindows:
+    """Windows appear only when a limit is actually exceeded."""
+
+    def test_more_than_five_speakers(self):
+        turns = [(f"voice{i}", f"Line {i}.") for i in range(7)]
+        windows = plan_dialogue(turns, REFERENCE_SECONDS)
+        assert [len(w.speakers) for w in windows] == [5, 2]
+        assert [turn for w in windows for turn in w.turns] == turns
+
+    def test_context_overflow(self):
+        budget = context_budget_chars(2, REFERENCE_SECONDS)
+        turns = [("alice", sentence(i) * 4) for i in range(0, 40, 2)]
+        turns += [("bob", sentence(i) * 4) for i in range(1, 40, 2)]
+        windows = plan_dialogue(turns, REFERENCE_SECONDS)
+        assert len(windows) > 1
+        for window in windows:
+            chars = sum(len(text) for _, text in window.turns)
+            assert chars <= budget
+
+    def test_oversized_turn_is_split_on_sentences(self):
+        text = "".join(sentence(i) for i in range(120))
+        windows = plan_dialogue([("alice", text)], REFERENCE_SECONDS)
+        assert len(windows) > 1
+        assert all(w.speakers == ["alice"] for w in windows)
+        budget = context_budget_chars(1, REFERENCE_SECONDS)
+        assert all(len(text) <= budget for w in windows for _, text in w.turns)
+
+    def test_speaker_order_is_global(self):
+        turns = [(f"voice{i}", f"Line {i}.") for i in range(6)] + [("voice0", "Bye.")]
+        windows = plan_dialogue(turns, REFERENCE_SECONDS)
+        assert windows[1].speakers == ["voice0", "voice5"]
+
+    def test_max_chars_caps_windows(self):
+        turns = [("alice", "One two three."), ("bob", "Four five six.")]
+        windows = plan_dialogue(turns, REFERENCE_SECONDS, max_chars=20)
+        assert [w.turns for w in windows] == [[turns[0]], [turns[1]]]
@@ -0,0 +1,112 @@
+"""Tests for output format conversion."""
+
+import asyncio
+from array import array
+
+import pytest
+
+from server.core.audio_cache import audio_cache_key
+from server.core.formats import OutputSpec, convert, relay_stream
+from server.models.tts import AudioFormat
+from server.utils.wav import WavFormat, parse_wav, resample, wav_header
+
+S2_FORMAT = WavFormat(channels=1, sample_rate=44100, bits_per_sample=16)
+
+
+def ramp(frames: int) -> bytes:
+    """Mono 16-bit PCM rising by one step per frame."""
+    return array("h", (i % 30000 for i in range(frames))).tobytes()
+
+
+def s2_wav(frames: int) -> bytes:
+    pcm = ramp(frames)
+    return wav_header(S2_FORMAT, len(pcm)) + pcm
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestResample:
+    """Linear-interpolation resampling of 16-bit PCM."""
+
+    def test_length_follows_rate(self):
+        pcm = resample(ramp(44100), S2_FORMAT, 22050)
+        assert len(pcm) // 2 == pytest.approx(22050, abs=1)
+
+    def test_interpolates_between_frames(self):
+        samples = array("h")
+        samples.frombytes(resample(ramp(100), S2_FORMAT, 88200))
+        assert list(samples[:5]) == [0, 0, 1, 1, 2]
+
+    def test_same_rate_is_unchanged(self):
+        pcm = ramp(1000)
+        assert resample(pcm, S2_FORMAT, 44100) is pcm
+
+
+class TestConvert:
+    """S2 responses at their native rate are resampled to the requested one."""
+
+    def test_wav_at_requested_rate(self):
+        spec = OutputSpec(AudioFormat.WAV, sample_rate=16000)
+        data, duration = convert(s2_wav(44100), spec)
+        wav_format, pcm = parse_wav(data)
+        assert wav_format.sample_rate == 16000
+        assert duration == pytest.approx(1.0, abs=0.001)
+
+    def test_stereo_pcm_at_requested_rate(self):
+        spec = OutputSpec(AudioFormat.PCM, sample_rate=22050, channels=2)
+        pcm, duration = convert(s2_wav(44100), spec)
+        assert len(pcm) // 4 == pytest.approx(22050, abs=1)
+        assert duration == pytest.approx(1.0, abs=0.001)
+
+    def test_mp3_rates_get_their_own_cache_keys(self):
+        def key(sample_rate):
+            tag = OutputSpec(AudioFormat.MP3, sample_rate).cache_tag
+            return audio_cache_key("hello", [], {"seed": 1}, tag)
+
+        assert OutputSpec(AudioFormat.MP3).cache_tag == "mp3"
+        assert len({key(None), key(16000), key(22050)}) == 3
+
+    def test_native_rate_passes_through(self):
+        data = s2_wav(4410)
+        assert convert(data, OutputSpec(AudioFormat.WAV, 44100)) == (data, 0.1)
+
+
+class TestRelayStream:
+    """Streamed WAV relayed as wav or raw PCM."""
+
+    def test_pcm_strips_header(self):
+        data = s2_wav(4410)
+        stream = relay_stream(chunked(data, 1000), OutputSpec(AudioFormat.PCM, 44100))
+        assert asyncio.run(collect(stream)) == ramp(4410)
+
+    def test_wav_at_native_rate_passes_through(self):
+        data = s2_wav(4410)
+        stream = relay_stream(chunked(data, 1000), OutputSpec(AudioFormat.WAV))
+        assert asyncio.run(collect(stream)) == data
+
+    def test_wav_is_resampled_with_new_header(self):
+        header = wav_header(S2_FORMAT)
+        spec = OutputSpec(AudioFormat.WAV, 16000)
+        streamed = asyncio.run(
+            collect(relay_stream(chunked(header + ramp(44100), 1001), spec))
+        )
+        wav_format, pcm = parse_wav(streamed)
+        assert wav_format.sample_rate == 16000
+        assert pcm == resample(ramp(44100), S2_FORMAT, 16000)
+
+    def test_resamples_chunk_by_chunk(self):
+        wav_format = WavFormat(1, 44100, 16)
+        header = wav_header(wav_format)
+        spec = OutputSpec(AudioFormat.PCM, 24000)
+        # Odd chunk sizes split frames across chunks.
+        streamed = asyncio.run(
+            collect(relay_stream(chunked(header + ramp(44100), 1001), spec))
+        )
+        assert streamed == resample(ramp(44100), wav_format, 24000)
@@ -0,0 +1,39 @@
+"""Tests for the ASGI middleware."""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from server.api.middleware import MULTIPART_SLACK_BYTES, UploadLimitMiddleware
+from server.core.config import settings
+
+
+class TestUploadLimit:
+    """Oversized voice uploads are refused before the body is read."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(settings, "VOICE_UPLOAD_MAX_BYTES", 1000)
+        app = FastAPI()
+        app.add_middleware(UploadLimitMiddleware)
+
+        @app.post("/voices")
+        async def create_voice(request: Request):
+            return {"received": len(await request.body())}
+
+        return TestClient(app)
+
+    def test_rejects_declared_length_over_limit(self, client):
+        body = b"x" * (1000 + MULTIPART_SLACK_BYTES + 1)
+        response = client.post("/voices", content=body)
+        assert response.status_code == 413
+        assert "upload limit" in response.json()["detail"]
+
+    def test_accepts_body_within_limit(self, client):
+        response = client.post("/voices", content=b"x" * 500)
+        assert response.status_code == 200
+        assert response.json() == {"received": 500}
+
+    def test_other_routes_are_not_limited(self, client):
+        body = b"x" * (1000 + MULTIPART_SLACK_BYTES + 1)
+        assert client.post("/tts", content=body).status_code == 404
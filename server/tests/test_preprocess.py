@@ -0,0 +1,173 @@
+"""Tests for background preprocessing of voice references."""
+
+import asyncio
+import json
+import os
+from array import array
+
+import pytest
+
+from server.core.config import settings
+from server.core.preprocess import (
+    FAILED,
+    READY,
+    REFERENCE_TRIM_SECONDS,
+    VoiceNotReadyError,
+    VoicePreprocessor,
+    build_reference,
+)
+from server.core.reference_cache import ReferenceCache
+from server.utils.wav import WavFormat, parse_wav, wav_header
+
+RATE = 8000
+
+
+def sample(seconds: float, channels: int = 1) -> bytes:
+    """A 16-bit WAV: a second of silence, then a loud square wave."""
+    wav_format = WavFormat(channels, RATE, 16)
+    silent = array("h", bytes(wav_format.frames(1) * wav_format.frame_bytes))
+    loud = array(
+        "h",
+        (
+            8000 if (i // channels) % 20 < 10 else -8000
+            for i in range(wav_format.frames(seconds) * channels)
+        ),
+    )
+    pcm = (silent + loud).tobytes()
+    return wav_header(wav_format, len(pcm)) + pcm
+
+
+@pytest.fixture
+def voices_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VOICES_DIR", tmp_path)
+    monkeypatch.setattr(settings, "PREPROCESS_WAIT_SECONDS", 30)
+    # Build in-process clips without ffmpeg, so they keep the source rate.
+    monkeypatch.setattr("shutil.which", lambda name: None)
+    return tmp_path
+
+
+def add_voice(voices_dir, voice_id: str, data: bytes, ext: str = "wav"):
+    voice_dir = voices_dir / voice_id
+    voice_dir.mkdir(exist_ok=True)
+    (voice_dir / f"{voice_id}.txt").write_text("hello")
+    source = voice_dir / f"{voice_id}.{ext}"
+    source.write_bytes(data)
+    return source
+
+
+def build(voice_id: str, source) -> dict:
+    return build_reference(
+        str(source),
+        str(ReferenceCache.disk_path(voice_id)),
+        str(ReferenceCache.metadata_path(voice_id)),
+        RATE,
+    )
+
+
+class TestBuildReference:
+    """One voice sample turned into a trimmed mono clip plus metadata."""
+
+    def test_trims_silence_and_downmixes(self, voices_dir):
+        source = add_voice(voices_dir, "alice", sample(2, channels=2))
+        info = build("alice", source)
+
+        wav_format, pcm = parse_wav(ReferenceCache.disk_path("alice").read_bytes())
+        assert wav_format.channels == 1
+        # The leading second of silence is gone (a short margin is kept).
+        assert info["duration_seconds"] == pytest.approx(2, abs=0.05)
+        assert info["channels"] == 1
+
+    def test_long_samples_are_trimmed(self, voices_dir):
+        source = add_voice(voices_dir, "alice", sample(REFERENCE_TRIM_SECONDS + 5))
+        assert build("alice", source)["duration_seconds"] <= REFERENCE_TRIM_SECONDS
+
+    def test_metadata_records_the_source_fingerprint(self, voices_dir):
+        source = add_voice(voices_dir, "alice", sample(1))
+        build("alice", source)
+        metadata = json.loads(ReferenceCache.metadata_path("alice").read_text())
+        stat = source.stat()
+        assert metadata["source_mtime_ns"] == stat.st_mtime_ns
+        assert metadata["source_size"] == stat.st_size
+
+    def test_silent_sample_fails_without_artifacts(self, voices_dir):
+        wav_format = WavFormat(1, RATE, 16)
+        source = add_voice(
+            voices_dir, "alice", wav_header(wav_format, 800) + bytes(800)
+        )
+        with pytest.raises(ValueError):
+            build("alice", source)
+        assert not ReferenceCache.disk_path("alice").exists()
+        assert not ReferenceCache.metadata_path("alice").exists()
+
+
+def run(voices: list[str], scenario) -> VoicePreprocessor:
+    """Run `scenario(preprocessor)` against a started one-worker pool."""
+
+    async def main():
+        preprocessor = VoicePreprocessor(ReferenceCache(max_bytes=1 << 20), workers=1)
+        await preprocessor.start(voices)
+        try:
+            await scenario(preprocessor)
+        finally:
+            await preprocessor.aclose()
+        return preprocessor
+
+    return asyncio.run(main())
+
+
+class TestVoicePreprocessor:
+    """The process pool builds every voice that lacks a current clip."""
+
+    def test_builds_missing_references(self, voices_dir):
+        add_voice(voices_dir, "alice", sample(1))
+
+        async def scenario(preprocessor):
+            state = await preprocessor.wait_ready("alice")
+            assert state.status == READY
+            assert state.metadata["sample_rate"] == RATE
+
+        preprocessor = run(["alice"], scenario)
+        assert preprocessor.processed == 1
+        assert ReferenceCache.disk_path("alice").exists()
+
+    def test_current_artifacts_are_reused_at_startup(self, voices_dir):
+        build("alice", add_voice(voices_dir, "alice", sample(1)))
+
+        async def scenario(preprocessor):
+            assert preprocessor.status("alice").status == READY
+
+        assert run(["alice"], scenario).processed == 0
+
+    def test_replaced_source_is_rebuilt_at_startup(self, voices_dir):
+        source = add_voice(voices_dir, "alice", sample(1))
+        build("alice", source)
+        # Replaced by an older file (a restored backup keeps its mtime).
+        source.write_bytes(sample(2))
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+
+        async def scenario(preprocessor):
+            state = await preprocessor.wait_ready("alice")
+            assert state.metadata["source_size"] == source.stat().st_size
+
+        assert run(["alice"], scenario).processed == 1
+
+    def test_undecodable_sample_fails(self, voices_dir):
+        add_voice(voices_dir, "alice", b"not audio", ext="mp3")
+
+        async def scenario(preprocessor):
+            with pytest.raises(RuntimeError, match="preprocessing failed"):
+                await preprocessor.wait_ready("alice")
+            assert preprocessor.status("alice").status == FAILED
+
+        assert run(["alice"], scenario).failed == 1
+
+    def test_slow_voice_is_not_ready(self, voices_dir, monkeypatch):
+        monkeypatch.setattr(settings, "PREPROCESS_WAIT_SECONDS", 0)
+        add_voice(voices_dir, "alice", sample(1))
+
+        async def scenario(preprocessor):
+            with pytest.raises(VoiceNotReadyError) as excinfo:
+                await preprocessor.wait_ready("alice")
+            assert excinfo.value.retry_after >= 1
+
+        run(["alice"], scenario)
@@ -0,0 +1,166 @@
+"""Tests for the reference clip and reference set caches."""
+
+import json
+import os
+import pathlib
+
+import pytest
+
+from server.core.config import settings
+from server.core.reference_cache import (
+    ReferenceCache,
+    ReferenceSetCache,
+    reference_fingerprint,
+)
+
+
+@pytest.fixture
+def voices_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VOICES_DIR", tmp_path)
+    return tmp_path
+
+
+def add_voice(voices_dir, voice_id: str, sample: bytes = b"sample") -> pathlib.Path:
+    """Write a voice's source sample and transcript; returns the sample path."""
+    voice_dir = voices_dir / voice_id
+    voice_dir.mkdir(exist_ok=True)
+    (voice_dir / f"{voice_id}.txt").write_text("hello")
+    source = voice_dir / f"{voice_id}.wav"
+    source.write_bytes(sample)
+    return source
+
+
+def build_clip(voice_id: str, source, clip: bytes) -> None:
+    """Write the artifacts the preprocessor leaves for `source`."""
+    mtime_ns, size = reference_fingerprint(source)
+    ReferenceCache.disk_path(voice_id).write_bytes(clip)
+    ReferenceCache.metadata_path(voice_id).write_text(
+        json.dumps({"source_mtime_ns": mtime_ns, "source_size": size})
+    )
+
+
+class TestReferenceCache:
+    """Trimmed clips from memory, else from a disk copy built from this source."""
+
+    def test_disk_copy_is_loaded_into_memory(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"clip")
+        cache = ReferenceCache(max_bytes=100)
+
+        assert cache.get("alice", source) == b"clip"
+        assert cache.get("alice", source) == b"clip"
+        assert (cache.disk_hits, cache.hits, cache.misses) == (1, 1, 0)
+
+    def test_missing_clip_is_a_miss(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        cache = ReferenceCache(max_bytes=100)
+        assert cache.get("alice", source) is None
+        assert cache.misses == 1
+
+    def test_replaced_source_is_not_served_from_memory(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"clip")
+        cache = ReferenceCache(max_bytes=100)
+        assert cache.get("alice", source) == b"clip"
+
+        source.write_bytes(b"a new, longer sample")
+        assert cache.get("alice", source) is None
+
+    def test_source_replaced_by_an_older_file_is_stale(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"clip")
+
+        # A restored backup: different content, mtime older than the clip's.
+        source.write_bytes(b"restored sample")
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+        assert ReferenceCache(max_bytes=100).get("alice", source) is None
+
+    def test_least_recently_used_clip_is_evicted(self, voices_dir):
+        cache = ReferenceCache(max_bytes=10)
+        sources = {}
+        for voice_id in ("alice", "bob", "carol"):
+            sources[voice_id] = add_voice(voices_dir, voice_id)
+            build_clip(voice_id, sources[voice_id], b"12345")
+
+        cache.get("alice", sources["alice"])
+        cache.get("bob", sources["bob"])
+        cache.get("alice", sources["alice"])  # bob is now least recently used
+        cache.get("carol", sources["carol"])
+
+        assert cache.stats()["bytes"] == 10
+        assert cache.stats()["entries"] == 2
+        cache.get("bob", sources["bob"])
+        assert cache.disk_hits == 4
+
+    def test_clip_over_budget_is_not_kept(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"a clip too large to keep")
+        cache = ReferenceCache(max_bytes=10)
+        assert cache.get("alice", source) == b"a clip too large to keep"
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_removes_memory_and_disk_copies(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"clip")
+        cache = ReferenceCache(max_bytes=100)
+        cache.get("alice", source)
+
+        cache.invalidate("alice")
+        assert not cache.disk_path("alice").exists()
+        assert not cache.metadata_path("alice").exists()
+        assert cache.get("alice", source) is None
+
+
+class TestReferenceSetCache:
+    """Packed reference arrays keyed on the voices they were built from."""
+
+    def test_key_needs_every_clip(self, voices_dir):
+        alice = add_voice(voices_dir, "alice")
+        add_voice(voices_dir, "bob")
+        build_clip("alice", alice, b"clip")
+        assert ReferenceSetCache.key(["alice"]) is not None
+        assert ReferenceSetCache.key(["alice", "bob"]) is None
+
+    def test_key_follows_speaker_order(self, voices_dir):
+        for voice_id in ("alice", "bob"):
+            build_clip(voice_id, add_voice(voices_dir, voice_id), b"clip")
+        assert ReferenceSetCache.key(["alice", "bob"]) != ReferenceSetCache.key(
+            ["bob", "alice"]
+        )
+
+    def test_changed_voice_changes_the_key(self, voices_dir):
+        source = add_voice(voices_dir, "alice")
+        build_clip("alice", source, b"clip")
+        key = ReferenceSetCache.key(["alice"])
+
+        (voices_dir / "alice" / "alice.txt").write_text("a new transcript")
+        assert ReferenceSetCache.key(["alice"]) != key
+        key = ReferenceSetCache.key(["alice"])
+
+        source.write_bytes(b"a new sample")
+        assert ReferenceSetCache.key(["alice"]) != key
+
+    def test_hits_report_the_work_saved(self, voices_dir):
+        build_clip("alice", add_voice(voices_dir, "alice"), b"clip")
+        key = ReferenceSetCache.key(["alice"])
+        cache = ReferenceSetCache(max_bytes=100)
+
+        assert cache.get(key) is None
+        cache.put(key, b"packed", prepare_seconds=0.25, serialize_seconds=0.5)
+        assert cache.get(key) == b"packed"
+        assert cache.get(key) == b"packed"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["saved_prepare_seconds"] == 0.5
+        assert stats["saved_serialize_seconds"] == 1.0
+
+    def test_least_recently_used_set_is_evicted(self):
+        cache = ReferenceSetCache(max_bytes=10)
+        cache.put(("a",), b"12345", 0, 0)
+        cache.put(("b",), b"12345", 0, 0)
+        cache.get(("a",))
+        cache.put(("c",), b"12345", 0, 0)
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == b"12345"
+        assert cache.stats()["bytes"] == 10
@@ -0,0 +1,258 @@
+"""Tests for the S2 priority scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.api.tts import _generate_cached
+from server.core.formats import OutputSpec
+from server.core.scheduler import (
+    DeadlineExpiredError,
+    Job,
+    QueueFullError,
+    Scheduler,
+)
+from server.core.singleflight import SingleFlight
+from server.main import deadline_expired_handler, queue_full_handler
+from server.models.tts import AudioFormat, Priority
+from server.utils.wav import WavFormat, wav_header
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def settle():
+    """Let queued waiters and released slots run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def until(condition) -> None:
+    """Wait (briefly) for work handed to worker threads to catch up."""
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+class TestAdmission:
+    """Slots, priority order and queue limits."""
+
+    def test_admits_up_to_max_concurrency(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=2, max_queue_depth=4)
+            await scheduler.acquire(Job())
+            await scheduler.acquire(Job())
+            waiter = asyncio.create_task(scheduler.acquire(Job()))
+            await settle()
+            assert not waiter.done()
+            assert scheduler.load() == 3
+
+            scheduler.release()
+            await waiter
+            assert scheduler.stats()["active"] == 2
+            assert scheduler.admitted == 3
+
+        run(scenario())
+
+    def test_higher_priority_jumps_the_queue(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=4)
+            await scheduler.acquire(Job())
+            order: list[Priority] = []
+
+            async def wait(priority: Priority):
+                await scheduler.acquire(Job(priority=priority))
+                order.append(priority)
+                scheduler.release()
+
+            tasks = [
+                asyncio.create_task(wait(Priority.BATCH)),
+                asyncio.create_task(wait(Priority.NORMAL)),
+                asyncio.create_task(wait(Priority.INTERACTIVE)),
+            ]
+            await settle()
+            scheduler.release()
+            await asyncio.gather(*tasks)
+            assert order == [Priority.INTERACTIVE, Priority.NORMAL, Priority.BATCH]
+
+        run(scenario())
+
+    def test_full_queue_is_rejected_with_retry_after(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=1)
+            await scheduler.acquire(Job())
+            waiter = asyncio.create_task(scheduler.acquire(Job()))
+            await settle()
+
+            with pytest.raises(QueueFullError) as excinfo:
+                await scheduler.acquire(Job())
+            # One running + one queued ahead, at the initial 5 s service guess.
+            assert excinfo.value.retry_after == 10
+            assert scheduler.rejected == 1
+
+            # Other priority classes have their own queue.
+            interactive = asyncio.create_task(
+                scheduler.acquire(Job(priority=Priority.INTERACTIVE))
+            )
+            await settle()
+            scheduler.release()
+            await interactive
+            assert not waiter.done()
+            waiter.cancel()
+
+        run(scenario())
+
+    def test_slot_releases_on_error(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=1)
+            with pytest.raises(RuntimeError):
+                async with scheduler.slot():
+                    raise RuntimeError("S2 failed")
+            assert scheduler.load() == 0
+
+        run(scenario())
+
+
+class TestDeadlines:
+    """Jobs whose deadline passes never reach S2."""
+
+    def test_expired_before_queueing(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=1)
+            with pytest.raises(DeadlineExpiredError):
+                await scheduler.acquire(Job(deadline=0.0))
+            assert scheduler.expired == 1
+            assert scheduler.load() == 0
+
+        run(scenario())
+
+    def test_expires_while_queued(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=2)
+            await scheduler.acquire(Job())
+            with pytest.raises(DeadlineExpiredError):
+                await scheduler.acquire(Job.create(None, 0.01))
+            assert scheduler.expired == 1
+            assert scheduler.stats()["queued"][Priority.NORMAL.value] == 0
+
+            # The abandoned waiter is skipped; the next job gets the slot.
+            waiter = asyncio.create_task(scheduler.acquire(Job()))
+            await settle()
+            scheduler.release()
+            await waiter
+            assert scheduler.stats()["active"] == 1
+
+        run(scenario())
+
+    def test_cancelled_waiter_frees_its_queue_place(self):
+        async def scenario():
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=1)
+            await scheduler.acquire(Job())
+            waiter = asyncio.create_task(scheduler.acquire(Job()))
+            await settle()
+            waiter.cancel()
+            await settle()
+            assert scheduler.load() == 1
+
+        run(scenario())
+
+
+class TestCoalescedJobs:
+    """Callers sharing a generation keep their own scheduling."""
+
+    WAV = wav_header(WavFormat(1, 44100, 16), 4) + bytes(4)
+
+    def generate(self, scheduler: Scheduler, job: Job):
+        async def render() -> bytes:
+            async with scheduler.slot(job):
+                return self.WAV
+
+        return render
+
+    def request(self, services, scheduler: Scheduler, job: Job):
+        return _generate_cached(
+            services,
+            "hello",
+            [],
+            {"seed": None},
+            self.generate(scheduler, job),
+            OutputSpec(AudioFormat.WAV),
+            job,
+        )
+
+    def test_follower_outlives_the_leaders_deadline(self):
+        async def scenario():
+            services = SimpleNamespace(generation_flight=SingleFlight())
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=4)
+            await scheduler.acquire(Job())  # S2 is busy
+
+            leader = asyncio.create_task(
+                self.request(services, scheduler, Job.create(None, 0.05))
+            )
+            await until(lambda: scheduler.load() == 2)
+            follower = asyncio.create_task(self.request(services, scheduler, Job()))
+            with pytest.raises(DeadlineExpiredError):
+                await leader
+
+            scheduler.release()
+            audio, headers = await follower
+            assert audio.data == self.WAV
+            assert services.generation_flight.coalesced == 1
+
+        run(scenario())
+
+    def test_priorities_do_not_share_a_generation(self):
+        async def scenario():
+            services = SimpleNamespace(generation_flight=SingleFlight())
+            scheduler = Scheduler(max_concurrency=1, max_queue_depth=4)
+            await scheduler.acquire(Job())
+
+            batch = asyncio.create_task(
+                self.request(services, scheduler, Job(priority=Priority.BATCH))
+            )
+            await until(lambda: scheduler.load() == 2)
+            interactive = asyncio.create_task(
+                self.request(services, scheduler, Job(priority=Priority.INTERACTIVE))
+            )
+            # The interactive request queues on its own, ahead of the batch one.
+            await until(lambda: scheduler.load() == 3)
+            assert services.generation_flight.leaders == 2
+
+            scheduler.release()
+            await asyncio.gather(batch, interactive)
+
+        run(scenario())
+
+
+class TestErrorResponses:
+    """Scheduler refusals map to HTTP status codes."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_exception_handler(QueueFullError, queue_full_handler)
+        app.add_exception_handler(DeadlineExpiredError, deadline_expired_handler)
+
+        @app.get("/queue-full")
+        async def queue_full():
+            raise QueueFullError(Priority.BATCH, 7)
+
+        @app.get("/deadline")
+        async def deadline():
+            raise DeadlineExpiredError("Deadline expired")
+
+        return TestClient(app)
+
+    def test_queue_full_is_429_with_retry_after(self, client):
+        response = client.get("/queue-full")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+
+    def test_deadline_expired_is_504(self, client):
+        assert client.get("/deadline").status_code == 504
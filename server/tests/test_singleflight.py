@@ -0,0 +1,133 @@
+"""Tests for request coalescing."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from server.core.singleflight import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def settle():
+    """Let started tasks reach their first await."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class Work:
+    """A generation that finishes when the test says so; `error` fails one run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error: Optional[Exception] = None
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+        return f"audio {call}"
+
+
+class TestSingleFlight:
+    """Concurrent callers with one key share one run."""
+
+    def test_concurrent_callers_share_one_run(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+            await settle()
+            work.release.set()
+            results = await asyncio.gather(*callers)
+
+            assert work.calls == 1
+            assert results == [("audio 1", False), ("audio 1", True), ("audio 1", True)]
+            assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2}
+
+        run(scenario())
+
+    def test_finished_key_runs_again(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            work.release.set()
+            assert await flight.do("key", work) == ("audio 1", False)
+            assert await flight.do("key", work) == ("audio 2", False)
+
+        run(scenario())
+
+    def test_error_reaches_every_caller(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            work.error = RuntimeError("S2 failed")
+            callers = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+            await settle()
+            work.release.set()
+            results = await asyncio.gather(*callers, return_exceptions=True)
+
+            assert [str(r) for r in results] == ["S2 failed", "S2 failed"]
+            assert flight.stats()["in_flight"] == 0
+
+        run(scenario())
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            leader = asyncio.create_task(flight.do("key", work))
+            follower = asyncio.create_task(flight.do("key", work))
+            await settle()
+            leader.cancel()
+            await settle()
+            work.release.set()
+
+            assert await follower == ("audio 1", True)
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+
+        run(scenario())
+
+    def test_drain_waits_for_in_flight_work(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            caller = asyncio.create_task(flight.do("key", work))
+            await settle()
+            assert await flight.drain(timeout=0.01) == 1
+
+            work.release.set()
+            assert await flight.drain(timeout=1) == 0
+            await caller
+
+        run(scenario())
+
+    def test_followers_retry_errors_about_the_leader(self):
+        async def scenario():
+            flight = SingleFlight()
+            work = Work()
+            work.error = LookupError("leader refused")
+            leader = asyncio.create_task(
+                flight.do("key", work, retry_on=(LookupError,))
+            )
+            follower = asyncio.create_task(
+                flight.do("key", work, retry_on=(LookupError,))
+            )
+            await settle()
+            work.release.set()
+            with pytest.raises(LookupError):
+                await leader
+
+            # The follower leads a run of its own instead of failing too.
+            assert await follower == ("audio 2", False)
+            assert work.calls == 2
+
+        run(scenario())
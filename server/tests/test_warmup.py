@@ -0,0 +1,140 @@
+"""Tests for startup warm-up."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from server.core import warmup
+from server.core.config import settings
+from server.core.preprocess import VoiceNotReadyError
+from server.core.warmup import DONE, TIMED_OUT, Warmup
+
+
+class FakePreprocessor:
+    """References become ready after `pending` failed waits per voice."""
+
+    def __init__(self, pending: int):
+        self.pending = pending
+        self.waits: dict[str, int] = {}
+        self.ready: set[str] = set()
+
+    async def wait_ready(self, voice_id: str) -> None:
+        self.waits[voice_id] = self.waits.get(voice_id, 0) + 1
+        if self.waits[voice_id] <= self.pending:
+            raise VoiceNotReadyError(voice_id, 1)
+        self.ready.add(voice_id)
+
+
+class FakeS2Client:
+    """Records warm-up generations; fails the first `failures` of them.
+
+    Generations sent to a backend marked `dead` never answer.
+    """
+
+    def __init__(
+        self, preprocessor: FakePreprocessor, failures: int = 0, backends: int = 1
+    ):
+        self.preprocessor = preprocessor
+        self.backends = SimpleNamespace(
+            backends=[
+                SimpleNamespace(url=f"http://s2-{i}", healthy=True, dead=False)
+                for i in range(backends)
+            ]
+        )
+        self.failures = failures
+        self.generated: list[list[str]] = []
+
+    async def _generate(self, voice_ids: list[str], backend) -> bytes:
+        # Sending before the references exist is what used to fail warm-up.
+        assert set(voice_ids) <= self.preprocessor.ready
+        if backend.dead:
+            await asyncio.Event().wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("S2 hiccup")
+        self.generated.append(voice_ids)
+        return b"audio"
+
+    async def generate_speech(self, text, voice_id, backend, **kwargs) -> bytes:
+        return await self._generate([voice_id], backend)
+
+    async def generate_dialogue(self, turns, backend, **kwargs) -> bytes:
+        return await self._generate([voice_id for voice_id, _ in turns], backend)
+
+
+@pytest.fixture
+def voices(monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMUP_VOICES", "alice")
+    monkeypatch.setattr(settings, "WARMUP_SPEAKER_COUNTS", "1,2")
+    monkeypatch.setattr(warmup, "RETRY_SECONDS", 0)
+    return SimpleNamespace(
+        list_voices=lambda: [SimpleNamespace(id="alice"), SimpleNamespace(id="bob")]
+    )
+
+
+def run_warmup(fish_client, voice_manager) -> Warmup:
+    async def scenario():
+        warm = Warmup(fish_client, voice_manager)
+        await warm.start()
+        assert not warm.finished
+        await warm._task
+        return warm
+
+    return asyncio.run(scenario())
+
+
+class TestWarmup:
+    """Readiness is held until every shape has been generated."""
+
+    def test_waits_for_references_before_generating(self, voices):
+        fish_client = FakeS2Client(FakePreprocessor(pending=2))
+        warm = run_warmup(fish_client, voices)
+        assert warm.status == DONE
+        assert warm.completed == warm.total == 3
+        assert fish_client.generated == [["alice"], ["alice"], ["alice", "bob"]]
+
+    def test_retries_failed_generations(self, voices):
+        fish_client = FakeS2Client(FakePreprocessor(pending=0), failures=2)
+        warm = run_warmup(fish_client, voices)
+        assert warm.status == DONE
+        assert warm.completed == 3
+        assert warm.failed == 2
+
+    def test_gives_up_on_a_shape_that_keeps_failing(self, voices):
+        fish_client = FakeS2Client(FakePreprocessor(pending=0), failures=10**6)
+        warm = run_warmup(fish_client, voices)
+        assert warm.status == DONE
+        assert warm.completed == 0
+        assert warm.given_up == 3
+        assert warm.failed == 3 * warmup.MAX_ATTEMPTS
+
+    def test_ejected_backend_does_not_hold_readiness(self, voices, monkeypatch):
+        monkeypatch.setattr(warmup, "HEALTH_POLL_SECONDS", 0.01)
+        fish_client = FakeS2Client(FakePreprocessor(pending=0), backends=2)
+        dead = fish_client.backends.backends[1]
+        dead.dead = True
+
+        async def scenario():
+            warm = Warmup(fish_client, voices)
+            await warm.start()
+            await asyncio.sleep(0.05)
+            assert not warm.finished
+            dead.healthy = False  # ejected by the pool's health probes
+            await warm._task
+            return warm
+
+        warm = asyncio.run(scenario())
+        assert warm.status == DONE
+        assert warm.completed == warm.total == 3
+        assert warm.skipped_backends == [dead.url]
+
+    def test_timeout_is_not_reported_as_done(self, voices, monkeypatch):
+        monkeypatch.setattr(settings, "WARMUP_TIMEOUT_SECONDS", 0.05)
+        fish_client = FakeS2Client(FakePreprocessor(pending=0))
+        fish_client.backends.backends[0].dead = True
+        warm = run_warmup(fish_client, voices)
+        assert warm.status == TIMED_OUT
+        assert warm.timed_out
+        assert warm.completed == 0
@@ -1,14 +1,33 @@
 """Audio processing utilities."""
 
+import io
 import pathlib
+from typing import Optional, Union
 
 from pydub import AudioSegment
 
+from server.utils.audio_duration import estimate_duration
 
-def get_audio_duration(file_path: pathlib.Path) -> float:
-    """Get audio duration in seconds."""
+
+def get_audio_duration(
+    source: Union[pathlib.Path, bytes], audio_format: Optional[str] = None
+) -> float:
+    """Get audio duration in seconds from a file path or in-memory audio bytes.
+
+    Reads container/frame headers first; only falls back to a full pydub decode
+    when the headers cannot answer.
+    """
     try:
-        audio = AudioSegment.from_file(str(file_path))
+        data = source if isinstance(source, (bytes, bytearray)) else source.read_bytes()
+        duration = estimate_duration(bytes(data), audio_format or None)
+        if duration is not None:
+            return round(duration, 3)
+
+        if isinstance(source, (bytes, bytearray)):
+            # Piped straight to ffmpeg; no temp file round trip.
+            audio = AudioSegment.from_file(io.BytesIO(source), format=audio_format)
+        else:
+            audio = AudioSegment.from_file(str(source))
         return len(audio) / 1000.0  # Convert from milliseconds to seconds
     except (FileNotFoundError, OSError, ValueError):
         return 0.0
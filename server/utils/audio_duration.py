@@ -0,0 +1,265 @@
+"""Audio duration from container/frame headers, without decoding.
+
+Decoding a clip with pydub spawns ffmpeg and materialises every PCM sample just to
+learn how long it is. The formats plomtts handles all record (or let us cheaply
+count) their length in headers:
+
+- MP3: Xing/Info or VBRI header frame count, else a walk over frame headers
+- WAV: `data` chunk size / byte rate from the `fmt ` chunk
+- FLAC: total samples / sample rate from STREAMINFO
+- OGG (Vorbis/Opus): last granule position of each chained stream / its sample rate
+
+Every parser returns None when it cannot answer, so callers can fall back to a
+full decode.
+"""
+
+import struct
+from typing import Iterator, Optional
+
+# MPEG audio bitrate tables in kbit/s, indexed by [version_is_mpeg1][layer][index].
+# Layer keys follow the header encoding: 3 = Layer I, 2 = Layer II, 1 = Layer III.
+_BITRATES = {
+    True: {
+        3: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    False: {
+        3: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        1: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+# Sample rates indexed by [version bits][index]; version 1 is reserved.
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],  # MPEG-2.5
+}
+
+
+def parse_mp3_frame_header(data: bytes, pos: int) -> Optional[tuple]:
+    """Decode the 4-byte frame header at `pos`.
+
+    Returns (frame_length, samples_per_frame, sample_rate, is_mpeg1, is_mono) or
+    None if the bytes are not a valid header.
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 0x3
+    layer = (b1 >> 1) & 0x3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    is_mpeg1 = version == 3
+    bitrate = _BITRATES[is_mpeg1][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x1
+    is_mono = (b3 >> 6) == 3
+
+    if layer == 3:  # Layer I
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or is_mpeg1:  # Layer II, or Layer III in MPEG-1
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:  # Layer III in MPEG-2/2.5
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    return length, samples, sample_rate, is_mpeg1, is_mono
+
+
+def skip_id3v2(data: bytes) -> int:
+    """Return the offset just past a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)  # syncsafe integer
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def first_mp3_frame(data: bytes) -> Optional[tuple[int, tuple]]:
+    """Offset and decoded header of the first MP3 frame, skipping any ID3v2 tag."""
+    pos = skip_id3v2(data)
+    # The first frame is one whose successor also parses, to avoid false syncs.
+    while pos < len(data) - 4:
+        header = parse_mp3_frame_header(data, pos)
+        if header is not None:
+            following = pos + header[0]
+            if following >= len(data) or parse_mp3_frame_header(data, following):
+                return pos, header
+        pos += 1
+    return None
+
+
+def mp3_summary_frames(data: bytes, pos: int, header: tuple) -> Optional[int]:
+    """Frame count from a Xing/Info/VBRI header in the frame at `pos`, if it has one.
+
+    Such a frame carries no audio; it summarises the whole stream.
+    """
+    _, _, _, is_mpeg1, is_mono = header
+    side_info = (17 if is_mono else 32) if is_mpeg1 else (9 if is_mono else 17)
+
+    # Xing (VBR) / Info (CBR) header: frame count lives in the first frame.
+    xing = pos + 4 + side_info
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4 : xing + 8])[0]
+        if flags & 0x1:
+            return struct.unpack(">I", data[xing + 8 : xing + 12])[0]
+        return 0
+
+    # VBRI (Fraunhofer) header sits 32 bytes after the frame header.
+    vbri = pos + 4 + 32
+    if data[vbri : vbri + 4] == b"VBRI":
+        return struct.unpack(">I", data[vbri + 14 : vbri + 18])[0]
+    return None
+
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """Duration of an MP3 stream in seconds."""
+    first = first_mp3_frame(data)
+    if first is None:
+        return None
+    pos, header = first
+    _, samples, sample_rate, _, _ = header
+
+    frames = mp3_summary_frames(data, pos, header)
+    if frames:
+        return frames * samples / sample_rate
+
+    # No summary header: walk the frames and sum their sample counts.
+    total_samples = 0
+    while pos < len(data) - 4:
+        frame = parse_mp3_frame_header(data, pos)
+        if frame is None:
+            if data[pos : pos + 3] == b"TAG":  # trailing ID3v1 tag
+                break
+            pos += 1  # resync
+            continue
+        total_samples += frame[1]
+        pos += frame[0]
+    return total_samples / sample_rate
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """Duration of a RIFF/WAVE file in seconds."""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        chunk_size = struct.unpack("<I", data[pos + 4 : pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            byte_rate = struct.unpack("<I", data[body + 8 : body + 12])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed WAVs leave the size unset (0 or 0xFFFFFFFF).
+            available = len(data) - body
+            if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                chunk_size = available
+            return chunk_size / byte_rate
+        pos = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def flac_duration(data: bytes) -> Optional[float]:
+    """Duration of a FLAC stream in seconds, from its STREAMINFO block."""
+    # STREAMINFO is always the first metadata block, right after the marker.
+    if len(data) < 26 or data[:4] != b"fLaC" or (data[4] & 0x7F) != 0:
+        return None
+    packed = struct.unpack(">Q", data[18:26])[0]
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def ogg_pages(data: bytes) -> Iterator[tuple[int, int, int, int, int]]:
+    """Yield (offset, flags, granule, serial, body offset) for each Ogg page.
+
+    Stops at the first byte that is not a page (truncated or trailing data).
+    """
+    pos = 0
+    while pos + 27 <= len(data) and data[pos : pos + 4] == b"OggS":
+        flags = data[pos + 5]
+        granule, serial = struct.unpack("<qI", data[pos + 6 : pos + 18])
+        segments = data[pos + 26]
+        body = pos + 27 + segments
+        if body > len(data):
+            return
+        yield pos, flags, granule, serial, body
+        pos = body + sum(data[pos + 27 : body])
+
+
+def ogg_duration(data: bytes) -> Optional[float]:
+    """Duration of an Ogg Vorbis or Ogg Opus stream in seconds.
+
+    Chained streams (clips joined end to end) are summed.
+    """
+    if len(data) < 28 or data[:4] != b"OggS":
+        return None
+    # serial -> [sample rate, pre-skip, last granule position]
+    streams: dict[int, list] = {}
+    for _, flags, granule, serial, body in ogg_pages(data):
+        if flags & 0x02:  # beginning of stream: the codec identification packet
+            pre_skip = 0
+            if data[body : body + 7] == b"\x01vorbis":
+                sample_rate = struct.unpack("<I", data[body + 12 : body + 16])[0]
+            elif data[body : body + 8] == b"OpusHead":
+                pre_skip = struct.unpack("<H", data[body + 10 : body + 12])[0]
+                sample_rate = 48000  # Opus granule positions count 48 kHz samples
+            else:
+                return None
+            streams[serial] = [sample_rate, pre_skip, 0]
+        elif serial in streams and granule > 0:
+            streams[serial][2] = granule
+
+    total = sum(
+        max(granule - pre_skip, 0) / sample_rate
+        for sample_rate, pre_skip, granule in streams.values()
+        if sample_rate
+    )
+    return total or None
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """Identify the container from its magic bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] >= 0xE0):
+        return "mp3"
+    return None
+
+
+_PARSERS = {
+    "mp3": mp3_duration,
+    "wav": wav_duration,
+    "flac": flac_duration,
+    "ogg": ogg_duration,
+}
+
+
+def estimate_duration(
+    data: bytes, audio_format: Optional[str] = None
+) -> Optional[float]:
+    """Duration in seconds from headers alone, or None if it cannot be determined."""
+    parser = _PARSERS.get(sniff_format(data) or audio_format or "")
+    if parser is None:
+        return None
+    try:
+        return parser(data)
+    except (struct.error, IndexError, ZeroDivisionError):
+        return None
@@ -0,0 +1,121 @@
+"""Join separately generated clips into one, without re-encoding them.
+
+- WAV: PCM is concatenated with trimmed edges and a fixed pause between clips
+- MP3: frames are concatenated; ID3 tags and Xing/Info summary frames, which
+  would describe only one clip, are dropped
+- Ogg: streams are chained end to end (a valid Ogg file), with serial numbers
+  made unique
+"""
+
+import struct
+
+from server.utils.audio_duration import (
+    first_mp3_frame,
+    mp3_summary_frames,
+    ogg_pages,
+)
+from server.utils.wav import parse_wav, silence, smooth_edges, wav_header
+
+# CRC-32 used by Ogg pages (polynomial 0x04C11DB7, not reflected).
+_OGG_CRC_TABLE = []
+for _byte in range(256):
+    _crc = _byte << 24
+    for _ in range(8):
+        _crc = ((_crc << 1) ^ 0x04C11DB7) if _crc & 0x80000000 else _crc << 1
+    _OGG_CRC_TABLE.append(_crc & 0xFFFFFFFF)
+
+
+def _ogg_crc(page: bytes | bytearray) -> int:
+    crc = 0
+    for byte in page:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+
+def join_wav(parts: list[bytes], pause_seconds: float) -> bytes:
+    """Concatenate WAV clips of the same format into one WAV."""
+    wav_format = None
+    pcm_parts: list[bytes] = []
+    for index, part in enumerate(parts):
+        part_format, pcm = parse_wav(part)
+        if wav_format is None:
+            wav_format = part_format
+        elif part_format != wav_format:
+            raise ValueError(
+                f"clip {index} format {part_format} does not match {wav_format}"
+            )
+        if pcm_parts:
+            pcm_parts.append(silence(wav_format, pause_seconds))
+        pcm_parts.append(smooth_edges(pcm, wav_format))
+    if wav_format is None:
+        raise ValueError("no clips to join")
+    pcm = b"".join(pcm_parts)
+    return wav_header(wav_format, len(pcm)) + pcm
+
+
+def _mp3_frames(data: bytes) -> bytes:
+    """The audio frames of an MP3 clip, without tags or a summary frame."""
+    first = first_mp3_frame(data)
+    if first is None:
+        raise ValueError("no MP3 frames found")
+    pos, header = first
+    if mp3_summary_frames(data, pos, header) is not None:
+        pos += header[0]
+    end = len(data)
+    if end - pos >= 128 and data[end - 128 : end - 125] == b"TAG":  # ID3v1
+        end -= 128
+    return data[pos:end]
+
+
+def join_mp3(parts: list[bytes]) -> bytes:
+    """Concatenate MP3 clips frame by frame."""
+    return b"".join(_mp3_frames(part) for part in parts)
+
+
+def join_ogg(parts: list[bytes]) -> bytes:
+    """Chain Ogg clips, renumbering any stream whose serial was already used."""
+    used: set[int] = set()
+    chained = []
+    for part in parts:
+        pages = list(ogg_pages(part))
+        if not pages:
+            raise ValueError("no Ogg pages found")
+        serials = {serial for _, _, _, serial, _ in pages}
+        renumber = {}
+        for serial in sorted(serials):
+            new_serial = serial
+            while new_serial in used:
+                new_serial = (new_serial + 1) & 0xFFFFFFFF
+            used.add(new_serial)
+            if new_serial != serial:
+                renumber[serial] = new_serial
+        if not renumber:
+            chained.append(part)
+            continue
+
+        ends = [offset for offset, *_ in pages[1:]] + [None]
+        for (offset, _, _, serial, _), end in zip(pages, ends):
+            page = bytearray(part[offset:end])
+            if serial in renumber:
+                page[14:18] = struct.pack("<I", renumber[serial])
+                page[22:26] = b"\0\0\0\0"
+                page[22:26] = struct.pack("<I", _ogg_crc(page))
+            chained.append(bytes(page))
+    return b"".join(chained)
+
+
+def join_audio(parts: list[bytes], audio_format: str, pause_seconds: float) -> bytes:
+    """Join clips encoded as `audio_format` (wav, mp3 or opus).
+
+    `pause_seconds` of silence separates WAV clips; encoded formats keep the
+    silence S2 left at the clip edges. Runs synchronously (in a worker thread).
+    """
+    if len(parts) == 1:
+        return parts[0]
+    if audio_format == "wav":
+        return join_wav(parts, pause_seconds)
+    if audio_format == "mp3":
+        return join_mp3(parts)
+    if audio_format == "opus":
+        return join_ogg(parts)
+    raise ValueError(f"cannot join {audio_format} clips")
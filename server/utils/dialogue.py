@@ -0,0 +1,100 @@
+"""Plan long or many-speaker dialogues as a sequence of S2-sized windows."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from server.utils.text import split_text
+
+# Fish Audio S2 supports at most this many distinct speakers per call.
+MAX_SPEAKERS = 5
+
+# Fish Audio S2's context window, shared by the reference clips, the text and the
+# audio tokens it generates. A margin is kept free for prompt framing.
+CONTEXT_TOKENS = 8192
+CONTEXT_MARGIN_TOKENS = 512
+# Audio tokens per second of audio (reference or generated).
+AUDIO_TOKENS_PER_SECOND = 21.5
+# Rough context cost of one character of dialogue: its text tokens plus the
+# audio generated for it (speech runs at about 15 characters per second).
+TOKENS_PER_CHAR = 1.75
+
+
+@dataclass
+class DialogueWindow:
+    """Consecutive turns generated together in one S2 call."""
+
+    turns: list[tuple[str, str]]
+    # Voices in `<|speaker:N|>` order.
+    speakers: list[str]
+
+
+def context_budget_chars(speakers: int, reference_seconds: float) -> int:
+    """Characters of dialogue that fit in one S2 call next to `speakers` references."""
+    references = speakers * reference_seconds * AUDIO_TOKENS_PER_SECOND
+    free = CONTEXT_TOKENS - CONTEXT_MARGIN_TOKENS - references
+    return max(int(free / TOKENS_PER_CHAR), 1)
+
+
+def plan_dialogue(
+    turns: list[tuple[str, str]],
+    reference_seconds: float,
+    max_chars: Optional[int] = None,
+    max_speakers: int = MAX_SPEAKERS,
+) -> list[DialogueWindow]:
+    """Split (voice_id, text) turns into windows S2 can render in one call each.
+
+    A dialogue with at most `max_speakers` voices whose text fits the context
+    left over by their `reference_seconds`-long reference clips is returned as
+    exactly one window, so S2 sees the whole conversation. Otherwise windows hold
+    at most `max_speakers` voices and as much text as fits next to their
+    references (capped at `max_chars` if given). Windows only break between
+    turns; a turn too long for any window is split on sentences into
+    consecutive turns of the same voice. Speakers are numbered in order of first
+    appearance in the whole dialogue, so a voice keeps the same relative
+    position in every window.
+    """
+
+    def budget(speakers: int) -> int:
+        chars = context_budget_chars(speakers, reference_seconds)
+        return min(chars, max_chars) if max_chars else chars
+
+    first_seen: dict[str, int] = {}
+    for voice_id, _ in turns:
+        first_seen.setdefault(voice_id, len(first_seen))
+    turns = [(voice_id, text.strip()) for voice_id, text in turns]
+    total = sum(len(text) for _, text in turns)
+    if len(first_seen) <= max_speakers and total <= budget(len(first_seen)):
+        return [_window(turns, first_seen)]
+
+    # Every piece must fit a window with the most speakers one can hold.
+    piece_chars = budget(min(len(first_seen), max_speakers))
+    pieces: list[tuple[str, str]] = []
+    for voice_id, text in turns:
+        if len(text) > piece_chars:
+            pieces.extend(
+                (voice_id, segment.text) for segment in split_text(text, piece_chars)
+            )
+        else:
+            pieces.append((voice_id, text))
+
+    windows: list[DialogueWindow] = []
+    current: list[tuple[str, str]] = []
+    voices: set[str] = set()
+    chars = 0
+    for voice_id, text in pieces:
+        with_voice = len(voices | {voice_id})
+        too_many_voices = with_voice > max_speakers
+        if current and (too_many_voices or chars + len(text) > budget(with_voice)):
+            windows.append(_window(current, first_seen))
+            current, voices, chars = [], set(), 0
+        current.append((voice_id, text))
+        voices.add(voice_id)
+        chars += len(text)
+    if current:
+        windows.append(_window(current, first_seen))
+    return windows
+
+
+def _window(turns: list[tuple[str, str]], first_seen: dict[str, int]) -> DialogueWindow:
+    speakers = sorted({voice_id for voice_id, _ in turns}, key=first_seen.__getitem__)
+    return DialogueWindow(turns=turns, speakers=speakers)
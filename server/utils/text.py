@@ -0,0 +1,89 @@
+"""Split long text into S2-sized segments on natural boundaries."""
+
+import re
+from dataclasses import dataclass
+
+# End of a sentence: terminal punctuation plus any closing quotes/brackets. Latin
+# punctuation needs following whitespace ("e.g." inside a word is not a boundary);
+# CJK full-width punctuation does not.
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’»)\]]*\s+|[。！？]+[\"”’」』)]*\s*")
+# Softer split points for sentences that are too long on their own.
+_CLAUSE_END = re.compile(r"[,;:—–，；：、]\s*")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Pieces ending in full-width punctuation are rejoined without a space.
+_CJK_CLOSERS = "。！？，；：、」』）"
+
+
+@dataclass
+class TextSegment:
+    """One piece of a long text, generated as a single S2 request."""
+
+    text: str
+    paragraph_end: bool
+
+
+def _split_after(pattern: re.Pattern, text: str) -> list[str]:
+    """Split `text` after every match of `pattern`, keeping the delimiters."""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start : match.end()].strip())
+        start = match.end()
+    pieces.append(text[start:].strip())
+    return [piece for piece in pieces if piece]
+
+
+def _split_oversized(sentence: str, max_chars: int) -> list[str]:
+    """Break a single over-long sentence on clauses, then words, then characters."""
+    parts = []
+    for clause in _split_after(_CLAUSE_END, sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            parts.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            parts.append(clause)
+    return _pack(parts, max_chars)
+
+
+def _pack(pieces: list[str], max_chars: int) -> list[str]:
+    """Greedily join consecutive pieces into chunks of at most `max_chars`."""
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        separator = "" if current.endswith(tuple(_CJK_CLOSERS)) else " "
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_chars: int) -> list[TextSegment]:
+    """Split text into segments of at most `max_chars` characters.
+
+    Segments never cross a paragraph and prefer to end on a sentence; a sentence
+    longer than `max_chars` is broken on clause punctuation, then on whitespace.
+    """
+    segments: list[TextSegment] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        sentences: list[str] = []
+        for sentence in _split_after(_SENTENCE_END, paragraph + " "):
+            if len(sentence) > max_chars:
+                sentences.extend(_split_oversized(sentence, max_chars))
+            else:
+                sentences.append(sentence)
+        chunks = _pack(sentences, max_chars)
+        segments.extend(
+            TextSegment(text=chunk, paragraph_end=i == len(chunks) - 1)
+            for i, chunk in enumerate(chunks)
+        )
+    return segments
@@ -0,0 +1,241 @@
+"""Minimal PCM WAV helpers for stitching generated segments together.
+
+Segments are joined in the PCM domain (no re-encoding): leading/trailing silence
+is trimmed, a short fade removes clicks at the cut, and a fixed pause replaces the
+silence so every join sounds the same regardless of how S2 padded each clip.
+"""
+
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+
+# Samples quieter than this (fraction of full scale) count as silence when trimming.
+SILENCE_THRESHOLD = 0.01
+# Audio kept before the first / after the last non-silent sample.
+TRIM_MARGIN_SECONDS = 0.02
+FADE_SECONDS = 0.005
+# Placeholder size for streamed WAVs whose length is not known up front.
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class WavFormat:
+    """PCM layout of a WAV stream."""
+
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+
+    @property
+    def frame_bytes(self) -> int:
+        """Bytes per sample frame (one sample for every channel)."""
+        return self.channels * self.bits_per_sample // 8
+
+    def frames(self, seconds: float) -> int:
+        """Number of frames in `seconds` of audio."""
+        return int(seconds * self.sample_rate)
+
+
+def parse_wav(data: bytes) -> tuple[WavFormat, bytes]:
+    """Return the format and raw PCM payload of a WAV file.
+
+    Raises ValueError for anything other than uncompressed PCM.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    pos = 12
+    wav_format = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        size = struct.unpack("<I", data[pos + 4 : pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            tag, channels, rate = struct.unpack("<HHI", data[body : body + 8])
+            bits = struct.unpack("<H", data[body + 14 : body + 16])[0]
+            if tag not in (1, 0xFFFE):  # PCM / WAVE_FORMAT_EXTENSIBLE
+                raise ValueError(f"unsupported WAV encoding {tag:#x}")
+            wav_format = WavFormat(channels, rate, bits)
+        elif chunk_id == b"data":
+            if wav_format is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            # Streamed WAVs leave the size unset; take everything that follows.
+            end = len(data) if size in (0, _UNKNOWN_SIZE) else body + size
+            return wav_format, data[body:end]
+        pos = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def wav_header(wav_format: WavFormat, data_size: int = _UNKNOWN_SIZE) -> bytes:
+    """Build a 44-byte PCM WAV header; omit `data_size` when streaming."""
+    riff_size = _UNKNOWN_SIZE if data_size == _UNKNOWN_SIZE else 36 + data_size
+    return b"".join(
+        [
+            b"RIFF",
+            struct.pack("<I", riff_size),
+            b"WAVEfmt ",
+            struct.pack(
+                "<IHHIIHH",
+                16,
+                1,
+                wav_format.channels,
+                wav_format.sample_rate,
+                wav_format.sample_rate * wav_format.frame_bytes,
+                wav_format.frame_bytes,
+                wav_format.bits_per_sample,
+            ),
+            b"data",
+            struct.pack("<I", data_size),
+        ]
+    )
+
+
+def silence(wav_format: WavFormat, seconds: float) -> bytes:
+    """`seconds` of digital silence."""
+    return bytes(wav_format.frames(seconds) * wav_format.frame_bytes)
+
+
+def _samples(pcm: bytes) -> array:
+    """View 16-bit little-endian PCM as a mutable array of ints."""
+    samples = array("h")
+    samples.frombytes(pcm[: len(pcm) - len(pcm) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def _to_bytes(samples: array) -> bytes:
+    if sys.byteorder == "big":
+        samples = array("h", samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def smooth_edges(pcm: bytes, wav_format: WavFormat) -> bytes:
+    """Trim edge silence and fade both ends so segments join without clicks.
+
+    Only 16-bit PCM is processed; other sample widths are returned unchanged.
+    """
+    if wav_format.bits_per_sample != 16 or not pcm:
+        return pcm
+    samples = _samples(pcm)
+    channels = wav_format.channels
+    threshold = int(SILENCE_THRESHOLD * 32767)
+
+    first = 0
+    while first < len(samples) and abs(samples[first]) <= threshold:
+        first += 1
+    if first == len(samples):
+        return b""  # nothing but silence
+    last = len(samples) - 1
+    while last > first and abs(samples[last]) <= threshold:
+        last -= 1
+
+    margin = wav_format.frames(TRIM_MARGIN_SECONDS) * channels
+    start = max(0, first - first % channels - margin)
+    end = min(len(samples), last - last % channels + channels + margin)
+    samples = samples[start:end]
+
+    fade = min(wav_format.frames(FADE_SECONDS), len(samples) // channels // 2)
+    for i in range(fade):
+        gain = i / fade
+        for c in range(channels):
+            head = i * channels + c
+            tail = len(samples) - (i + 1) * channels + c
+            samples[head] = int(samples[head] * gain)
+            samples[tail] = int(samples[tail] * gain)
+    return _to_bytes(samples)
+
+
+def to_stereo(pcm: bytes, wav_format: WavFormat) -> bytes:
+    """Duplicate mono 16-bit PCM into two interleaved channels.
+
+    Raises ValueError for other layouts.
+    """
+    if wav_format.channels != 1 or wav_format.bits_per_sample != 16:
+        raise ValueError("only mono 16-bit PCM can be duplicated to stereo")
+    samples = _samples(pcm)
+    stereo = array("h", bytes(len(samples) * 4))
+    stereo[0::2] = samples
+    stereo[1::2] = samples
+    return _to_bytes(stereo)
+
+
+def to_mono(pcm: bytes, wav_format: WavFormat) -> bytes:
+    """Average all channels of 16-bit PCM into one.
+
+    Raises ValueError for other sample widths.
+    """
+    if wav_format.channels == 1:
+        return pcm
+    if wav_format.bits_per_sample != 16:
+        raise ValueError(f"cannot downmix {wav_format.bits_per_sample}-bit PCM")
+    samples = _samples(pcm)
+    channels = wav_format.channels
+    mono = array(
+        "h",
+        (
+            sum(samples[i : i + channels]) // channels
+            for i in range(0, len(samples) - channels + 1, channels)
+        ),
+    )
+    return _to_bytes(mono)
+
+
+class Resampler:
+    """Linear-interpolation sample rate converter for 16-bit PCM.
+
+    Stateful so a stream can be converted chunk by chunk: the last source frame
+    and any partial frame are carried over to the next `feed()`.
+    """
+
+    def __init__(self, wav_format: WavFormat, rate: int):
+        """Convert `wav_format` audio to `rate` Hz.
+
+        Raises ValueError for sample widths other than 16 bits.
+        """
+        if wav_format.bits_per_sample != 16:
+            raise ValueError(f"cannot resample {wav_format.bits_per_sample}-bit PCM")
+        self.channels = wav_format.channels
+        self.frame_bytes = wav_format.frame_bytes
+        # Positions are kept in units of 1/rate source frames so chunked and
+        # whole-buffer conversion produce identical output.
+        self.step = wav_format.sample_rate
+        self.rate = rate
+        self._pending = b""
+        self._samples = array("h")
+        # Source position of the next output frame, relative to self._samples.
+        self._pos = 0
+
+    def feed(self, pcm: bytes) -> bytes:
+        """Resample the next chunk; returns whatever output it completes."""
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = data[usable:]
+        samples = self._samples + _samples(data[:usable])
+        channels = self.channels
+        frames = len(samples) // channels
+
+        out = array("h")
+        pos = self._pos
+        rate = self.rate
+        while pos // rate + 1 < frames:
+            index, remainder = divmod(pos, rate)
+            frac = remainder / rate
+            base = index * channels
+            for c in range(channels):
+                a = samples[base + c]
+                out.append(int(a + (samples[base + channels + c] - a) * frac))
+            pos += self.step
+
+        drop = min(pos // rate, frames)
+        self._samples = samples[drop * channels :]
+        self._pos = pos - drop * rate
+        return _to_bytes(out)
+
+
+def resample(pcm: bytes, wav_format: WavFormat, rate: int) -> bytes:
+    """Convert 16-bit PCM to `rate` Hz (see `Resampler`)."""
+    if wav_format.sample_rate == rate:
+        return pcm
+    return Resampler(wav_format, rate).feed(pcm)